@@ -2,6 +2,9 @@ from grow.common import utils
 from grow.deployments import stats
 from grow.deployments.destinations import local as local_destination
 from grow.pods import pods
+from grow.pods import profiler
+from grow.pods import render_cache
+from grow.pods import shards
 from grow.pods import storage
 import click
 import os
@@ -12,20 +15,57 @@ import os
 @click.option('--out_dir', help='Where to output built files.')
 @click.option('--preprocess/--no-preprocess', default=True, is_flag=True,
               help='Whether to run preprocessors.')
-def build(pod_path, out_dir, preprocess):
+@click.option('--workers', default=1, type=int,
+              help='Number of processes to use when rendering the build.')
+@click.option('--incremental/--no-incremental', default=False, is_flag=True,
+              help='Whether to reuse previously built files whose source files'
+                   ' have not changed since the last build.')
+@click.option('--cache/--no-cache', default=True, is_flag=True,
+              help='Whether to reuse rendered pages whose source files have'
+                   ' not changed from the render cache in .grow/cache/.')
+@click.option('--profile', default=False, is_flag=True,
+              help='Whether to profile the build, displaying the slowest paths'
+                   ' and templates and saving a report to .grow/profile.json'
+                   ' in the output directory.')
+@click.option('--profile_limit', default=10, type=int,
+              help='Number of the slowest paths and templates to display when'
+                   ' profiling.')
+@click.option('--shard',
+              help='Builds only one shard of the pod, in the form i/N (e.g.'
+                   ' "1/4" for the first of four shards). Use `grow'
+                   ' merge_shards` to combine the outputs of each shard.')
+@click.option('--shard_by_locale', default=False, is_flag=True,
+              help='Whether to partition shards by locale, rather than by'
+                   ' path.')
+def build(pod_path, out_dir, preprocess, workers, incremental, cache, profile,
+          profile_limit, shard, shard_by_locale):
     """Generates static files and dumps them to a local destination."""
     root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
+    if shard:
+        try:
+            shard = shards.Shard.parse(shard, by_locale=shard_by_locale)
+        except shards.Error as e:
+            raise click.BadParameter(str(e))
     out_dir = out_dir or os.path.join(root, 'build')
     pod = pods.Pod(root, storage=storage.FileStorage)
+    if cache:
+        pod.render_cache = render_cache.RenderCache(pod)
+    if profile:
+        pod.profiler = profiler.Profiler()
     if preprocess:
         pod.preprocess()
     try:
         config = local_destination.Config(out_dir=out_dir)
         destination = local_destination.LocalDestination(config)
-        paths_to_contents = destination.dump(pod)
+        stats_obj = stats.Stats(pod, paths=[])
+        paths_to_contents = stats_obj.track(destination.dump(
+            pod, workers=workers, incremental=incremental, shard=shard))
         repo = utils.get_git_repo(pod.root)
-        stats_obj = stats.Stats(pod, paths_to_contents=paths_to_contents)
         destination.deploy(paths_to_contents, stats=stats_obj, repo=repo, confirm=False,
                            test=False)
+        if profile:
+            click.echo('\n\n'.join(pod.profiler.to_tables(limit=profile_limit)))
+            destination.write_control_file(
+                'profile.json', pod.profiler.to_string())
     except pods.Error as e:
         raise click.ClickException(str(e))
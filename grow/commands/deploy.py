@@ -12,6 +12,8 @@ import os
 @click.argument('pod_path', default='.')
 @click.option('--preprocess/--no-preprocess', default=True, is_flag=True,
               help='Whether to run preprocessors.')
+@click.option('--workers', default=1, type=int,
+              help='Number of processes to use when rendering the build.')
 @click.option('--confirm/--noconfirm', '-c/-f', default=True, is_flag=True,
               help='Whether to confirm prior to deployment.')
 @click.option('--test/--notest', default=True, is_flag=True,
@@ -22,8 +24,8 @@ import os
               help='(deprecated) --auth must now be specified'
                    ' before deploy. Usage: grow --auth=user@example.com deploy')
 @click.pass_context
-def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
-           test_only, auth):
+def deploy(context, deployment_name, pod_path, preprocess, workers, confirm,
+           test, test_only, auth):
     """Deploys a pod to a destination."""
     if auth:
         text = ('--auth must now be specified before deploy. Usage:'
@@ -41,9 +43,10 @@ def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
         if test_only:
             deployment.test()
             return
-        paths_to_contents = deployment.dump(pod)
+        stats_obj = stats.Stats(pod, paths=[])
+        paths_to_contents = stats_obj.track(
+            deployment.dump(pod, workers=workers))
         repo = utils.get_git_repo(pod.root)
-        stats_obj = stats.Stats(pod, paths_to_contents=paths_to_contents)
         deployment.deploy(paths_to_contents, stats=stats_obj, repo=repo,
                           confirm=confirm, test=test)
     except base.Error as e:
@@ -0,0 +1,20 @@
+from grow.common import utils
+from grow.deployments import shards
+import click
+import os
+
+
+@click.command()
+@click.argument('shard_dirs', nargs=-1, required=True)
+@click.option('--out_dir', required=True,
+              help='Where to output the merged files.')
+@click.option('--pod_path', default='.',
+              help='Path to the pod, used to record the commit deployed.')
+def merge_shards(shard_dirs, out_dir, pod_path):
+    """Merges the outputs of `grow build --shard` into one directory."""
+    root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
+    repo = utils.get_git_repo(root)
+    try:
+        shards.merge(shard_dirs, out_dir, repo=repo)
+    except shards.Error as e:
+        raise click.ClickException(str(e))
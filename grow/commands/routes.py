@@ -12,6 +12,7 @@ def routes(pod_path):
     root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
     pod = pods.Pod(root, storage=storage.FileStorage)
     routes = pod.get_routes()
+    routes.load_manifest()
     out = []
     controllers_to_paths = collections.defaultdict(set)
     for route in routes:
@@ -31,8 +31,8 @@ def stage(context, pod_path, remote, preprocess, subdomain):
         if preprocess:
             pod.preprocess()
         repo = utils.get_git_repo(pod.root)
-        paths_to_contents = deployment.dump(pod)
-        stats_obj = stats.Stats(pod, paths_to_contents=paths_to_contents)
+        stats_obj = stats.Stats(pod, paths=[])
+        paths_to_contents = stats_obj.track(deployment.dump(pod))
         deployment.deploy(paths_to_contents, stats=stats_obj, repo=repo,
                           confirm=False, test=False)
     except base.Error as e:
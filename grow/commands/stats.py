@@ -16,6 +16,7 @@ def stats(pod_path, full):
     root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
     pod = pods.Pod(root, storage=storage.FileStorage)
     try:
+        pod.routes.load_manifest()
         stats = stats_lib.Stats(pod, full=full)
         click.echo_via_pager('\n\n'.join(stats.to_tables()))
     except pods.Error as e:
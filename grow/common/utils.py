@@ -7,6 +7,7 @@ except ImportError:
     except ImportError:
         from io import StringIO
 import bs4
+import collections
 import csv as csv_lib
 import functools
 import gettext
@@ -18,9 +19,11 @@ import os
 import re
 import urllib
 import sys
+import tempfile
 import threading
 import time
 import translitcodec
+import weakref
 import yaml
 
 # The CLoader implementation of the PyYaml loader is orders of magnitutde
@@ -87,6 +90,31 @@ def get_git_repo(root):
         logging.info('WARNING: No Git repository found in {}'.format(root))
 
 
+def write_file_atomically(path, content):
+    """Writes a local file via a temporary file in the same directory, so that
+    concurrent readers never see a partial file. The temporary file is
+    removed if writing fails, and the error is raised."""
+    dirname = os.path.dirname(path)
+    if not os.path.isdir(dirname):
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            # Created by another process in the meantime.
+            if not os.path.isdir(dirname):
+                raise
+    fd, temp_path = tempfile.mkstemp(dir=dirname)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(content)
+        os.rename(temp_path, path)
+    except:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 def interactive_confirm(message, default=False):
     message = '{} [y/N]: '.format(message)
     choice = raw_input(message).lower()
@@ -104,10 +132,14 @@ def walk(node, callback, parent_key=None):
         else:
             item = key
 
-        if isinstance(node, (dict)) and isinstance(item, (list, set)):
+        # Lazy values are leaves, so that walking fields doesn't load them.
+        is_lazy = isinstance(item, LazyValue)
+
+        if (isinstance(node, (dict)) and not is_lazy
+                and isinstance(item, (list, set))):
             parent_key = key
 
-        if isinstance(item, (list, set, dict)):
+        if not is_lazy and isinstance(item, (list, set, dict)):
             walk(item, callback, parent_key=parent_key)
         else:
             if isinstance(node, (list, set)):
@@ -125,22 +157,113 @@ def validate_name(name):
             'backslashes, and dashes. Found: "{}"'.format(name))
 
 
+def _freeze(value):
+    """Returns a hashable equivalent of a value containing dicts, lists or
+    sets, so that functions called with them can be memoized."""
+    if isinstance(value, LazyValue):
+        raise TypeError('Lazy values are not frozen, as that would load them.')
+    if isinstance(value, dict):
+        return dict, frozenset(
+            (key, _freeze(item)) for key, item in value.iteritems())
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return set, frozenset(_freeze(item) for item in value)
+    return value
+
+
+# Memoized functions, for reporting and resetting them all.
+_memoize_caches = weakref.WeakSet()
+
+
 class memoize(object):
+    """Memoizes a function, or a method (keyed by its instance as well).
+
+    Each cache holds at most `max_size` values, evicting the least recently
+    used. The cache is thread-safe, though a value may be computed more than
+    once by concurrent callers. Arguments that aren't hashable, such as dicts,
+    are frozen into keys; values for arguments that can't be frozen aren't
+    cached. Caches count their hits, misses and evictions (see `stats`), and
+    are reset with `reset` or, for a single key, `invalidate`.
 
-    def __init__(self, func):
+    Use as `@memoize` or, to set the size of the cache,
+    `@memoize(max_size=100)`.
+    """
+    DEFAULT_MAX_SIZE = 10000
+
+    def __init__(self, func=None, max_size=None):
         self.func = func
-        self.cache = {}
+        self.max_size = self.DEFAULT_MAX_SIZE if max_size is None else max_size
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncached = 0
+        self._lock = threading.RLock()
+        _memoize_caches.add(self)
+
+    @property
+    def name(self):
+        return '{}.{}'.format(self.func.__module__, self.func.__name__)
+
+    @property
+    def stats(self):
+        return {
+            'name': self.name,
+            'size': len(self.cache),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'uncached': self.uncached,
+        }
+
+    @staticmethod
+    def _get_key(args, kwargs):
+        try:
+            key = (args, frozenset(kwargs.items()))
+            hash(key)
+        except TypeError:
+            key = _freeze((args, kwargs))
+            hash(key)  # Raises a TypeError for values that can't be frozen.
+        return key
+
+    def _get(self, key):
+        """Returns the cached value for a key, or SENTINEL."""
+        with self._lock:
+            try:
+                value = self.cache.pop(key)
+            except KeyError:
+                self.misses += 1
+                return SENTINEL
+            self.cache[key] = value  # Marks the value as recently used.
+            self.hits += 1
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self.cache.pop(key, None)
+            self.cache[key] = value
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+                self.evictions += 1
 
     def __call__(self, *args, **kwargs):
-        key = (args, frozenset(kwargs.items()))
+        if self.func is None:
+            # Used as `@memoize(max_size=...)`.
+            self.func = args[0]
+            return self
         try:
-            return self.cache[key]
-        except KeyError:
-            value = self.func(*args, **kwargs)
-            self.cache[key] = value
-            return value
+            key = memoize._get_key(args, kwargs)
         except TypeError:
+            with self._lock:
+                self.uncached += 1
             return self.func(*args, **kwargs)
+        value = self._get(key)
+        if value is SENTINEL:
+            value = self.func(*args, **kwargs)
+            self._set(key, value)
+        return value
 
     def __repr__(self):
         return self.func.__doc__
@@ -148,10 +271,38 @@ class memoize(object):
     def __get__(self, obj, objtype):
         fn = functools.partial(self.__call__, obj)
         fn.reset = self._reset
+        fn.invalidate = functools.partial(self.invalidate, obj)
         return fn
 
-    def _reset(self):
-        self.cache = {}
+    def invalidate(self, *args, **kwargs):
+        """Removes the cached value for a call's arguments."""
+        try:
+            key = memoize._get_key(args, kwargs)
+        except TypeError:
+            return
+        with self._lock:
+            self.cache.pop(key, None)
+
+    def reset(self):
+        with self._lock:
+            self.cache = collections.OrderedDict()
+
+    _reset = reset
+
+
+def get_memoize_stats():
+    """Returns the stats of each memoized function that has been called,
+    sorted by name."""
+    return sorted((cache.stats for cache in list(_memoize_caches)
+                   if cache.func is not None and (cache.hits or cache.misses
+                                                  or cache.uncached)),
+                  key=lambda stats: stats['name'])
+
+
+def reset_memoize_caches():
+    """Resets the caches of every memoized function."""
+    for cache in list(_memoize_caches):
+        cache.reset()
 
 
 class cached_property(property):
@@ -192,66 +343,227 @@ class cached_property(property):
 
 
 class memoize_tag(memoize):
+    """Memoizes a template tag when called with `use_cache=True`. The pod
+    paths read while computing a value are replayed to the pod's dependency
+    tracker whenever the cached value is reused."""
 
     def __call__(self, *args, **kwargs):
         use_cache = kwargs.pop('use_cache', False)
-        if use_cache is True:
-            return super(memoize_tag, self).__call__(*args, **kwargs)
-        return self.func(*args, **kwargs)
+        if use_cache is not True:
+            return self.func(*args, **kwargs)
+        dependencies = kwargs['_pod'].dependencies
+        try:
+            key = memoize._get_key(args, kwargs)
+        except TypeError:
+            with self._lock:
+                self.uncached += 1
+            return self.func(*args, **kwargs)
+        cached = self._get(key)
+        if cached is SENTINEL:
+            with dependencies.record() as pod_paths:
+                value = self.func(*args, **kwargs)
+            self._set(key, (value, pod_paths))
+        else:
+            value, pod_paths = cached
+        dependencies.update(pod_paths)
+        dependencies.update_from_value(value)
+        return value
 
 
 def every_two(l):
     return zip(l[::2], l[1::2])
 
 
+class LazyValue(object):
+    """A value loaded on first use.
+
+    The YAML tags that load other files (such as `!g.doc` and `!g.yaml`)
+    create lazy values, so that parsing a document doesn't load every document
+    and file it references. A lazy value forwards attribute and item access,
+    iteration, comparisons and conversions to its loaded value. If the class of
+    the value is known in advance (a Document for `!g.doc`), `isinstance`
+    checks don't load it.
+    """
+
+    def __init__(self, load, cls=None):
+        object.__setattr__(self, '_load', load)
+        object.__setattr__(self, '_cls', cls)
+        object.__setattr__(self, '_value', SENTINEL)
+
+    def _get_value(self):
+        value = object.__getattribute__(self, '_value')
+        if value is SENTINEL:
+            value = object.__getattribute__(self, '_load')()
+            object.__setattr__(self, '_value', value)
+        return value
+
+    @property
+    def __class__(self):
+        cls = object.__getattribute__(self, '_cls')
+        return cls if cls is not None else self._get_value().__class__
+
+    def __getattr__(self, name):
+        return getattr(self._get_value(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get_value(), name, value)
+
+    def __getitem__(self, key):
+        return self._get_value()[key]
+
+    def __setitem__(self, key, value):
+        self._get_value()[key] = value
+
+    def __delitem__(self, key):
+        del self._get_value()[key]
+
+    def __iter__(self):
+        return iter(self._get_value())
+
+    def __len__(self):
+        return len(self._get_value())
+
+    def __contains__(self, item):
+        return item in self._get_value()
+
+    def __nonzero__(self):
+        return bool(self._get_value())
+
+    def __call__(self, *args, **kwargs):
+        return self._get_value()(*args, **kwargs)
+
+    def __eq__(self, other):
+        return self._get_value() == resolve_lazy(other)
+
+    def __ne__(self, other):
+        return self._get_value() != resolve_lazy(other)
+
+    def __lt__(self, other):
+        return self._get_value() < resolve_lazy(other)
+
+    def __le__(self, other):
+        return self._get_value() <= resolve_lazy(other)
+
+    def __gt__(self, other):
+        return self._get_value() > resolve_lazy(other)
+
+    def __ge__(self, other):
+        return self._get_value() >= resolve_lazy(other)
+
+    def __hash__(self):
+        return hash(self._get_value())
+
+    def __str__(self):
+        return str(self._get_value())
+
+    def __unicode__(self):
+        return unicode(self._get_value())
+
+    def __repr__(self):
+        return repr(self._get_value())
+
+
+def resolve_lazy(value):
+    """Returns the loaded value of a LazyValue, or a value as-is."""
+    if isinstance(value, LazyValue):
+        return value._get_value()
+    return value
+
+
 def make_yaml_loader(pod, doc=None):
+    return _make_yaml_loader(pod, doc.locale if doc else None)
+
+
+@memoize(max_size=256)
+def _make_yaml_loader(pod, locale):
+    """Returns a loader class for a pod and locale, created once rather than
+    for each parse."""
+    from grow.pods import documents
+    from grow.pods import static
+    from grow.pods import urls
+
+    def lazy(func, cls=None):
+        # The file is recorded as read by the document being parsed, so that
+        # the document is parsed again when the file changes.
+        def create(path):
+            pod.dependencies.add(path)
+            return LazyValue(lambda: func(path), cls=cls)
+        return create
+
+    tags_to_funcs = {
+        u'!_': gettext.gettext,
+        u'!g.csv': lazy(lambda path: pod.read_csv(path)),
+        u'!g.doc': lazy(lambda path: pod.get_doc(path, locale=locale),
+                        documents.Document),
+        u'!g.json': lazy(lambda path: pod.read_json(path)),
+        u'!g.static': lazy(lambda path: pod.get_static(path, locale=locale),
+                           static.StaticFile),
+        u'!g.url': lazy(lambda path: pod.get_url(path, locale=locale),
+                        urls.Url),
+        u'!g.yaml': lazy(lambda path: pod.read_yaml(path)),
+    }
+
     class YamlLoader(yaml_Loader):
+        pass
 
-        def _construct_func(self, node, func):
-            if isinstance(node, yaml.SequenceNode):
-                items = []
-                for i, each in enumerate(node.value):
-                    items.append(func(node.value[i].value))
-                return items
-            return func(node.value)
-
-        def construct_csv(self, node):
-            return self._construct_func(node, pod.read_csv)
-
-        def construct_doc(self, node):
-            locale = doc.locale if doc else None
-            func = lambda path: pod.get_doc(path, locale=locale)
-            return self._construct_func(node, func)
-
-        def construct_gettext(self, node):
-            return self._construct_func(node, gettext.gettext)
-
-        def construct_json(self, node):
-            return self._construct_func(node, pod.read_json)
-
-        def construct_static(self, node):
-            locale = doc.locale if doc else None
-            func = lambda path: pod.get_static(path, locale=locale)
-            return self._construct_func(node, func)
-
-        def construct_url(self, node):
-            locale = doc.locale if doc else None
-            func = lambda path: pod.get_url(path, locale=locale)
-            return self._construct_func(node, func)
-
-        def construct_yaml(self, node):
-            return self._construct_func(node, pod.read_yaml)
-
-    YamlLoader.add_constructor(u'!_', YamlLoader.construct_gettext)
-    YamlLoader.add_constructor(u'!g.csv', YamlLoader.construct_csv)
-    YamlLoader.add_constructor(u'!g.doc', YamlLoader.construct_doc)
-    YamlLoader.add_constructor(u'!g.json', YamlLoader.construct_json)
-    YamlLoader.add_constructor(u'!g.static', YamlLoader.construct_static)
-    YamlLoader.add_constructor(u'!g.url', YamlLoader.construct_url)
-    YamlLoader.add_constructor(u'!g.yaml', YamlLoader.construct_yaml)
+    YamlLoader.tags_to_funcs = tags_to_funcs
+    for tag, func in tags_to_funcs.iteritems():
+        YamlLoader.add_constructor(tag, _make_tag_constructor(func))
     return YamlLoader
 
 
+def _make_tag_constructor(func):
+    def construct(loader, node):
+        if isinstance(node, yaml.SequenceNode):
+            return [func(each.value) for each in node.value]
+        return func(node.value)
+    return construct
+
+
+class YamlTag(collections.namedtuple('YamlTag', ['tag', 'value'])):
+    """A tag of YAML loaded by `load_tagged_yaml`, such as `!g.doc`, and its
+    value (a string, or a list of strings)."""
+    __slots__ = ()
+
+
+class _TaggedYamlLoader(yaml_Loader):
+    pass
+
+
+for _tag in (u'!_', u'!g.csv', u'!g.doc', u'!g.json', u'!g.static',
+             u'!g.url', u'!g.yaml'):
+    _TaggedYamlLoader.add_constructor(
+        _tag, _make_tag_constructor(functools.partial(YamlTag, _tag)))
+
+
+def load_tagged_yaml(content):
+    """Loads YAML without a pod, keeping its tags as YamlTag values. The
+    result can be stored, and its tags resolved later by `resolve_yaml_tags`
+    for a pod and document."""
+    return yaml.load(content, Loader=_TaggedYamlLoader)
+
+
+def resolve_yaml_tags(value, pod=None, doc=None):
+    """Returns a copy of YAML loaded by `load_tagged_yaml`, with its tags
+    resolved as `load_yaml` would have."""
+    tags_to_funcs = make_yaml_loader(pod, doc=doc).tags_to_funcs
+    return _resolve_yaml_tags(value, tags_to_funcs)
+
+
+def _resolve_yaml_tags(value, tags_to_funcs):
+    if isinstance(value, YamlTag):
+        func = tags_to_funcs[value.tag]
+        if isinstance(value.value, list):
+            return [func(each) for each in value.value]
+        return func(value.value)
+    if isinstance(value, dict):
+        return dict((key, _resolve_yaml_tags(item, tags_to_funcs))
+                    for key, item in value.iteritems())
+    if isinstance(value, list):
+        return [_resolve_yaml_tags(item, tags_to_funcs) for item in value]
+    return value
+
+
 def load_yaml(*args, **kwargs):
     pod = kwargs.pop('pod', None)
     doc = kwargs.pop('doc', None)
@@ -299,12 +611,13 @@ class DummyDict(object):
 class JsonEncoder(json.JSONEncoder):
 
     def default(self, obj):
+        if isinstance(obj, LazyValue):
+            return obj._get_value()
         if hasattr(obj, 'timetuple'):
             return time.mktime(obj.timetuple())
         raise TypeError(repr(obj) + ' is not JSON serializable.')
 
 
-@memoize
 def untag_fields(fields):
     """Untags fields, handling translation priority."""
     untagged_keys_to_add = {}
@@ -338,19 +651,41 @@ def LocaleIterator(iterator, locale):
             yield line
 
 
+def iter_csv(pod, path, locale=SENTINEL):
+    """Yields a tuple of a CSV file's headers, then a list of the decoded
+    cells of each row. If a locale is given, only the rows starting with the
+    locale are yielded."""
+    with pod.open_file(path) as fp:
+        lines = fp if locale is SENTINEL else LocaleIterator(fp, locale=locale)
+        reader = csv_lib.reader(lines)
+        headers = next(reader, None)
+        if headers is None:
+            return
+        yield tuple(headers)
+        for row in reader:
+            if not row:
+                continue  # Blank lines are skipped, as by csv.DictReader.
+            yield [cell.decode('utf-8') for cell in row]
+
+
+def iter_rows_from_csv(pod, path, locale=SENTINEL):
+    """Yields each row of a CSV file as a dict of its headers to its cells,
+    without storing the file's rows. As with csv.DictReader, cells beyond
+    the headers are listed under None."""
+    rows = iter_csv(pod, path, locale=locale)
+    headers = next(rows, None)
+    if headers is None:
+        return
+    for row in rows:
+        data = dict((header, row[i] if i < len(row) else u'')
+                    for i, header in enumerate(headers))
+        if len(row) > len(headers):
+            data[None] = row[len(headers):]
+        yield data
+
+
 def get_rows_from_csv(pod, path, locale=SENTINEL):
-    fp = pod.open_file(path)
-    if locale is not SENTINEL:
-        fp = LocaleIterator(fp, locale=locale)
-    rows = []
-    for row in csv_lib.DictReader(fp):
-        data = {}
-        for header, cell in row.iteritems():
-            if cell is None:
-                cell = ''
-            data[header] = cell.decode('utf-8')
-        rows.append(data)
-    return rows
+    return list(iter_rows_from_csv(pod, path, locale=locale))
 
 
 def import_string(import_name, paths):
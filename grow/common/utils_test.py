@@ -1,9 +1,13 @@
 from grow.testing import testing
 from grow.common.sdk_utils import get_this_version, LatestVersionCheckError
 from . import utils
+from grow.pods import documents
 import unittest
 import semantic_version
 import mock
+import os
+import tempfile
+import threading
 
 
 class UtilsTestCase(unittest.TestCase):
@@ -37,6 +41,131 @@ class UtilsTestCase(unittest.TestCase):
         ]
         self.assertEqual(expected_docs, result['docs'])
 
+    def test_yaml_loader(self):
+        pod = testing.create_test_pod()
+        doc = pod.get_doc('/content/pages/home.yaml')
+        # Loader classes are created once per pod and locale.
+        self.assertIs(utils.make_yaml_loader(pod, doc),
+                      utils.make_yaml_loader(pod, doc))
+        self.assertIsNot(utils.make_yaml_loader(pod),
+                         utils.make_yaml_loader(pod, doc))
+        # Tags that load other files load them on first use.
+        content = 'doc: !g.doc /content/pages/about.yaml\n'
+        with mock.patch.object(pod, 'get_doc',
+                               wraps=pod.get_doc) as mock_get_doc:
+            result = utils.load_yaml(content, pod=pod)
+            self.assertFalse(mock_get_doc.called)
+            self.assertIsInstance(result['doc'], documents.Document)
+            self.assertFalse(mock_get_doc.called)
+            self.assertEqual('/content/pages/about.yaml',
+                             result['doc'].pod_path)
+            self.assertEqual(1, mock_get_doc.call_count)
+            result['doc'].pod_path
+            self.assertEqual(1, mock_get_doc.call_count)
+        # Walking fields doesn't load them.
+        result = utils.load_yaml(content, pod=pod)
+        utils.walk(result, lambda item, key, node: None)
+        self.assertIs(utils.SENTINEL, result['doc']._value)
+
+    def test_write_file_atomically(self):
+        dir_path = os.path.join(tempfile.mkdtemp(), 'cache')
+        path = os.path.join(dir_path, 'file.txt')
+        utils.write_file_atomically(path, 'content')
+        utils.write_file_atomically(path, 'new content')
+        with open(path) as fp:
+            self.assertEqual('new content', fp.read())
+        self.assertEqual(['file.txt'], os.listdir(dir_path))
+        # Temporary files are removed when writing fails.
+        with mock.patch.object(os, 'rename', side_effect=OSError):
+            with self.assertRaises(OSError):
+                utils.write_file_atomically(path, 'failed')
+        self.assertEqual(['file.txt'], os.listdir(dir_path))
+        with open(path) as fp:
+            self.assertEqual('new content', fp.read())
+
+    def test_memoize(self):
+        calls = []
+
+        @utils.memoize(max_size=2)
+        def func(value, **kwargs):
+            calls.append(value)
+            return [value]
+
+        self.assertEqual([1], func(1))
+        self.assertIs(func(1), func(1))
+        self.assertEqual(1, len(calls))
+        # Unhashable arguments are frozen into keys.
+        self.assertIs(func({'a': [1, 2]}), func({'a': [1, 2]}))
+        self.assertIsNot(func({'a': [1, 2]}), func({'a': (1, 2)}))
+        self.assertIs(func(1, b={'c': set([1])}), func(1, b={'c': set([1])}))
+        # Least recently used values are evicted.
+        func(1)
+        func(2)
+        func(3)
+        self.assertEqual(2, len(func.cache))
+        func(1)
+        self.assertEqual(1, calls.count(3))
+        stats = func.stats
+        self.assertEqual(2, stats['size'])
+        self.assertEqual(5, stats['hits'])
+        self.assertEqual(8, stats['misses'])
+        self.assertEqual(6, stats['evictions'])
+        self.assertIn(stats, utils.get_memoize_stats())
+        # Arguments that can't be frozen aren't cached.
+        func([bytearray('a')])
+        self.assertEqual(1, func.stats['uncached'])
+
+        func.invalidate(1)
+        func(1)
+        self.assertEqual(5, calls.count(1))
+        func.reset()
+        self.assertEqual(0, len(func.cache))
+        utils.reset_memoize_caches()
+
+    def test_memoize_method(self):
+
+        class Counter(object):
+
+            def __init__(self):
+                self.count = 0
+
+            @utils.memoize
+            def get(self, value):
+                self.count += 1
+                return value
+
+        counter = Counter()
+        counter.get(1)
+        counter.get(1)
+        self.assertEqual(1, counter.count)
+        counter.get.invalidate(1)
+        counter.get(1)
+        self.assertEqual(2, counter.count)
+        # Instances are cached separately.
+        other_counter = Counter()
+        other_counter.get(1)
+        self.assertEqual(1, other_counter.count)
+        counter.get.reset()
+        counter.get(1)
+        self.assertEqual(3, counter.count)
+
+    def test_memoize_threads(self):
+        @utils.memoize(max_size=10)
+        def func(value):
+            return value
+
+        def call():
+            for i in range(1000):
+                self.assertEqual(i % 20, func(i % 20))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(10, len(func.cache))
+        self.assertEqual(4000, func.stats['hits'] + func.stats['misses'])
+
     def test_version_enforcement(self):
         with mock.patch('grow.pods.pods.Pod.grow_version', new_callable=mock.PropertyMock) as mock_version:
             this_version = get_this_version()
@@ -44,9 +44,9 @@ class AmazonS3Destination(base.BaseDestination):
                 return boto_connection.create_bucket(self.config.bucket)
             raise
 
-    def dump(self, pod):
-        pod.env = self.get_env()
-        return pod.dump(
+    def dump(self, pod, workers=None, incremental=False):
+        return super(AmazonS3Destination, self).dump(
+            pod, workers=workers, incremental=incremental,
             suffix=self.config.index_document,
             append_slashes=self.config.redirect_trailing_slashes)
 
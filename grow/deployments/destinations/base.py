@@ -70,6 +70,7 @@ from . import messages
 from .. import indexes
 from .. import tests
 from grow.common import utils
+from grow.pods import dependency
 from grow.pods import env
 import inspect
 import io
@@ -111,6 +112,7 @@ class DestinationTestCase(object):
 
 class BaseDestination(object):
     TestCase = DestinationTestCase
+    dependencies_basename = 'dependencies.json'
     diff_basename = 'diff.proto.json'
     index_basename = 'index.proto.json'
     stats_basename = 'stats.proto.json'
@@ -125,6 +127,7 @@ class BaseDestination(object):
         self.pod = None
         self._diff = None
         self._confirm = None
+        self._dependency_graph = None
 
     def __str__(self):
         return self.__class__.__name__
@@ -214,9 +217,38 @@ class BaseDestination(object):
     def login(self, account, reauth=False):
         pass
 
-    def dump(self, pod):
+    def _get_dependency_graph(self, pod):
+        dependency_graph = dependency.DependencyGraph(pod)
+        try:
+            content = self.read_control_file(self.dependencies_basename)
+            dependency_graph.load(content)
+        except (IOError, ValueError):
+            pass
+        return dependency_graph
+
+    def _read_built_file(self, path):
+        try:
+            return self.read_file(path)
+        except (IOError, OSError):
+            return None
+
+    def dump(self, pod, workers=None, incremental=False, **kwargs):
+        """Exports the pod, returning an iterable of (path, content) tuples
+        which is built as it's consumed. When incremental, paths whose
+        dependencies have not changed since the last deployment reuse the
+        content at the destination rather than being rendered again."""
         pod.env = self.get_env()
-        return pod.dump()
+        if incremental:
+            self.pod = pod
+            self._dependency_graph = self._get_dependency_graph(pod)
+            kwargs['dependency_graph'] = self._dependency_graph
+            kwargs['reuse'] = self._read_built_file
+        return pod.iter_dump(workers=workers, **kwargs)
+
+    def _write_dependency_graph(self):
+        if self._dependency_graph is not None:
+            self.write_control_file(self.dependencies_basename,
+                                    self._dependency_graph.to_string())
 
     def deploy(self, paths_to_contents, stats=None,
                repo=None, dry_run=False, confirm=False, test=True):
@@ -224,15 +256,24 @@ class BaseDestination(object):
         self.prelaunch(dry_run=dry_run)
         if test:
             self.test()
+        spool = None
         try:
             deployed_index = self._get_remote_index()
-            new_index = indexes.Index.create(paths_to_contents)
+            if not isinstance(paths_to_contents, dict):
+                # Stream the build into the index, holding on to only the
+                # content that needs to be deployed.
+                spool = indexes.ContentSpool(deployed_index)
+            new_index = indexes.Index.create(paths_to_contents, spool=spool)
+            if spool is not None:
+                paths_to_contents = spool
             if repo:
                 indexes.Index.add_repo(new_index, repo)
             diff = indexes.Diff.create(new_index, deployed_index, repo=repo)
             self._diff = diff
             if indexes.Diff.is_empty(diff):
                 logging.info('Finished with no diffs since the last build.')
+                if not dry_run:
+                    self._write_dependency_graph()
                 return
             if dry_run:
                 return
@@ -247,14 +288,20 @@ class BaseDestination(object):
                 delete_func=self.delete_file, threaded=self.threaded,
                 batch_writes=self.batch_writes)
             self.write_control_file(self.index_basename, indexes.Index.to_string(new_index))
+            self._write_dependency_graph()
             if stats is not None:
                 self.write_control_file(self.stats_basename, stats.to_string())
             else:
-                self.delete_control_file(self.stats_basename)
+                try:
+                    self.delete_control_file(self.stats_basename)
+                except (IOError, OSError):
+                    pass  # No stats from a previous deployment.
             if diff:
                 self.write_control_file(self.diff_basename, indexes.Diff.to_string(diff))
             self.success = True
         finally:
+            if spool is not None:
+                spool.close()
             self.postlaunch()
         return diff
 
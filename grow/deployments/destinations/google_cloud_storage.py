@@ -71,9 +71,9 @@ class GoogleCloudStorageDestination(base.BaseDestination):
                 return gs_connection.create_bucket(self.config.bucket)
             raise
 
-    def dump(self, pod):
-        pod.env = self.get_env()
-        return pod.dump(
+    def dump(self, pod, workers=None, incremental=False):
+        return super(GoogleCloudStorageDestination, self).dump(
+            pod, workers=workers, incremental=incremental,
             suffix=self.config.main_page_suffix,
             append_slashes=self.config.redirect_trailing_slashes)
 
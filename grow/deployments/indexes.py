@@ -10,7 +10,10 @@ import ConfigParser
 import datetime
 import hashlib
 import logging
+import os
 import progressbar
+import shutil
+import tempfile
 import texttable
 
 
@@ -24,6 +27,7 @@ class CorruptIndexError(Error):
 
 class Diff(object):
     POOL_SIZE = 100  # Thread pool size for applying a diff.
+    BATCH_SIZE = 8 * 1024 * 1024  # Bytes of content per batch of writes.
 
     @classmethod
     def is_empty(cls, diff):
@@ -158,6 +162,24 @@ class Diff(object):
     def to_string(cls, message):
         return protojson.encode_message(message)
 
+    @classmethod
+    def _iter_batches(cls, paths, paths_to_content):
+        # Yields dicts of paths to content, each holding up to BATCH_SIZE bytes
+        # (or a single larger file), so that spooled content is only loaded
+        # into memory a batch at a time.
+        batch = {}
+        batch_size = 0
+        for path in paths:
+            content = paths_to_content[path]
+            if batch and batch_size + len(content) > cls.BATCH_SIZE:
+                yield batch
+                batch = {}
+                batch_size = 0
+            batch[path] = content
+            batch_size += len(content)
+        if batch:
+            yield batch
+
     @classmethod
     def apply(cls, message, paths_to_content, write_func, delete_func,
               threaded=True, batch_writes=False):
@@ -175,35 +197,33 @@ class Diff(object):
             func(*args)
             bar.update(bar.currval + 1)
 
+        # Content is read when the write runs, rather than when it's queued,
+        # so that spooled content isn't loaded into memory all at once.
+        def write_with_progress(path):
+            run_with_progress(write_func, path, paths_to_content[path])
+
         if batch_writes:
-            writes_paths_to_contents = {}
-            for file_message in diff.adds:
-                writes_paths_to_contents[file_message.path] = \
-                    paths_to_content[file_message.path]
-            for file_message in diff.edits:
-                writes_paths_to_contents[file_message.path] = \
-                    paths_to_content[file_message.path]
+            writes_paths = [file_message.path
+                            for file_message in diff.adds + diff.edits]
+            for batch in cls._iter_batches(writes_paths, paths_to_content):
+                write_func(batch)
             deletes_paths = [file_message.path for file_message in diff.deletes]
-            if writes_paths_to_contents:
-                write_func(writes_paths_to_contents)
             if deletes_paths:
                 delete_func(deletes_paths)
         else:
             bar.start()
             for file_message in diff.adds:
-                content = paths_to_content[file_message.path]
                 if threaded:
-                    args = (write_func, file_message.path, content)
-                    thread_pool.apply_async(run_with_progress, args=args)
+                    args = (file_message.path,)
+                    thread_pool.apply_async(write_with_progress, args=args)
                 else:
-                    run_with_progress(write_func, file_message.path, content)
+                    write_with_progress(file_message.path)
             for file_message in diff.edits:
-                content = paths_to_content[file_message.path]
                 if threaded:
-                    args = (write_func, file_message.path, content)
-                    thread_pool.apply_async(run_with_progress, args=args)
+                    args = (file_message.path,)
+                    thread_pool.apply_async(write_with_progress, args=args)
                 else:
-                    run_with_progress(write_func, file_message.path, content)
+                    write_with_progress(file_message.path)
             for file_message in diff.deletes:
                 if threaded:
                     args = (delete_func, file_message.path)
@@ -218,17 +238,82 @@ class Diff(object):
             bar.finish()
 
 
+class ContentSpool(object):
+    """Holds the content of changed files until a diff is applied.
+
+    Content is written to a temporary directory, and only for files whose
+    content differs from the deployed index, so an export can be streamed into
+    an index without holding the whole build in memory. Spools are mappings of
+    paths to content, suitable for `Diff.apply`.
+    """
+
+    def __init__(self, theirs=None):
+        self._their_paths_to_shas = {}
+        if theirs is not None:
+            for file_message in theirs.files:
+                self._their_paths_to_shas[file_message.path] = file_message.sha
+        self._paths_to_filenames = {}
+        self._temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, path):
+        return path in self._paths_to_filenames
+
+    def __getitem__(self, path):
+        with open(self._paths_to_filenames[path], 'rb') as fp:
+            return fp.read()
+
+    def __len__(self):
+        return len(self._paths_to_filenames)
+
+    def add(self, path, contents, sha):
+        if self._their_paths_to_shas.get(path) == sha:
+            return
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='grow-')
+        if isinstance(contents, unicode):
+            contents = contents.encode('utf-8')
+        filename = os.path.join(
+            self._temp_dir, str(len(self._paths_to_filenames)))
+        with open(filename, 'wb') as fp:
+            fp.write(contents)
+        self._paths_to_filenames[path] = filename
+
+    def close(self):
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+        self._paths_to_filenames = {}
+
+
 class Index(object):
 
     @classmethod
-    def create(cls, paths_to_contents=None):
+    def create(cls, paths_to_contents=None, spool=None):
+        """Creates an index from a mapping of paths to content, or from an
+        iterable of (path, content) tuples, which is consumed as a stream.
+
+        Args:
+          paths_to_contents: A dict or iterable of (path, content) tuples.
+          spool: A ContentSpool to add the content of each file to.
+        """
         message = messages.IndexMessage()
         message.deployed = datetime.datetime.now()
         message.files = []
         if paths_to_contents is None:
             return message
-        for pod_path, contents in paths_to_contents.iteritems():
+        if isinstance(paths_to_contents, dict):
+            paths_to_contents = paths_to_contents.iteritems()
+        for pod_path, contents in paths_to_contents:
             cls.add_file(message, pod_path, contents)
+            if spool is not None:
+                file_message = message.files[-1]
+                spool.add(file_message.path, contents, file_message.sha)
         return message
 
     @classmethod
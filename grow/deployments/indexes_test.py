@@ -4,6 +4,7 @@ from grow.common import utils
 from grow.pods import pods
 from grow.pods import storage
 from grow.testing import testing
+import mock
 import unittest
 
 
@@ -43,6 +44,66 @@ class IndexTest(unittest.TestCase):
             diff = indexes.Diff.create(my_index, their_index)
             self.assertFilePathsEqual(expected.adds, diff.adds)
 
+    def test_create_from_stream(self):
+        their_index = indexes.Index.create({
+          '/file.txt': 'test',
+          '/file2.txt': 'test',
+        })
+        paths_to_contents = iter([
+          ('/file.txt', 'test'),
+          ('/file2.txt', 'change'),
+          ('/foo/file.txt', u'new'),
+        ])
+        with indexes.ContentSpool(their_index) as spool:
+            my_index = indexes.Index.create(paths_to_contents, spool=spool)
+            self.assertEqual(3, len(my_index.files))
+            # Only changed content is held on to.
+            self.assertNotIn('/file.txt', spool)
+            self.assertEqual('change', spool['/file2.txt'])
+            self.assertEqual('new', spool['/foo/file.txt'])
+            written = {}
+            diff = indexes.Diff.create(my_index, their_index)
+            indexes.Diff.apply(
+                diff, spool, write_func=written.__setitem__,
+                delete_func=written.pop, threaded=False)
+            self.assertEqual({
+                '/file2.txt': 'change',
+                '/foo/file.txt': 'new',
+            }, written)
+        self.assertEqual(0, len(spool))
+
+    def test_apply_batch_writes(self):
+        their_index = indexes.Index.create({
+          '/deleted.txt': 'test',
+          '/file.txt': 'test',
+        })
+        paths_to_contents = {
+          '/file.txt': 'change',
+          '/file2.txt': '12345',
+          '/file3.txt': '12345',
+          '/large.txt': '1234567890',
+        }
+        my_index = indexes.Index.create(paths_to_contents)
+        diff = indexes.Diff.create(my_index, their_index)
+        batches = []
+        deleted = []
+        # Writes are batched up to a size, so that the content of a diff isn't
+        # all read into memory at once.
+        with mock.patch.object(indexes.Diff, 'BATCH_SIZE', 10):
+            indexes.Diff.apply(
+                diff, paths_to_contents, write_func=batches.append,
+                delete_func=deleted.extend, threaded=False,
+                batch_writes=True)
+        self.assertLess(1, len(batches))
+        for batch in batches:
+            self.assertTrue(
+                len(batch) == 1 or sum(map(len, batch.values())) <= 10)
+        written = {}
+        for batch in batches:
+            written.update(batch)
+        self.assertEqual(paths_to_contents, written)
+        self.assertEqual(['/deleted.txt'], deleted)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+"""Merges the outputs of a sharded build into a single deployable fileset.
+
+Each shard of a build (see `grow.pods.shards`) writes its files along with an
+index of them ("index.proto.json") to its own directory. Merging streams the
+files listed in each shard's index to one directory, writing a combined index
+and removing any files left over from a previous merge.
+"""
+
+from . import indexes
+from .destinations import local as local_destination
+
+
+class Error(Exception):
+    pass
+
+
+class ConflictingShardsError(Error):
+    pass
+
+
+def _get_destination(out_dir):
+    config = local_destination.Config(out_dir=out_dir)
+    return local_destination.LocalDestination(config)
+
+
+def _read_index(destination):
+    try:
+        content = destination.read_control_file(destination.index_basename)
+    except IOError:
+        text = 'No index found in shard: {}'.format(destination)
+        raise Error(text)
+    return indexes.Index.from_string(content)
+
+
+def iter_shard_files(shard_dirs):
+    """Yields (path, content) tuples for the files of each shard."""
+    paths_to_shard_dirs = {}
+    for shard_dir in shard_dirs:
+        shard = _get_destination(shard_dir)
+        index = _read_index(shard)
+        for file_message in index.files:
+            path = file_message.path
+            if path in paths_to_shard_dirs:
+                text = 'Path {} was built by shards {} and {}.'.format(
+                    path, paths_to_shard_dirs[path], shard_dir)
+                raise ConflictingShardsError(text)
+            paths_to_shard_dirs[path] = shard_dir
+            yield path, shard.read_file(path)
+
+
+def merge(shard_dirs, out_dir, repo=None):
+    """Merges the outputs of shards into a directory, returning the diff
+    between the merged fileset and the directory's previous contents."""
+    destination = _get_destination(out_dir)
+    return destination.deploy(
+        iter_shard_files(shard_dirs), repo=repo, confirm=False, test=False)
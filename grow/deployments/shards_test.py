@@ -0,0 +1,47 @@
+from . import shards
+from .destinations import local as local_destination
+from grow.pods import pods
+from grow.pods import shards as pod_shards
+from grow.pods import storage
+from grow.testing import testing
+import os
+import tempfile
+import unittest
+
+
+class ShardsTest(unittest.TestCase):
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+
+    def _build(self, out_dir, shard=None):
+        config = local_destination.Config(out_dir=out_dir)
+        destination = local_destination.LocalDestination(config)
+        paths_to_contents = destination.dump(self.pod, shard=shard)
+        destination.deploy(paths_to_contents, confirm=False, test=False)
+
+    def test_merge(self):
+        temp_dir = tempfile.mkdtemp()
+        shard_dirs = []
+        for index in range(2):
+            shard_dir = os.path.join(temp_dir, 'shard-{}'.format(index))
+            self._build(shard_dir, shard=pod_shards.Shard(index, 2))
+            shard_dirs.append(shard_dir)
+        out_dir = os.path.join(temp_dir, 'merged')
+        diff = shards.merge(shard_dirs, out_dir)
+        expected = self.pod.dump()
+        self.assertEqual(len(expected), len(diff.adds))
+        merged_paths = [file_message.path for file_message in diff.adds]
+        self.assertEqual(sorted(expected), sorted(merged_paths))
+        path = os.path.join(out_dir, 'about', 'index.html')
+        with open(path) as fp:
+            self.assertEqual(expected['/about/index.html'], fp.read())
+
+        # Merging a shard twice is a conflict.
+        self.assertRaises(shards.ConflictingShardsError, shards.merge,
+                          [shard_dirs[0], shard_dirs[0]], out_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,16 +8,28 @@ import texttable
 
 class Stats(object):
 
-    def __init__(self, pod, paths_to_contents=None, full=True):
+    def __init__(self, pod, paths_to_contents=None, full=True, paths=None):
         self.full = full
         self.pod = pod
-        if paths_to_contents is None and full:
-            paths_to_contents = pod.export()
-        self.paths_to_contents = paths_to_contents
+        if paths is None:
+            if paths_to_contents is not None:
+                paths = list(paths_to_contents)
+            elif full:
+                paths = [path for path, _ in pod.iter_export()]
+        self.paths = paths
+
+    def track(self, paths_to_contents):
+        """Passes through a stream of (path, content) tuples, recording each
+        path as it's consumed."""
+        if self.paths is None:
+            self.paths = []
+        for path, content in paths_to_contents:
+            self.paths.append(path)
+            yield path, content
 
     def get_num_files_per_type(self):
         file_counts = collections.defaultdict(int)
-        for path in self.paths_to_contents.keys():
+        for path in self.paths or []:
             ext = os.path.splitext(path)[-1]
             file_counts[ext] += 1
         ms = []
@@ -20,6 +20,14 @@ class StatsTest(unittest.TestCase):
         stat = stats.Stats(self.pod)
         stat.to_tables()
 
+    def test_track(self):
+        stat = stats.Stats(self.pod, paths=[])
+        paths_to_contents = stat.track(self.pod.iter_export())
+        self.assertEqual([], stat.paths)
+        paths = [path for path, _ in paths_to_contents]
+        self.assertEqual(paths, stat.paths)
+        stat.to_message()
+
 
 if __name__ == '__main__':
     unittest.main()
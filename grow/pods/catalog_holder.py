@@ -345,12 +345,16 @@ class Catalogs(object):
         template_file.close()
         return catalog
 
-    def find_mo_file(self, locale):
+    def list_mo_paths(self, locale):
+        """Returns the paths that may contain compiled translations for a
+        locale, in order of preference."""
         identifiers = gettext._expand_lang(str(locale))
-        for identifier in identifiers:
-            path = os.path.join(
-                '/translations', identifier, 'LC_MESSAGES',
-                'messages.mo')
+        return [os.path.join('/translations', identifier, 'LC_MESSAGES',
+                             'messages.mo')
+                for identifier in identifiers]
+
+    def find_mo_file(self, locale):
+        for path in self.list_mo_paths(locale):
             try:
                 return path, self.pod.open_file(path)
             except IOError:
@@ -1,5 +1,6 @@
 """Collections contain content documents and blueprints."""
 
+from . import document_index
 from . import documents
 from . import formats
 from . import messages
@@ -82,13 +83,8 @@ class Collection(object):
 
     @classmethod
     def list(cls, pod):
-        for root, dirs, _ in pod.walk(cls.CONTENT_PATH + '/'):
-            for dir_name in dirs:
-                pod_path = os.path.join(root, dir_name)
-                pod_path = pod_path.replace(pod.root, '')
-                col_path = os.path.join(pod_path, '_blueprint.yaml')
-                if pod.file_exists(col_path):
-                    yield pod.get_collection(pod_path)
+        for pod_path in pod.content_manifest.list_collection_paths():
+            yield pod.get_collection(pod_path)
 
     def collections(self):
         """Returns collections contained within this collection. Implemented
@@ -103,7 +99,7 @@ class Collection(object):
     def exists(self):
         """Returns whether the collection exists, as determined by whether
         the collection's blueprint exists."""
-        return self.pod.file_exists(self._blueprint_path)
+        return self.pod.content_manifest.file_exists(self._blueprint_path)
 
     @classmethod
     def create(cls, collection_path, fields, pod):
@@ -124,7 +120,7 @@ class Collection(object):
         """Returns a document contained in this collection."""
         if locale is not None:
             localized_path = formats.Format.localize_path(pod_path, locale)
-            if self.pod.file_exists(localized_path):
+            if self.pod.content_manifest.file_exists(localized_path):
                 pod_path = localized_path
         return documents.Document(pod_path, locale=locale, _pod=self.pod,
                                   _collection=self)
@@ -141,7 +137,7 @@ class Collection(object):
     def yaml(self):
         if not self.exists:
             return {}
-        result = utils.parse_yaml(self.pod.read_file(self._blueprint_path))
+        result = self.pod.snapshot.load_yaml(self._blueprint_path)
         if result is None:
             return {}
         return result
@@ -185,7 +181,11 @@ class Collection(object):
                   include_hidden=False, recursive=True, inject=False):
         reverse = False if reverse is None else reverse
         order_by = 'order' if order_by is None else order_by
-        key = operator.attrgetter(order_by)
+        if order_by.startswith('$'):
+            # Orders by a field, such as "$title", as `query` does.
+            key = lambda doc: document_index.get_value(doc, order_by)
+        else:
+            key = operator.attrgetter(order_by)
         sorted_docs = structures.SortedCollection(key=key)
         if inject:
             injected_docs = self.pod.inject_preprocessors(collection=self)
@@ -193,7 +193,8 @@ class Collection(object):
                 sorted_docs = injected_docs
                 self.pod.logger.info('Injected collection -> {}'.format(self.pod_path))
             return reversed(sorted_docs) if reverse else sorted_docs
-        for path in self.pod.list_dir(self.pod_path, recursive=recursive):
+        for path in self.pod.content_manifest.list_dir(
+                self.pod_path, recursive=recursive):
             pod_path = os.path.join(self.pod_path, path.lstrip('/'))
             slug, ext = os.path.splitext(os.path.basename(pod_path))
             if (slug.startswith('_')
@@ -201,24 +202,9 @@ class Collection(object):
                     or not pod_path):
                 continue
             try:
-                _, locale_from_path = \
-                    formats.Format.parse_localized_path(pod_path)
-                if locale_from_path:
-                    if (locale is not None
-                            and locale in [utils.SENTINEL, locale_from_path]):
-                        new_doc = self.get_doc(pod_path, locale=locale_from_path)
-                        if not include_hidden and new_doc.hidden:
-                            continue
-                        sorted_docs.insert(new_doc)
-                    continue
-                doc = self.get_doc(pod_path)
-                if not include_hidden and doc.hidden:
-                    continue
-                if locale in [utils.SENTINEL, None]:
+                for doc in self._list_docs_for_path(
+                        pod_path, locale=locale, include_hidden=include_hidden):
                     sorted_docs.insert(doc)
-                if locale is None:
-                    continue
-                self._add_localized_docs(sorted_docs, pod_path, locale, doc)
             except Exception as e:
                 logging.error('Error loading doc: {}'.format(pod_path))
                 raise
@@ -229,27 +215,89 @@ class Collection(object):
     # collection.
     docs = list_docs
 
-    def _add_localized_docs(self, sorted_docs, pod_path, locale, doc):
+    def query(self, where=None, category=None, start_date=None, end_date=None,
+              order_by=None, reverse=None, limit=None, offset=None,
+              locale=utils.SENTINEL, include_hidden=False, recursive=True):
+        """Returns a list of the documents matching a query, using indexes
+        of the collection's documents that are shared across queries. See
+        `document_index.DocumentIndex.query`."""
+        index = self.pod.document_indexes.get(
+            self, locale=locale, include_hidden=include_hidden,
+            recursive=recursive)
+        return index.query(
+            where=where, category=category, start_date=start_date,
+            end_date=end_date, order_by=order_by, reverse=reverse,
+            limit=limit, offset=offset)
+
+    def _list_docs_for_path(self, pod_path, locale=utils.SENTINEL,
+                            include_hidden=False):
+        """Returns the documents loaded from a single file: a localized file's
+        document, or a root file's document and its localized documents that
+        don't have their own files."""
+        docs = []
+        _, locale_from_path = formats.Format.parse_localized_path(pod_path)
+        if locale_from_path:
+            if (locale is not None
+                    and locale in [utils.SENTINEL, locale_from_path]):
+                new_doc = self.get_doc(pod_path, locale=locale_from_path)
+                if include_hidden or not new_doc.hidden:
+                    docs.append(new_doc)
+            return docs
+        doc = self.get_doc(pod_path)
+        if not include_hidden and doc.hidden:
+            return docs
+        if locale in [utils.SENTINEL, None]:
+            docs.append(doc)
+        if locale is None:
+            return docs
+        self._add_localized_docs(docs, pod_path, locale, doc)
+        return docs
+
+    def _add_localized_docs(self, docs, pod_path, locale, doc):
         for each_locale in doc.locales:
             if each_locale == doc.default_locale and locale != each_locale:
                 continue
             base, ext = os.path.splitext(pod_path)
             localized_file_path = '{}@{}{}'.format(base, each_locale, ext)
             if (locale in [utils.SENTINEL, each_locale]
-                    and not self.pod.file_exists(localized_file_path)):
+                    and not self.pod.content_manifest.file_exists(
+                        localized_file_path)):
                 new_doc = self.get_doc(pod_path, locale=each_locale)
-                sorted_docs.insert(new_doc)
+                docs.append(new_doc)
+
+    def _is_servable(self, doc, locales=None):
+        return not (self._get_builtin_field('draft')
+                    or not doc.has_serving_path()
+                    or not doc.view
+                    or (locales and doc.locale not in locales))
 
     def list_servable_documents(self, include_hidden=False, locales=None, inject=None):
         docs = []
         inject = False if inject is None else inject
         for doc in self.list_docs(include_hidden=include_hidden, inject=inject):
-            if (self._get_builtin_field('draft')
-                    or not doc.has_serving_path()
-                    or not doc.view
-                    or (locales and doc.locale not in locales)):
-                continue
-            docs.append(doc)
+            if self._is_servable(doc, locales=locales):
+                docs.append(doc)
+        return docs
+
+    def list_servable_documents_for_path(self, pod_path, include_hidden=False):
+        """Returns the servable documents of a file and its localized files
+        (<base>@<locale>.<ext>), given the pod path of any one of them."""
+        root_pod_path, _ = formats.Format.parse_localized_path(pod_path)
+        dirname = os.path.dirname(root_pod_path)
+        pod_paths = []
+        for path in sorted(self.pod.content_manifest.list_dir(
+                dirname, recursive=False)):
+            each_pod_path = os.path.join(dirname, path.lstrip('/'))
+            each_root_pod_path, _ = \
+                formats.Format.parse_localized_path(each_pod_path)
+            if each_root_pod_path == root_pod_path:
+                pod_paths.append(each_pod_path)
+        docs = []
+        for each_pod_path in pod_paths:
+            for doc in self._list_docs_for_path(
+                    each_pod_path, include_hidden=include_hidden):
+                if self._is_servable(doc):
+                    docs.append(doc)
         return docs
 
     @utils.cached_property
@@ -0,0 +1,130 @@
+"""An in-memory index of the files under /content/.
+
+Listing collections, listing a collection's documents and checking for
+blueprints and localized (<base>@<locale>.<ext>) documents would otherwise
+each hit storage. The manifest is built from a single walk of /content/ on
+first use, after which those lookups are set and dict operations.
+
+The manifest is kept current by the pod methods that write, delete and move
+files, and by the dev server's file watcher (see `update` and `reset`).
+Lookups record the same dependencies as the storage operations they replace.
+"""
+
+import collections
+import os
+import threading
+
+
+class ContentManifest(object):
+    CONTENT_PATH = '/content'
+
+    def __init__(self, pod):
+        self.pod = pod
+        self._lock = threading.RLock()
+        self._dirs_to_filenames = None
+        self._files = None
+        self._subdirs = None
+
+    def _ensure_loaded(self):
+        if self._dirs_to_filenames is not None:
+            return
+        # Maps directory pod paths (in the order they're walked) to the names
+        # of the files directly within them.
+        dirs_to_filenames = collections.OrderedDict()
+        # Directories in the order their parents are walked, the order in
+        # which collections have always been listed.
+        subdirs = []
+        files = set()
+        for root, dirs, filenames in self.pod.storage.walk(
+                self.pod.abs_path(self.CONTENT_PATH + '/')):
+            dirname = self._get_pod_path(root)
+            dirs_to_filenames[dirname] = list(filenames)
+            subdirs += [os.path.join(dirname, name) for name in dirs]
+            files.update(os.path.join(dirname, name) for name in filenames)
+        self._subdirs = subdirs
+        self._files = files
+        self._dirs_to_filenames = dirs_to_filenames
+
+    def _get_pod_path(self, path):
+        return '/' + path[len(self.pod.root):].strip('/')
+
+    def _contains(self, pod_path):
+        return (pod_path + '/').startswith(self.CONTENT_PATH + '/')
+
+    def file_exists(self, pod_path):
+        """Returns whether a file exists."""
+        if not self._contains(pod_path):
+            return self.pod.file_exists(pod_path)
+        with self._lock:
+            self.pod.dependencies.add(pod_path)
+            self._ensure_loaded()
+            return pod_path in self._files
+
+    def list_dir(self, pod_path, recursive=True):
+        """Returns the paths of the files in a directory, relative to it, like
+        `Pod.list_dir`."""
+        if not self._contains(pod_path.rstrip('/')):
+            return self.pod.list_dir(pod_path, recursive=recursive)
+        with self._lock:
+            self.pod.dependencies.add_dir(pod_path)
+            self._ensure_loaded()
+            dirname = pod_path.rstrip('/')
+            paths = []
+            for each_dirname, filenames in self._dirs_to_filenames.iteritems():
+                if each_dirname == dirname:
+                    prefix = '/'
+                elif recursive and each_dirname.startswith(dirname + '/'):
+                    prefix = each_dirname[len(dirname):] + '/'
+                else:
+                    continue
+                paths += [prefix + filename for filename in filenames]
+            return paths
+
+    def list_collection_paths(self):
+        """Returns the pod paths of directories containing blueprints."""
+        with self._lock:
+            self.pod.dependencies.add_dir(self.CONTENT_PATH + '/')
+            self._ensure_loaded()
+            blueprint_path = '_blueprint.yaml'
+            return [dirname for dirname in self._subdirs
+                    if blueprint_path in self._dirs_to_filenames.get(dirname, [])]
+
+    def update(self, pod_path):
+        """Updates the manifest for a file that was added, modified or
+        removed."""
+        with self._lock:
+            if self._dirs_to_filenames is None or not self._contains(pod_path):
+                return
+            if pod_path.rstrip('/') in self._dirs_to_filenames:
+                self.reset()  # A directory.
+                return
+            exists = self.pod.storage.exists(self.pod.abs_path(pod_path))
+            if exists == (pod_path in self._files):
+                return
+            dirname, filename = os.path.split(pod_path)
+            if exists:
+                self._add_dir(dirname)
+                self._dirs_to_filenames[dirname].append(filename)
+                self._files.add(pod_path)
+            else:
+                filenames = self._dirs_to_filenames.get(dirname, [])
+                if filename in filenames:
+                    filenames.remove(filename)
+                self._files.discard(pod_path)
+
+    def _add_dir(self, dirname):
+        if dirname in self._dirs_to_filenames:
+            return
+        parent = os.path.dirname(dirname)
+        if dirname != self.CONTENT_PATH and parent != dirname:
+            self._add_dir(parent)
+        self._dirs_to_filenames[dirname] = []
+        if dirname != self.CONTENT_PATH:
+            self._subdirs.append(dirname)
+
+    def reset(self):
+        """Rebuilds the manifest on next use."""
+        with self._lock:
+            self._dirs_to_filenames = None
+            self._files = None
+            self._subdirs = None
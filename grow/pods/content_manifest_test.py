@@ -0,0 +1,67 @@
+from . import pods
+from . import storage
+from grow.testing import testing
+import mock
+import unittest
+
+
+class ContentManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+
+    def test_list_collections(self):
+        expected = [
+            collection.pod_path for collection in self.pod.list_collections()]
+        self.assertIn('/content/pages', expected)
+        # Lookups don't hit storage once the manifest is built.
+        with mock.patch.object(self.pod.storage, 'walk') as mock_walk, \
+                mock.patch.object(self.pod.storage, 'listdir') as mock_listdir:
+            self.assertEqual(expected, [
+                collection.pod_path
+                for collection in self.pod.list_collections()])
+            collection = self.pod.get_collection('pages')
+            docs = collection.list_docs()
+            self.assertFalse(mock_walk.called)
+            self.assertFalse(mock_listdir.called)
+        self.assertIn('/content/pages/about.yaml',
+                      [doc.pod_path for doc in docs])
+
+    def test_list_dir(self):
+        manifest = self.pod.content_manifest
+        self.assertEqual(
+            sorted(self.pod.list_dir('/content/pages/')),
+            sorted(path.lstrip('/')
+                   for path in manifest.list_dir('/content/pages/')))
+        self.assertEqual(
+            sorted(self.pod.list_dir('/content/', recursive=False)),
+            sorted(path.lstrip('/') for path in manifest.list_dir(
+                '/content/', recursive=False)))
+
+    def test_update(self):
+        manifest = self.pod.content_manifest
+        self.assertFalse(manifest.file_exists('/content/new/_blueprint.yaml'))
+        self.pod.write_file('/content/new/_blueprint.yaml', 'path: /{base}/\n')
+        self.pod.write_file('/content/new/doc@de.yaml', '$title: Doc\n')
+        self.assertTrue(manifest.file_exists('/content/new/doc@de.yaml'))
+        self.assertIn('/content/new', manifest.list_collection_paths())
+        self.assertEqual(['/doc@de.yaml', '/_blueprint.yaml'],
+                         sorted(manifest.list_dir('/content/new'),
+                                reverse=True))
+        self.pod.delete_file('/content/new/doc@de.yaml')
+        self.assertFalse(manifest.file_exists('/content/new/doc@de.yaml'))
+        self.assertEqual(['/_blueprint.yaml'],
+                         manifest.list_dir('/content/new'))
+
+    def test_record_dependencies(self):
+        manifest = self.pod.content_manifest
+        with self.pod.dependencies.record() as pod_paths:
+            manifest.file_exists('/content/pages/about.yaml')
+            manifest.list_dir('/content/pages')
+        self.assertEqual(
+            set(['/content/pages/about.yaml', '/content/pages/']), pod_paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
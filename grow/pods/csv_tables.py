@@ -0,0 +1,179 @@
+"""Parsed CSV files, cached and indexed for lookups.
+
+Templates often read a CSV data file on every page, either to list its rows
+or to look up a single row by key. Each CSV file (or each locale's rows of a
+file) is parsed once into a `CsvTable` and kept until the file's stamp
+(modification time and size) changes.
+
+Tables store their cells by column, with equal cells of a column sharing a
+single string, and create a dict for a row only when the row is used. A table
+can be indexed by a column, so that looking up a row by key doesn't scan the
+table:
+
+    {% set product = g.csv('/data/products.csv', index='sku')['A-100'] %}
+
+Without an index, `g.csv` returns a list of the rows, copied from the table.
+
+Large files that are read once can be streamed a row at a time with
+`Pod.iter_csv`, without being stored.
+"""
+
+from . import dependency
+from grow.common import utils
+import collections
+import threading
+
+
+class CsvIndex(object):
+    """The rows of a table, keyed by the values of a column. Looking up a key
+    returns the first row with the value."""
+
+    def __init__(self, table, values_to_positions):
+        self.table = table
+        self._values_to_positions = values_to_positions
+
+    def __contains__(self, key):
+        return key in self._values_to_positions
+
+    def __getitem__(self, key):
+        return self.table[self._values_to_positions[key][0]]
+
+    def __iter__(self):
+        return iter(self._values_to_positions)
+
+    def __len__(self):
+        return len(self._values_to_positions)
+
+    def get(self, key, default=None):
+        if key in self._values_to_positions:
+            return self[key]
+        return default
+
+    def get_all(self, key):
+        """Returns every row with a value, in the table's order."""
+        return [self.table[position]
+                for position in self._values_to_positions.get(key, [])]
+
+    def keys(self):
+        return self._values_to_positions.keys()
+
+
+class CsvTable(collections.Sequence):
+    """The rows of a CSV file, each a dict of the file's headers to the row's
+    cells, stored by column. As with csv.DictReader, cells beyond the headers
+    are listed under None."""
+
+    def __init__(self, headers, columns, extras=None):
+        self.headers = headers
+        self._columns = columns
+        # Maps the positions of rows with cells beyond the headers to them.
+        self._extras = extras or {}
+        self._names_to_indexes = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Returns a table of the headers and rows yielded by
+        `utils.iter_csv`."""
+        headers = next(rows, ())
+        columns = [[] for _ in headers]
+        values = [{} for _ in headers]
+        extras = {}
+        for position, row in enumerate(rows):
+            for i, column in enumerate(columns):
+                cell = row[i] if i < len(row) else u''
+                # Equal cells of a column share one string.
+                column.append(values[i].setdefault(cell, cell))
+            if len(row) > len(headers):
+                extras[position] = tuple(row[len(headers):])
+        return cls(headers, [tuple(column) for column in columns], extras)
+
+    def _create_row(self, position, cells):
+        row = dict(zip(self.headers, cells))
+        if position in self._extras:
+            row[None] = list(self._extras[position])
+        return row
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if not isinstance(position, (int, long)):
+            raise TypeError('Rows are looked up by position, or by key with'
+                            ' an index: {!r}'.format(position))
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('Row index out of range: {}'.format(position))
+        return self._create_row(
+            position, [column[position] for column in self._columns])
+
+    def __iter__(self):
+        for position, cells in enumerate(zip(*self._columns)):
+            yield self._create_row(position, cells)
+
+    def __repr__(self):
+        return '<CsvTable(headers={}, rows={})>'.format(
+            list(self.headers), len(self))
+
+    def get_column(self, name):
+        """Returns a column's cells, in row order."""
+        # As with dicts of rows, the last of duplicate headers is used.
+        for header, column in reversed(zip(self.headers, self._columns)):
+            if header == name:
+                return column
+        raise KeyError(name)
+
+    def get_index(self, name):
+        """Returns the rows keyed by the values of a column, built on first
+        use."""
+        with self._lock:
+            index = self._names_to_indexes.get(name)
+            if index is None:
+                values_to_positions = {}
+                for position, value in enumerate(self.get_column(name)):
+                    values_to_positions.setdefault(value, []).append(position)
+                index = CsvIndex(self, values_to_positions)
+                self._names_to_indexes[name] = index
+        return index
+
+
+class CsvTableCache(object):
+    """The tables of a pod's CSV files, keyed by pod path and locale."""
+
+    def __init__(self, pod):
+        self.pod = pod
+        self._keys_to_entries = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys_to_entries)
+
+    def get(self, pod_path, locale=utils.SENTINEL):
+        """Returns the table of a CSV file, or of the rows of the file for a
+        locale. Tables are parsed again when their file changes."""
+        locale_key = locale if locale is utils.SENTINEL else str(locale)
+        key = (pod_path, locale_key)
+        stamp = dependency.get_stamp(self.pod, pod_path)
+        with self._lock:
+            entry = self._keys_to_entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.pod.dependencies.add(pod_path)
+            return entry[1]
+        table = CsvTable.from_rows(
+            utils.iter_csv(self.pod, pod_path, locale=locale))
+        with self._lock:
+            self._keys_to_entries[key] = (stamp, table)
+        return table
+
+    def invalidate(self, pod_path):
+        with self._lock:
+            for key in self._keys_to_entries.keys():
+                if key[0] == pod_path:
+                    del self._keys_to_entries[key]
+
+    def reset(self):
+        with self._lock:
+            self._keys_to_entries = {}
@@ -0,0 +1,99 @@
+from . import pods
+from . import storage
+from grow.common import utils
+from grow.pods import tags
+from grow.testing import testing
+import mock
+import unittest
+
+
+class CsvTablesTest(unittest.TestCase):
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.pod.write_file('/data/products.csv', (
+            'sku,name,color\n'
+            'a-1,Shirt,red\n'
+            '\n'
+            'b-2,Hat,blue\n'
+            'c-3,Scarf,red\n'
+            'de-4,Sock\n'
+            'e-5,Glove,green,wool,small\n'))
+
+    def test_table(self):
+        table = self.pod.csv_tables.get('/data/products.csv')
+        self.assertEqual(5, len(table))
+        self.assertEqual(('sku', 'name', 'color'), table.headers)
+        self.assertEqual({'sku': 'a-1', 'name': 'Shirt', 'color': 'red'},
+                         table[0])
+        self.assertEqual({'sku': 'de-4', 'name': 'Sock', 'color': ''},
+                         table[-2])
+        # Cells beyond the headers are listed under None.
+        self.assertEqual({'sku': 'e-5', 'name': 'Glove', 'color': 'green',
+                          None: ['wool', 'small']}, table[-1])
+        self.assertEqual(['Hat', 'Scarf'],
+                         [row['name'] for row in table[1:3]])
+        self.assertEqual(self.pod.read_csv('/data/products.csv'), list(table))
+        self.assertEqual((u'red', u'blue', u'red', u'', u'green'),
+                         table.get_column('color'))
+        # Equal cells share a string.
+        self.assertIs(table.get_column('color')[0],
+                      table.get_column('color')[2])
+        self.assertRaises(IndexError, lambda: table[5])
+        self.assertRaises(TypeError, lambda: table['a-1'])
+
+    def test_index(self):
+        index = self.pod.csv_tables.get('/data/products.csv').get_index('sku')
+        self.assertEqual('Hat', index['b-2']['name'])
+        self.assertIn('c-3', index)
+        self.assertIsNone(index.get('missing'))
+        self.assertRaises(KeyError, lambda: index['missing'])
+        index = self.pod.csv_tables.get('/data/products.csv').get_index('color')
+        self.assertEqual('Shirt', index['red']['name'])
+        self.assertEqual(['Shirt', 'Scarf'],
+                         [row['name'] for row in index.get_all('red')])
+        self.assertEqual(4, len(index))
+
+    def test_locale(self):
+        table = self.pod.csv_tables.get('/data/products.csv', locale='de')
+        self.assertEqual(['de-4'], [row['sku'] for row in table])
+        self.assertEqual(
+            table[0], self.pod.read_csv('/data/products.csv', locale='de')[0])
+
+    def test_cache(self):
+        table = self.pod.csv_tables.get('/data/products.csv')
+        with mock.patch.object(utils, 'iter_csv') as mock_iter_csv:
+            self.assertIs(table, self.pod.csv_tables.get('/data/products.csv'))
+            self.assertFalse(mock_iter_csv.called)
+        with self.pod.dependencies.record() as pod_paths:
+            self.pod.csv_tables.get('/data/products.csv')
+        self.assertEqual(set(['/data/products.csv']), pod_paths)
+        # Rows are copies, so that modifying them doesn't modify the table.
+        self.pod.read_csv('/data/products.csv')[0]['name'] = 'Modified'
+        self.assertEqual('Shirt', table[0]['name'])
+        # Changed files are parsed again.
+        self.pod.write_file('/data/products.csv', 'sku,name\na-1,Coat\n')
+        table = self.pod.csv_tables.get('/data/products.csv')
+        self.assertEqual([{'sku': 'a-1', 'name': 'Coat'}], list(table))
+
+    def test_csv_tag(self):
+        row = tags.csv('/data/products.csv', index='sku', _pod=self.pod)['a-1']
+        self.assertEqual('Shirt', row['name'])
+        # Without an index, rows are listed.
+        rows = tags.csv('/data/products.csv', _pod=self.pod)
+        self.assertIsInstance(rows, list)
+        self.assertEqual(self.pod.read_csv('/data/products.csv'), rows)
+        rows[0]['name'] = 'Modified'
+        self.assertEqual(
+            'Shirt', tags.csv('/data/products.csv', _pod=self.pod)[0]['name'])
+
+    def test_iter_csv(self):
+        rows = list(self.pod.iter_csv('/data/products.csv'))
+        # Streamed rows aren't cached.
+        self.assertEqual(0, len(self.pod.csv_tables))
+        self.assertEqual(self.pod.read_csv('/data/products.csv'), rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""Dependency tracking for incremental builds.
+
+While a path is rendered, the pod records every file it reads (documents,
+blueprints, templates, data files, translation catalogs, etc.). The resulting
+`DependencyGraph` maps each output path to the files it was built from, along
+with a stamp of each file's state at build time. On the next build, paths
+whose inputs are unchanged can reuse their previously built content.
+
+Directory listings are recorded with a trailing slash (e.g. "/content/posts/")
+so that adding or removing a file invalidates paths that listed the directory.
+"""
+
+from . import documents
+from grow.common import config
+from grow.common import structures
+from protorpc import protojson
+import contextlib
+import hashlib
+import jinja2
+import json
+import threading
+
+
+def get_signature(pod):
+    """Returns a hash of the build-wide inputs of a pod: the SDK version, the
+    podspec and the environment config."""
+    sha = hashlib.sha1()
+    sha.update(config.VERSION)
+    if pod.file_exists('/podspec.yaml'):
+        sha.update(pod.read_file('/podspec.yaml'))
+    sha.update(protojson.encode_message(pod.env.config))
+    return sha.hexdigest()
+
+
+def get_stamp(pod, pod_path):
+    """Returns a value that changes when the file (or, for paths ending in a
+    slash, the directory listing) at the pod path changes."""
+    if pod_path.endswith('/'):
+        try:
+            listing = sorted(pod.list_dir(pod_path))
+        except (IOError, OSError):
+            return None
+        return hashlib.md5('\n'.join(listing)).hexdigest()
+    try:
+        return '{!r}-{}'.format(pod.file_modified(pod_path),
+                                pod.file_size(pod_path))
+    except (IOError, OSError):
+        return None
+
+
+class DependencyTracker(object):
+    """Records the pod paths read while rendering.
+
+    Recording is thread-local and may be nested. A path added while several
+    recordings are active is added to each of them.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def _active(self):
+        try:
+            return self._local.active
+        except AttributeError:
+            self._local.active = []
+            return self._local.active
+
+    @property
+    def is_recording(self):
+        return bool(self._active)
+
+    @contextlib.contextmanager
+    def record(self):
+        """Records the pod paths read within the context into a set."""
+        pod_paths = set()
+        self._active.append(pod_paths)
+        try:
+            yield pod_paths
+        finally:
+            self._active.pop()
+
+    def add(self, pod_path):
+        active = self._active
+        if not active:
+            return
+        pod_path = '/' + pod_path.lstrip('/')
+        for pod_paths in active:
+            pod_paths.add(pod_path)
+
+    def add_dir(self, pod_path):
+        self.add(pod_path.rstrip('/') + '/')
+
+    def update(self, pod_paths):
+        for pod_path in pod_paths:
+            self.add(pod_path)
+
+    def update_from_value(self, value):
+        """Adds the dependencies of documents contained in a value, such as the
+        cached result of a template tag."""
+        if not self.is_recording:
+            return
+        if isinstance(value, documents.Document):
+            value = [value]
+        elif not isinstance(value, (list, tuple, structures.SortedCollection)):
+            return
+        for item in value:
+            if isinstance(item, documents.Document):
+                self.update(item._dependencies)
+
+
+class Environment(jinja2.Environment):
+    """A Jinja environment that records the templates it loads from the pod.
+
+    Templates are recorded on every load, rather than from the loader, because
+    the loader is only consulted when a template is not already cached.
+    """
+
+    def __init__(self, dependencies, *args, **kwargs):
+        self.dependencies = dependencies
+        super(Environment, self).__init__(*args, **kwargs)
+
+    def get_template(self, name, parent=None, globals=None):
+        if isinstance(name, basestring):
+            self.dependencies.add(self.join_path(name, parent))
+        return super(Environment, self).get_template(
+            name, parent=parent, globals=globals)
+
+
+class DependencyGraph(object):
+    """Maps the paths of a build to the stamps of the pod paths they read."""
+
+    def __init__(self, pod):
+        self.pod = pod
+        self._paths_to_stamps = {}
+        self._current_signature = None
+        self._current_stamps = {}
+
+    def __len__(self):
+        return len(self._paths_to_stamps)
+
+    def __contains__(self, path):
+        return path in self._paths_to_stamps
+
+    def get_signature(self):
+        """Returns the pod's signature. Changing it invalidates every path in
+        the graph."""
+        if self._current_signature is None:
+            self._current_signature = get_signature(self.pod)
+        return self._current_signature
+
+    def get_stamp(self, pod_path):
+        """Returns a value that changes when the file (or, for paths ending in
+        a slash, the directory listing) at the pod path changes."""
+        if pod_path in self._current_stamps:
+            return self._current_stamps[pod_path]
+        stamp = get_stamp(self.pod, pod_path)
+        self._current_stamps[pod_path] = stamp
+        return stamp
+
+    def add(self, path, pod_paths):
+        """Records the pod paths that were read to build a path."""
+        self._paths_to_stamps[path] = dict(
+            (pod_path, self.get_stamp(pod_path)) for pod_path in pod_paths)
+
+    def get_dependencies(self, path):
+        return sorted(self._paths_to_stamps.get(path, {}).keys())
+
+    def is_dirty(self, path):
+        """Returns whether a path must be rebuilt because it has not been built
+        before or because any of the files it read have changed."""
+        stamps = self._paths_to_stamps.get(path)
+        if stamps is None:
+            return True
+        for pod_path, stamp in stamps.iteritems():
+            if self.get_stamp(pod_path) != stamp:
+                return True
+        return False
+
+    def load(self, content):
+        data = json.loads(content)
+        if data.get('signature') == self.get_signature():
+            self._paths_to_stamps = data.get('paths', {})
+
+    def to_string(self):
+        return json.dumps({
+            'signature': self.get_signature(),
+            'paths': self._paths_to_stamps,
+        }, sort_keys=True)
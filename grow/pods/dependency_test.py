@@ -0,0 +1,62 @@
+from . import dependency
+from . import pods
+from . import storage
+from grow.testing import testing
+import os
+import time
+import unittest
+
+
+class DependencyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+
+    def _touch(self, pod_path):
+        path = os.path.join(self.dir_path, pod_path.lstrip('/'))
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+
+    def test_record(self):
+        tracker = dependency.DependencyTracker()
+        with tracker.record() as outer:
+            tracker.add('/foo.yaml')
+            with tracker.record() as inner:
+                tracker.add_dir('/content/pages')
+        tracker.add('/ignored.yaml')
+        self.assertEqual(set(['/foo.yaml', '/content/pages/']), outer)
+        self.assertEqual(set(['/content/pages/']), inner)
+
+    def test_export(self):
+        graph = dependency.DependencyGraph(self.pod)
+        output = self.pod.export(dependency_graph=graph)
+        self.assertIn('/about/', graph)
+        pod_paths = graph.get_dependencies('/about/')
+        self.assertIn('/content/pages/about.yaml', pod_paths)
+        self.assertIn('/content/pages/_blueprint.yaml', pod_paths)
+        self.assertIn('/views/base.html', pod_paths)
+        self.assertFalse(graph.is_dirty('/about/'))
+
+        # Touch a dependency and verify only the affected paths are rebuilt.
+        content = graph.to_string()
+        self._touch('/content/pages/about.yaml')
+        graph = dependency.DependencyGraph(self.pod)
+        graph.load(content)
+        self.assertTrue(graph.is_dirty('/about/'))
+        reused = []
+        def reuse(path):
+            reused.append(path)
+            return output[path]
+        new_output = self.pod.export(dependency_graph=graph, reuse=reuse)
+        self.assertEqual(sorted(output.keys()), sorted(new_output.keys()))
+        self.assertEqual(output['/about/'], new_output['/about/'])
+        self.assertNotIn('/about/', reused)
+        self.assertTrue(reused)
+        for path in reused:
+            self.assertNotIn('/content/pages/about.yaml',
+                             graph.get_dependencies(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Parsed documents, shared by the Document objects of a pod.
+
+`Collection.get_doc` creates a new Document each time a document is
+referenced (by routes, `g.docs`, sitemaps, `!g.doc` tags, etc.). Rather
+than having each one re-read and re-parse its file, documents share the
+parsed format and fields of an entry keyed by pod path and locale.
+
+An entry is reused only while the stamps (modification time and size) of
+the files read to parse it are unchanged. The dev server's file watcher also
+invalidates entries as files change. Entries are shared, so documents that
+modify their fields (see `Document.inject`) copy them first.
+"""
+
+from . import dependency
+from . import formats
+from grow.common import utils
+import threading
+
+
+class DocumentCache(object):
+
+    def __init__(self, pod):
+        self.pod = pod
+        self._keys_to_entries = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys_to_entries)
+
+    @staticmethod
+    def _get_key(doc):
+        locale = doc._locale_kwarg
+        return doc.pod_path, str(locale) if locale is not None else None
+
+    def _get_entry(self, doc):
+        key = DocumentCache._get_key(doc)
+        entry = self._keys_to_entries.get(key)
+        if entry is not None:
+            for pod_path, stamp in entry['stamps'].iteritems():
+                if dependency.get_stamp(self.pod, pod_path) != stamp:
+                    entry = None
+                    break
+        if entry is None:
+            with self.pod.dependencies.record() as pod_paths:
+                format = formats.Format.get(doc)
+            entry = {
+                'format': format,
+                'stamps': dict((pod_path, dependency.get_stamp(self.pod, pod_path))
+                               for pod_path in pod_paths),
+            }
+            with self._lock:
+                self._keys_to_entries[key] = entry
+        else:
+            self.pod.dependencies.update(entry['stamps'])
+        return entry
+
+    def get_format(self, doc):
+        """Returns the shared, parsed format of a document."""
+        return self._get_entry(doc)['format']
+
+    def get_fields(self, doc):
+        """Returns the shared, untagged fields of a document."""
+        entry = self._get_entry(doc)
+        if 'fields' not in entry:
+            # Untagging modifies the format's fields in place. Nothing else
+            # reads them (see `Document.get_tagged_fields`).
+            entry['fields'] = utils.untag_fields(entry['format'].fields) or {}
+        return entry['fields']
+
+    def get_serving_path(self, doc):
+        """Returns the serving path of a document, formatted once per entry and
+        collection unless the document's fields were injected. Paths are
+        reused while the collection's blueprint, the podspec and the
+        document's parent are unchanged."""
+        entry = self._get_entry(doc)
+        if doc.fields is not entry.get('fields'):
+            return doc._create_serving_path()
+        pod_paths = [doc.collection._blueprint_path, '/podspec.yaml']
+        if '$parent' in doc.fields:
+            pod_paths.append(doc.fields['$parent'])
+        stamps = [dependency.get_stamp(self.pod, pod_path)
+                  for pod_path in pod_paths]
+        serving_paths = entry.setdefault('serving_paths', {})
+        stamps_and_path = serving_paths.get(doc.collection.pod_path)
+        if stamps_and_path is None or stamps_and_path[0] != stamps:
+            stamps_and_path = (stamps, doc._create_serving_path())
+            serving_paths[doc.collection.pod_path] = stamps_and_path
+        return stamps_and_path[1]
+
+    def get_dependencies(self, doc):
+        """Returns the pod paths read to parse a document."""
+        return set(self._get_entry(doc)['stamps'])
+
+    def invalidate(self, pod_path):
+        """Removes the entries of the documents that read a file."""
+        with self._lock:
+            for key, entry in self._keys_to_entries.items():
+                if key[0] == pod_path or pod_path in entry['stamps']:
+                    del self._keys_to_entries[key]
+
+    def reset(self):
+        with self._lock:
+            self._keys_to_entries = {}
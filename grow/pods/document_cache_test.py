@@ -0,0 +1,81 @@
+from . import pods
+from . import storage
+from grow.testing import testing
+import mock
+import os
+import time
+import unittest
+
+
+class DocumentCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+
+    def test_get_fields(self):
+        pod_path = '/content/pages/about.yaml'
+        doc = self.pod.get_doc(pod_path)
+        self.assertEqual('About', doc.title)
+        self.assertEqual('About us', doc.fields['$titles']['nav'])
+        # Documents share parsed fields, keyed by locale.
+        with mock.patch('grow.pods.formats.Format.get') as mock_get:
+            same_doc = self.pod.get_doc(pod_path)
+            self.assertIs(doc.fields, same_doc.fields)
+            self.assertFalse(mock_get.called)
+        de_doc = self.pod.get_doc(pod_path, locale='de')
+        self.assertEqual('AboutDE', de_doc.title)
+        # Tagged fields are parsed separately, as untagging modifies fields.
+        self.assertIn('$title@', doc.get_tagged_fields())
+
+        # Changed files are parsed again.
+        path = os.path.join(self.dir_path, pod_path.lstrip('/'))
+        with open(path, 'w') as fp:
+            fp.write('$title: Changed\n')
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+        self.assertEqual('Changed', self.pod.get_doc(pod_path).title)
+
+    def test_invalidate(self):
+        pod_path = '/content/pages/about.yaml'
+        self.pod.get_doc(pod_path).fields
+        num_entries = len(self.pod.document_cache)
+        self.pod.document_cache.invalidate(pod_path)
+        self.assertEqual(num_entries - 1, len(self.pod.document_cache))
+
+    def test_inject(self):
+        pod_path = '/content/pages/about.yaml'
+        doc = self.pod.get_doc(pod_path)
+        doc.inject(fields={'$title': 'Injected'}, body='Injected body.')
+        self.assertEqual('Injected', doc.title)
+        self.assertEqual('Injected body.', doc.body)
+        # Injecting doesn't modify the fields shared with other documents.
+        other_doc = self.pod.get_doc(pod_path)
+        self.assertEqual('About', other_doc.title)
+        self.assertNotEqual('Injected body.', other_doc.body)
+
+    def test_get_serving_path(self):
+        pod_path = '/content/pages/about.yaml'
+        self.assertEqual('/about/', self.pod.get_doc(pod_path).get_serving_path())
+        # Documents share serving paths, keyed by locale and collection.
+        with mock.patch('grow.pods.documents.Document._create_serving_path') \
+                as mock_create_serving_path:
+            doc = self.pod.get_doc(pod_path)
+            self.assertEqual('/about/', doc.get_serving_path())
+            self.assertFalse(mock_create_serving_path.called)
+        doc = self.pod.get_doc(pod_path, locale='de')
+        self.assertEqual('/de_alias/about/', doc.get_serving_path())
+        # Paths are formatted again when the blueprint changes.
+        blueprint_path = '/content/pages/_blueprint.yaml'
+        content = self.pod.read_file(blueprint_path)
+        self.pod.write_file(
+            blueprint_path, content.replace('path: /{base}/', 'path: /p/{base}/'))
+        path = os.path.join(self.dir_path, blueprint_path.lstrip('/'))
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+        doc = self.pod.get_doc(pod_path)
+        self.assertEqual('/p/about/', doc.get_serving_path())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+"""Secondary indexes of collections' documents, for querying them.
+
+Templates that show "related posts" or "latest in category" would otherwise
+list and filter every document of a collection on each page. Instead, the
+documents of a listing (a collection, locale and whether hidden documents and
+subdirectories are included) are loaded once into a `DocumentIndex`, shared
+by every query of the listing until one of its files changes.
+
+An index maps the values of each queried field to the positions of the
+documents that have them, keeps the documents' dates sorted so that date
+ranges can be bisected, and ranks the documents by each `order_by` used.
+Indexes are built on first use, so only the fields that are queried are read.
+"""
+
+from grow.common import utils
+import bisect
+import datetime
+import threading
+
+
+def get_value(doc, name):
+    """Returns a document's value for a field: "$" fields and other fields
+    from the document's fields, and builtin fields (such as "category",
+    "date" or "order") from the document's properties."""
+    if name.startswith('$'):
+        return doc.fields.get(name)
+    try:
+        return getattr(doc, name)
+    except AttributeError:
+        return None
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    return None
+
+
+def _get_sort_key(value):
+    # Documents without a value are ordered first, as by `list_docs` (None
+    # is less than any value), and dates are compared with datetimes.
+    date = _to_datetime(value)
+    return (value is not None, date if date is not None else value)
+
+
+def _hashable_values(value):
+    # Documents are indexed under each item of a list field, so that
+    # `where={'tags': 'news'}` matches documents tagged "news".
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    for each in values:
+        try:
+            hash(each)
+        except TypeError:
+            continue
+        yield each
+
+
+class DocumentIndex(object):
+    """Indexes of a list of documents, in their listing order."""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+        # Values derived from the documents, such as menus, that are shared
+        # for as long as the index.
+        self.cache = {}
+        self._lock = threading.RLock()
+        self._names_to_values = {}
+        self._pod_paths_to_positions = None
+        self._names_to_orders = {}
+        self._names_to_ranks = {}
+        self._dates = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def get_position(self, doc):
+        """Returns the position of the first document with a document's pod
+        path, or None."""
+        with self._lock:
+            if self._pod_paths_to_positions is None:
+                pod_paths_to_positions = {}
+                for position, each in enumerate(self.docs):
+                    pod_paths_to_positions.setdefault(each.pod_path, position)
+                self._pod_paths_to_positions = pod_paths_to_positions
+        return self._pod_paths_to_positions.get(doc.pod_path)
+
+    def get_positions(self, name, value):
+        """Returns the positions of the documents with a value for a field."""
+        with self._lock:
+            values_to_positions = self._names_to_values.get(name)
+            if values_to_positions is None:
+                values_to_positions = {}
+                for position, doc in enumerate(self.docs):
+                    for each in _hashable_values(get_value(doc, name)):
+                        values_to_positions.setdefault(each, []).append(position)
+                self._names_to_values[name] = values_to_positions
+        try:
+            return values_to_positions.get(value, [])
+        except TypeError:
+            return []
+
+    def get_positions_between(self, start=None, end=None):
+        """Returns the positions of the documents dated between two dates,
+        inclusive."""
+        with self._lock:
+            if self._dates is None:
+                dates = []
+                for position, doc in enumerate(self.docs):
+                    date = _to_datetime(doc.date)
+                    if date is not None:
+                        dates.append((date, position))
+                self._dates = sorted(dates)
+        start = _to_datetime(start)
+        end = _to_datetime(end)
+        lower = 0
+        upper = len(self._dates)
+        if start is not None:
+            lower = bisect.bisect_left(self._dates, (start, -1))
+        if end is not None:
+            upper = bisect.bisect_right(self._dates, (end, len(self.docs)))
+        return [position for _, position in self._dates[lower:upper]]
+
+    def get_order(self, order_by):
+        """Returns the positions of the documents ordered by a field, ties
+        keeping their listing order and documents without the field first."""
+        with self._lock:
+            order = self._names_to_orders.get(order_by)
+            if order is None:
+                keys = [_get_sort_key(get_value(doc, order_by))
+                        for doc in self.docs]
+                order = sorted(range(len(keys)), key=keys.__getitem__)
+                self._names_to_orders[order_by] = order
+        return order
+
+    def get_ranks(self, order_by):
+        """Returns the rank of each position when ordered by a field."""
+        with self._lock:
+            ranks = self._names_to_ranks.get(order_by)
+            if ranks is None:
+                ranks = [None] * len(self.docs)
+                for rank, position in enumerate(self.get_order(order_by)):
+                    ranks[position] = rank
+                self._names_to_ranks[order_by] = ranks
+        return ranks
+
+    def query(self, where=None, category=None, start_date=None, end_date=None,
+              order_by=None, reverse=False, limit=None, offset=None):
+        """Returns the documents matching a query.
+
+        Args:
+          where: A dict of field names to values. Documents match if their
+              value (or, for list fields, any item) equals the given value,
+              or any item of a given list, tuple or set.
+          category: The category of matching documents.
+          start_date: The earliest date of matching documents.
+          end_date: The latest date of matching documents.
+          order_by: The field to order by, "order" by default.
+          reverse: Whether to reverse the order.
+          limit: The maximum number of documents to return.
+          offset: The number of documents to skip.
+        """
+        conditions = dict(where or {})
+        if category is not None:
+            conditions['category'] = category
+        positions = None
+        for name, value in sorted(conditions.iteritems()):
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            matches = set()
+            for each in values:
+                matches.update(self.get_positions(name, each))
+            positions = matches if positions is None else positions & matches
+        if start_date is not None or end_date is not None:
+            matches = set(self.get_positions_between(start_date, end_date))
+            positions = matches if positions is None else positions & matches
+        order_by = 'order' if order_by is None else order_by
+        start = offset or 0
+        end = None if limit is None else start + limit
+        if positions is None:
+            # Slices the shared order, without sorting or copying it whole.
+            order = self.get_order(order_by)
+            if reverse:
+                size = len(order)
+                end = size if end is None else min(end, size)
+                start = min(start, size)
+                positions = order[size - end:size - start][::-1]
+            else:
+                positions = order[start:end]
+        else:
+            ranks = self.get_ranks(order_by)
+            positions = sorted(positions, key=ranks.__getitem__,
+                               reverse=bool(reverse))[start:end]
+        return [self.docs[position] for position in positions]
+
+
+class DocumentIndexCache(object):
+    """The indexes of a pod's collections, keyed by listing."""
+
+    def __init__(self, pod):
+        self.pod = pod
+        self._keys_to_entries = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys_to_entries)
+
+    def get(self, collection, locale=utils.SENTINEL, include_hidden=False,
+            recursive=True):
+        """Returns the index of a collection's documents, built on first use.
+        Reusing an index records the files read to build it."""
+        locale_key = locale if locale in [utils.SENTINEL, None] else str(locale)
+        key = (collection.pod_path, locale_key, include_hidden, recursive)
+        with self._lock:
+            entry = self._keys_to_entries.get(key)
+            if entry is None:
+                with self.pod.dependencies.record() as pod_paths:
+                    docs = collection.list_docs(
+                        locale=locale, include_hidden=include_hidden,
+                        recursive=recursive)
+                    index = DocumentIndex(docs)
+                pod_paths.update(doc.pod_path for doc in index.docs)
+                entry = (index, set(pod_paths))
+                self._keys_to_entries[key] = entry
+            else:
+                self.pod.dependencies.update(entry[1])
+        return entry[0]
+
+    def invalidate(self, pod_path):
+        """Removes the indexes of the listings that read or contain a file."""
+        with self._lock:
+            for key, (_, pod_paths) in self._keys_to_entries.items():
+                if (pod_path.startswith(key[0].rstrip('/') + '/')
+                        or pod_path in pod_paths):
+                    del self._keys_to_entries[key]
+
+    def reset(self):
+        with self._lock:
+            self._keys_to_entries = {}
@@ -0,0 +1,121 @@
+from . import document_index
+from . import pods
+from . import storage
+from grow.pods import tags
+from grow.testing import testing
+import datetime
+import mock
+import unittest
+
+
+class DocumentIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.pod.write_yaml('/content/news/_blueprint.yaml', {
+            '$path': '/news/{base}/',
+            '$view': '/views/base.html',
+        })
+        self._write('a', order=3, category='tech', date='2016-01-03',
+                    tags=['python', 'web'])
+        self._write('b', order=1, category='tech', date='2016-01-01',
+                    tags=['go'])
+        self._write('c', order=2, category='life', date='2016-01-02',
+                    tags=['web'])
+        self._write('d', order=4, category='life')
+        self.collection = self.pod.get_collection('/content/news/')
+
+    def _write(self, basename, order, category, date=None, tags=None):
+        content = '$order: {}\n$category: {}\n'.format(order, category)
+        if date:
+            content += '$date: {}\n'.format(date)
+        if tags:
+            content += 'tags: [{}]\n'.format(', '.join(tags))
+        self.pod.write_file('/content/news/{}.yaml'.format(basename), content)
+
+    def _query(self, **kwargs):
+        docs = self.collection.query(**kwargs)
+        return [doc.base for doc in docs]
+
+    def test_query(self):
+        self.assertEqual(['b', 'c', 'a', 'd'], self._query())
+        self.assertEqual(['b', 'a'], self._query(category='tech'))
+        self.assertEqual(['c', 'a'], self._query(where={'tags': 'web'}))
+        self.assertEqual(['b', 'c', 'a'],
+                         self._query(where={'tags': ['web', 'go']}))
+        self.assertEqual(['a'], self._query(
+            category='tech', where={'tags': 'web'}))
+        self.assertEqual(['d'], self._query(where={'$category': 'life',
+                                                   '$order': 4}))
+        self.assertEqual([], self._query(where={'missing': 'value'}))
+
+    def test_query_dates(self):
+        self.assertEqual(['c', 'a'], self._query(
+            start_date=datetime.date(2016, 1, 2)))
+        self.assertEqual(['b', 'c'], self._query(
+            end_date=datetime.datetime(2016, 1, 2)))
+        self.assertEqual(['c'], self._query(
+            start_date=datetime.date(2016, 1, 2),
+            end_date=datetime.date(2016, 1, 2)))
+        self.assertEqual(['a', 'c', 'b'], self._query(
+            start_date=datetime.date(2016, 1, 1), order_by='date',
+            reverse=True))
+        self.assertEqual(['d', 'b', 'c', 'a'], self._query(order_by='date'))
+
+    def test_query_order_limit_offset(self):
+        self.assertEqual(['d', 'a', 'c', 'b'], self._query(reverse=True))
+        self.assertEqual(['b', 'c'], self._query(limit=2))
+        self.assertEqual(['c', 'a'], self._query(limit=2, offset=1))
+        self.assertEqual(['d'], self._query(offset=3))
+        self.assertEqual(['a', 'b', 'c', 'd'],
+                         self._query(order_by='base', where={}))
+
+    def test_query_list_docs_order(self):
+        # Without filters, queries list documents as `list_docs` does,
+        # including documents without an order.
+        collection = self.pod.get_collection('/content/pages/')
+        self.assertEqual(list(collection.list_docs()), collection.query())
+        self.assertEqual(list(collection.list_docs(reverse=True)),
+                         collection.query(reverse=True))
+        self.assertEqual(list(collection.list_docs())[1:3],
+                         collection.query(limit=2, offset=1))
+        # Both order by "$" fields.
+        self.assertEqual(['c', 'd', 'b', 'a'], self._query(order_by='$category'))
+        self.assertEqual(
+            ['life', 'life', 'tech', 'tech'],
+            [doc.category for doc in self.collection.list_docs(
+                order_by='$category')])
+
+    def test_shared_index(self):
+        self._query(category='tech')
+        self.assertEqual(1, len(self.pod.document_indexes))
+        # Queries of the same listing reuse its index.
+        with mock.patch.object(
+                self.collection, 'list_docs') as mock_list_docs:
+            self.assertEqual(['b', 'c'], self._query(where={'tags': ['go', 'web']},
+                                                     limit=2))
+            self.assertFalse(mock_list_docs.called)
+        # Writing a file of the collection invalidates its index.
+        self._write('e', order=0, category='tech')
+        self.assertEqual(0, len(self.pod.document_indexes))
+        self.assertEqual(['e', 'b', 'a'], self._query(category='tech'))
+
+    def test_docs_tag(self):
+        docs = tags.docs('/content/news/', category='life', limit=1,
+                         _pod=self.pod)
+        self.assertEqual(['c'], [doc.base for doc in docs])
+        docs = tags.docs('/content/news/', _pod=self.pod)
+        self.assertEqual(['b', 'c', 'a', 'd'], [doc.base for doc in docs])
+
+    def test_get_value(self):
+        doc = self.collection.get_doc('/content/news/a.yaml')
+        self.assertEqual('tech', document_index.get_value(doc, 'category'))
+        self.assertEqual('tech', document_index.get_value(doc, '$category'))
+        self.assertEqual(['python', 'web'],
+                         document_index.get_value(doc, 'tags'))
+        self.assertIsNone(document_index.get_value(doc, 'missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,13 @@
 from . import formats
 from . import messages
+from . import path_formatter
 from grow.common import utils
 from grow.pods import locales
 from grow.pods import urls
-import datetime
+import copy
 import json
 import logging
 import os
-import re
 
 
 class Error(Exception):
@@ -30,6 +30,8 @@ class Document(object):
 
     def __init__(self, pod_path, _pod, locale=None, _collection=None):
         self._locale_kwarg = locale
+        # Pod paths read while loading the document, for incremental builds.
+        self._dependencies = set()
         utils.validate_name(pod_path)
         self.pod_path = pod_path
         self.root_pod_path = pod_path  # For multi-file localization.
@@ -99,9 +101,10 @@ class Document(object):
 
     @utils.cached_property
     def fields(self):
-        tagged_fields = self.get_tagged_fields()
-        fields = utils.untag_fields(tagged_fields)
-        return {} if not fields else fields
+        with self.pod.dependencies.record() as pod_paths:
+            fields = self.pod.document_cache.get_fields(self)
+        self._dependencies.update(pod_paths)
+        return fields
 
     def get_tagged_fields(self):
         format = formats.Format.get(self)
@@ -109,7 +112,10 @@ class Document(object):
 
     @utils.cached_property
     def format(self):
-        return formats.Format.get(self)
+        with self.pod.dependencies.record() as pod_paths:
+            format = self.pod.document_cache.get_format(self)
+        self._dependencies.update(pod_paths)
+        return format
 
     @property
     def url(self):
@@ -170,7 +176,7 @@ class Document(object):
 
     @property
     def exists(self):
-        return self.pod.file_exists(self.pod_path)
+        return self.pod.content_manifest.file_exists(self.pod_path)
 
     def localize(self, locale):
         return self.collection.get_doc(self.root_pod_path, locale=locale)
@@ -205,6 +211,9 @@ class Document(object):
 
     @utils.memoize
     def get_serving_path(self):
+        return self.pod.document_cache.get_serving_path(self)
+
+    def _create_serving_path(self):
         # Get root path.
         locale = str(self.locale)
         config = self.pod.get_podspec().get_config()
@@ -225,33 +234,6 @@ class Document(object):
             root_path = root_path[0:len(root_path) - 1]
         path_format = root_path + path_format
 
-        # Handle default date formatting in the url.
-        while '{date|' in path_format:
-            re_date = r'({date\|(?P<date_format>[a-zA-Z0-9_%-]+)})'
-            match = re.search(re_date, path_format)
-            if match:
-                formatted_date = self.date
-                formatted_date = formatted_date.strftime(match.group('date_format'))
-                path_format = (path_format[:match.start()] + formatted_date +
-                               path_format[match.end():])
-            else:
-                # Does not match expected format, let the normal format attempt it.
-                break
-
-        # Handle the special formatting of dates in the url.
-        while '{dates.' in path_format:
-            re_dates = r'({dates\.(?P<date_name>\w+)(\|(?P<date_format>[a-zA-Z0-9_%-]+))?})'
-            match = re.search(re_dates, path_format)
-            if match:
-                formatted_date = self.dates(match.group('date_name'))
-                date_format = match.group('date_format') or '%Y-%m-%d'
-                formatted_date = formatted_date.strftime(date_format)
-                path_format = (path_format[:match.start()] + formatted_date +
-                               path_format[match.end():])
-            else:
-                # Does not match expected format, let the normal format attempt it.
-                break
-
         try:
             return self._format_path(path_format)
         except KeyError:
@@ -259,29 +241,7 @@ class Document(object):
             raise
 
     def _format_path(self, path_format):
-        podspec = self.pod.get_podspec()
-        locale = self.locale.alias if self.locale is not None else self.locale
-        formatters = {
-            'base': self.base,
-            'category': self.category,
-            'collection.basename': self.collection.basename,
-            'collection.root': self.collection.root,
-            'env.fingerpint': self.pod.env.fingerprint,
-            'locale': locale,
-            'parent': self.parent if self.parent else utils.DummyDict(),
-            'root': podspec.root,
-            'slug': self.slug,
-        }
-        if '{date' in path_format:
-            if isinstance(self.date, datetime.datetime):
-                formatters['date'] = self.date.date()
-            else:
-                formatters['date'] = self.date
-        if '|lower' in path_format:
-            for key, value in formatters.items():
-                if isinstance(value, basestring):
-                    formatters['{}|lower'.format(key)] = value.lower()
-        return path_format.format(**formatters).replace('//', '/')
+        return path_formatter.PathFormatter.get(path_format).format(self)
 
     @utils.cached_property
     def locales(self):
@@ -311,28 +271,33 @@ class Document(object):
         return self.fields.get('$hidden', False)
 
     def next(self, docs=None):
-        if docs is None:
-            docs = self.collection.list_docs()
-        for i, doc in enumerate(docs):
-            if type(doc) != self.__class__:
-                raise ValueError('Usage: {{doc.next(<docs>)}}.')
-            if doc == self:
-                n = i + 1
-                if n == len(docs):
-                    return None
-                return docs[i + 1]
+        return self._get_neighbor(1, docs, 'Usage: {{doc.next(<docs>)}}.')
 
     def prev(self, docs=None):
+        return self._get_neighbor(-1, docs, 'Usage: {{doc.prev(<docs>)}}.')
+
+    def _get_neighbor(self, offset, docs, usage):
         if docs is None:
-            docs = self.collection.list_docs()
-        for i, doc in enumerate(docs):
-            if type(doc) != self.__class__:
-                raise ValueError('Usage: {{doc.prev(<docs>)}}.')
-            if doc == self:
-                n = i - 1
-                if n < 0:
-                    return None
-                return docs[i - 1]
+            # The documents of the collection in this document's locale, shared
+            # along with their positions until one of them changes.
+            index = self.pod.document_indexes.get(
+                self.collection, locale=self._locale_kwarg)
+            docs = index.docs
+            position = index.get_position(self)
+        else:
+            position = None
+            for i, doc in enumerate(docs):
+                if type(doc) != self.__class__:
+                    raise ValueError(usage)
+                if doc == self:
+                    position = i
+                    break
+        if position is None:
+            return None
+        position += offset
+        if 0 <= position < len(docs):
+            return docs[position]
+        return None
 
     def to_message(self):
         message = messages.DocumentMessage()
@@ -352,8 +317,12 @@ class Document(object):
 
     def inject(self, fields=utils.SENTINEL, body=utils.SENTINEL):
         """Injects without updating the copy on the filesystem."""
+        # Fields and formats are shared by documents (see `DocumentCache`), so
+        # they're copied before being modified.
         if fields != utils.SENTINEL:
+            self.fields = dict(self.fields)
             self.fields.update(fields)
         if body != utils.SENTINEL:
+            self.format = copy.copy(self.format)
             self.format.body = body
         self.pod.logger.info('Injected -> {}'.format(self.pod_path))
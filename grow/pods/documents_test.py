@@ -2,6 +2,7 @@ from grow.pods import locales
 from grow.pods import pods
 from grow.pods import storage
 from grow.testing import testing
+import mock
 import unittest
 
 
@@ -21,6 +22,18 @@ class DocumentsTestCase(unittest.TestCase):
                 self.assertEqual(doc1, doc)
                 self.assertEqual(doc2, doc)
 
+    def test_fields_not_shared(self):
+        # Documents with equal front matter have their own fields.
+        content = '$title@: Same\ntags: [x]\n'
+        self.pod.write_file('/content/pages/same-a.yaml', content)
+        self.pod.write_file('/content/pages/same-b.yaml', content)
+        doc_a = self.pod.get_doc('/content/pages/same-a.yaml')
+        doc_b = self.pod.get_doc('/content/pages/same-b.yaml')
+        self.assertEqual(doc_a.fields, doc_b.fields)
+        self.assertIsNot(doc_a.fields, doc_b.fields)
+        doc_a.fields['tags'].append('y')
+        self.assertEqual(['x'], doc_b.fields['tags'])
+
     def test_doc_storage(self):
         # Because this test involves translation priority, ensure that we have
         # compiled the MO files before running the test.
@@ -94,6 +107,23 @@ class DocumentsTestCase(unittest.TestCase):
         doc.prev(docs)
         self.assertRaises(ValueError, doc.prev, [1, 2, 3])
 
+        # By default, neighbors are in the collection in the same locale.
+        docs = list(collection.list_docs(locale=None))
+        self.assertIsNone(docs[0].prev())
+        self.assertIsNone(docs[-1].next())
+        for i, doc in enumerate(docs[1:-1], 1):
+            self.assertEqual(docs[i + 1].pod_path, doc.next().pod_path)
+            self.assertEqual(docs[i - 1].pod_path, doc.prev().pod_path)
+            self.assertIsNone(doc.next()._locale_kwarg)
+        de_docs = list(collection.list_docs(locale='de'))
+        de_doc = self.pod.get_doc(de_docs[0].pod_path, locale='de')
+        self.assertEqual(de_docs[1].pod_path, de_doc.next().pod_path)
+        self.assertEqual('de', str(de_doc.next().locale))
+        # The ordered documents are shared by later lookups.
+        with mock.patch.object(collection.__class__, 'list_docs') as mock_list:
+            self.pod.get_doc(docs[0].pod_path).next()
+            self.assertFalse(mock_list.called)
+
     def test_default_locale(self):
         doc = self.pod.get_doc('/content/localized/localized.yaml', locale='de')
         self.assertEqual('/views/localized.html', doc.view)
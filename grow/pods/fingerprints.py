@@ -0,0 +1,74 @@
+"""Fingerprints of static files, shared across builds.
+
+A fingerprint is the md5 of a file's content. Files are hashed in chunks,
+and each fingerprint is stored along with the size and modification time of
+the file it was computed from, so a file is only read again once it changes.
+Fingerprints are saved to "/.grow/cache/fingerprints.json" so that later
+builds (and the processes of a parallel build) can reuse them.
+"""
+
+from grow.common import utils
+import hashlib
+import json
+import logging
+import os
+
+
+class FingerprintStore(object):
+    CHUNK_SIZE = 1024 * 1024  # Bytes.
+    FILENAME = '/.grow/cache/fingerprints.json'
+
+    def __init__(self, pod):
+        self.pod = pod
+        self.filename = os.path.join(pod.root, self.FILENAME.lstrip('/'))
+        self._pod_paths_to_entries = None
+        self._dirty = False
+
+    @property
+    def entries(self):
+        # Maps pod paths to [size, modified, fingerprint] lists.
+        if self._pod_paths_to_entries is None:
+            try:
+                with open(self.filename, 'rb') as fp:
+                    self._pod_paths_to_entries = json.load(fp)
+            except (IOError, OSError, ValueError):
+                self._pod_paths_to_entries = {}
+        return self._pod_paths_to_entries
+
+    def _hash(self, pod_path):
+        md5 = hashlib.md5()
+        with self.pod.open_file(pod_path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(self.CHUNK_SIZE), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def get(self, pod_path):
+        """Returns the fingerprint of the file at a pod path."""
+        try:
+            size = self.pod.file_size(pod_path)
+            modified = self.pod.file_modified(pod_path)
+        except (IOError, OSError):
+            return self._hash(pod_path)  # Raises an error for missing files.
+        entry = self.entries.get(pod_path)
+        if entry is not None and entry[0] == size and entry[1] == modified:
+            # Recorded as though the file was read, for incremental builds.
+            self.pod.dependencies.add(pod_path)
+            return entry[2]
+        fingerprint = self._hash(pod_path)
+        self.entries[pod_path] = [size, modified, fingerprint]
+        self._dirty = True
+        return fingerprint
+
+    def save(self):
+        """Saves fingerprints computed since the store was loaded, dropping
+        those of files that no longer exist."""
+        if not self._dirty:
+            return
+        entries = dict(
+            (pod_path, entry) for pod_path, entry in self.entries.iteritems()
+            if self.pod.storage.exists(self.pod.abs_path(pod_path)))
+        try:
+            utils.write_file_atomically(self.filename, json.dumps(entries))
+            self._dirty = False
+        except (IOError, OSError) as e:
+            logging.warning('Unable to save fingerprints: {}'.format(e))
@@ -0,0 +1,46 @@
+from grow.testing import testing
+import hashlib
+import mock
+import os
+import time
+import unittest
+
+
+class FingerprintStoreTest(testing.PodCacheTestCase):
+
+    def test_get(self):
+        pod_path = '/static/test.txt'
+        expected = hashlib.md5(self.pod.read_file(pod_path)).hexdigest()
+        store = self.pod.fingerprints
+        store.CHUNK_SIZE = 4
+        self.assertEqual(expected, store.get(pod_path))
+
+        # Unchanged files are not read again, but are still dependencies.
+        with mock.patch.object(self.pod, 'open_file') as mock_open_file:
+            with self.pod.dependencies.record() as pod_paths:
+                self.assertEqual(expected, store.get(pod_path))
+            self.assertFalse(mock_open_file.called)
+        self.assertIn(pod_path, pod_paths)
+
+        # Saved fingerprints are reused by new pods.
+        store.save()
+        pod = self.create_pod()
+        with mock.patch.object(pod, 'open_file') as mock_open_file:
+            self.assertEqual(expected, pod.fingerprints.get(pod_path))
+            self.assertFalse(mock_open_file.called)
+
+        # Changed files are hashed again.
+        path = os.path.join(self.dir_path, pod_path.lstrip('/'))
+        with open(path, 'a') as fp:
+            fp.write('Changed.')
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+        expected = hashlib.md5(pod.read_file(pod_path)).hexdigest()
+        self.assertEqual(expected, pod.fingerprints.get(pod_path))
+
+    def test_get_missing_file(self):
+        self.assertRaises(IOError, self.pod.fingerprints.get, '/static/none.txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
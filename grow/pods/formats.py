@@ -2,6 +2,12 @@
     Consolidates operations related to dealing with content that has both
     frontmatter and body content. Supports documents formatted in various ways
     (yaml, html, markdown, etc.).
+
+    Markdown and HTML documents are read a line at a time, keeping only their
+    front matter: the offsets of their bodies in the file are recorded, and a
+    body is read when it is first used. Listing and sorting documents by their
+    fields therefore doesn't hold their bodies. (Localized parts follow the
+    base body in a file, so the rest of the file is still scanned for them.)
 """
 
 from grow.common import markdown_extensions
@@ -9,6 +15,7 @@ from grow.common import utils
 from markdown.extensions import tables
 from markdown.extensions import toc
 import collections
+import functools
 import logging
 import markdown
 import os
@@ -17,6 +24,11 @@ import yaml
 
 
 BOUNDARY_REGEX = re.compile(r'^-{3,}$', re.MULTILINE)
+BOUNDARY_LINE_REGEX = re.compile(r'-{3,}\Z')
+# Matches the locale of a localized part of a document, without parsing it.
+PART_LOCALE_REGEX = re.compile(
+    r'^\$locale\s*:\s*[\'"]?([^\s\'"#]+)', re.MULTILINE)
+PART_LOCALES_REGEX = re.compile(r'^\$locales\s*:', re.MULTILINE)
 PATH_LOCALE_REGEX = re.compile('(.*)@([^\.]*)\.(.*)')
 
 
@@ -33,15 +45,27 @@ class Format(object):
     def __init__(self, doc):
         self.doc = doc
         self.pod = doc.pod
-        self.body = None
+        self._body = None
+        # Returns the body, for formats that defer loading it until used.
+        self._load_body = None
         self.pod_path = self.doc.pod_path
-        self.root_pod_path = self.pod_path
-        self.locale_from_path = None
-        self.content = self._init_content(self.pod_path)
-        self._has_front_matter = Format.has_front_matter(self.content)
+        self.root_pod_path, self.locale_from_path = \
+            Format.parse_localized_path(self.pod_path)
+        self._content = None
         self.fields = {}
         self.load()
 
+    @property
+    def content(self):
+        """The content of the document's file, read when first used."""
+        if self._content is None:
+            self._content = self._read_content(self.pod_path)
+        return self._content
+
+    @property
+    def _has_front_matter(self):
+        return Format.has_front_matter(self.content)
+
     @staticmethod
     def _normalize_frontmatter(pod_path, content, locale=None):
         if Format.has_front_matter(content):
@@ -81,11 +105,23 @@ class Format(object):
         base, ext = os.path.splitext(pod_path)
         return '{}@{}{}'.format(base, locale, ext)
 
-    def _init_content(self, pod_path):
-        self.root_pod_path, self.locale_from_path = \
-            Format.parse_localized_path(pod_path)
+    def _get_snapshot(self, name, create):
+        # Values parsed from the document's files are kept in the pod's
+        # snapshot until the files change.
+        pod_paths = [self.pod_path]
+        if self.locale_from_path:
+            pod_paths.insert(0, self.root_pod_path)
+        return self.pod.snapshot.get(
+            self.pod_path, name, create, pod_paths=pod_paths)
+
+    def _load_yaml(self, content, name='yaml'):
+        tagged = self._get_snapshot(
+            name, lambda: utils.load_tagged_yaml(content))
+        return utils.resolve_yaml_tags(tagged, pod=self.pod, doc=self.doc)
+
+    def _read_content(self, pod_path):
         if self.locale_from_path:
-            if self.pod.file_exists(self.root_pod_path):
+            if self.pod.content_manifest.file_exists(self.root_pod_path):
                 root_content = self.pod.read_file(self.root_pod_path)
             else:
                 root_content = ''
@@ -97,7 +133,7 @@ class Format(object):
             return '{}\n{}'.format(
                 root_content_with_frontmatter,
                 localized_content_with_frontmatter)
-        if self.pod.file_exists(pod_path):
+        if self.pod.content_manifest.file_exists(pod_path):
             return self.pod.read_file(pod_path)
         return ''
 
@@ -136,6 +172,18 @@ class Format(object):
             return result[:-5]
         return result
 
+    @property
+    def body(self):
+        if self._load_body is not None:
+            self._body = self._load_body()
+            self._load_body = None
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body = value
+        self._load_body = None
+
     @property
     def html(self):
         return None
@@ -165,15 +213,23 @@ class _SplitDocumentFormat(Format):
             if 'default_locale' in fields['$localization']:
                 return fields['$localization']['default_locale']
 
-    def _load_yaml(self, part):
+    def _load_part(self, part, index):
         try:
-            return utils.load_yaml(part, doc=self.doc, pod=self.doc.pod)
+            return self._load_yaml(part, name='part-{}'.format(index))
         except (yaml.parser.ParserError,
                 yaml.composer.ComposerError,
                 yaml.scanner.ScannerError) as e:
             message = 'Error parsing {}: {}'.format(self.doc.pod_path, e)
             raise BadFormatError(message)
 
+    def _is_part_for_other_locale(self, part, locale):
+        # Parts localized for other locales are neither merged into the
+        # fields nor the body, so parsing them can be skipped.
+        if locale is None or PART_LOCALES_REGEX.search(part):
+            return False
+        match = PART_LOCALE_REGEX.search(part)
+        return match is not None and match.group(1) != str(locale)
+
     def _handle_pairs_of_parts_and_bodies(self):
         locales_to_fields = collections.defaultdict(dict)
         locales_to_bodies = {}
@@ -182,7 +238,10 @@ class _SplitDocumentFormat(Format):
 
         for i, parts in enumerate(self._iterate_content()):
             part, body = parts
-            fields = self._load_yaml(part) or {}
+            if i > 0 and self._is_part_for_other_locale(
+                    part, locale or base_default_locale):
+                continue
+            fields = self._load_part(part, i) or {}
             self._validate_fields(fields)
             if i == 0:
                 base_default_locale = self._get_base_default_locale(fields)
@@ -199,10 +258,15 @@ class _SplitDocumentFormat(Format):
         localized_fields = locales_to_fields.get(locale, {})
         self.fields.update(localized_fields)
 
-        # Merge localized bodies into base body.
-        base_body = locales_to_bodies.get(None)
-        self.body = locales_to_bodies.get(locale, base_body)
-        self.body = self.body.strip() if self.body is not None else None
+        # Merge localized bodies into base body, when the body is first used.
+        # Bodies that haven't been read are functions that read them.
+        def load_body():
+            base_body = locales_to_bodies.get(None)
+            body = locales_to_bodies.get(locale, base_body)
+            if callable(body):
+                body = body()
+            return body.strip() if body is not None else None
+        self._load_body = load_body
 
 
 class YamlFormat(_SplitDocumentFormat):
@@ -210,10 +274,7 @@ class YamlFormat(_SplitDocumentFormat):
     def load(self):
         try:
             if not self._has_front_matter:
-                self.fields = utils.load_yaml(
-                    self.content,
-                    doc=self.doc,
-                    pod=self.doc.pod) or {}
+                self.fields = self._load_yaml(self.content) or {}
                 self.body = self.content
                 return
             self._handle_pairs_of_parts_and_bodies()
@@ -225,12 +286,75 @@ class YamlFormat(_SplitDocumentFormat):
 
 class HtmlFormat(YamlFormat):
 
+    def __init__(self, doc):
+        self._parts = utils.SENTINEL
+        self._stamp = None
+        super(HtmlFormat, self).__init__(doc)
+
+    def _get_stamp(self):
+        return (self.pod.file_modified(self.pod_path),
+                self.pod.file_size(self.pod_path))
+
+    def _get_parts(self):
+        """Returns the parts of the document's file (see `_scan_parts`), or
+        None if the file is read whole."""
+        if self._parts is utils.SENTINEL:
+            self._parts = None
+            if (not self.locale_from_path
+                    and self.pod.content_manifest.file_exists(self.pod_path)):
+                self._parts = self._get_snapshot('parts', self._scan_parts)
+                self._stamp = self._get_stamp()
+        return self._parts
+
+    def _scan_parts(self):
+        """Returns the parts of the document's file, as split by
+        `split_front_matter`, reading the file a line at a time. Parts of
+        front matter are returned as text, and bodies as a tuple of their
+        start and end offsets in the file. Returns None if the file doesn't
+        start with front matter."""
+        parts = []
+        lines = None  # The lines of the current front matter.
+        start = None
+        offset = 0
+        with self.pod.open_file(self.pod_path) as fp:
+            for line in fp:
+                text = line.rstrip('\n')
+                if BOUNDARY_LINE_REGEX.match(text):
+                    if start is not None:
+                        parts.append(''.join(lines) if lines is not None
+                                     else (start, offset))
+                    # Front matter and bodies alternate.
+                    lines = [line[len(text):]] if len(parts) % 2 == 0 else None
+                    start = offset + len(text)
+                elif start is None:
+                    return None
+                elif lines is not None:
+                    lines.append(line)
+                offset += len(line)
+        if start is None:
+            return None
+        parts.append(''.join(lines) if lines is not None else (start, offset))
+        return parts
+
+    def _read_body(self, i):
+        if self._get_stamp() != self._stamp:
+            # The file changed since it was scanned.
+            return Format.split_front_matter(self.content)[i]
+        start, end = self._parts[i]
+        with self.pod.open_file(self.pod_path) as fp:
+            fp.seek(start)
+            return fp.read(end - start)
+
     def _iterate_content(self):
-        pairs = utils.every_two(Format.split_front_matter(self.content))
-        return [(part, body) for part, body in pairs]
+        parts = self._get_parts()
+        if parts is None:
+            pairs = utils.every_two(Format.split_front_matter(self.content))
+            return [(part, body) for part, body in pairs]
+        return [(parts[i], functools.partial(self._read_body, i + 1))
+                for i in range(0, len(parts) - 1, 2)]
 
     def load(self):
-        if not self._has_front_matter:
+        if self._get_parts() is None and not self._has_front_matter:
             self.fields = {}
             self.body = self.content
             return
@@ -2,6 +2,7 @@ from . import formats
 from grow.pods import pods
 from grow.pods import storage
 from grow.testing import testing
+import mock
 import unittest
 
 
@@ -85,6 +86,56 @@ class FormatsTestCase(unittest.TestCase):
         new_content = formats.Format.update(content, body=body)
         self.assertEqual(expected, new_content)
 
+    def test_lazy_loading(self):
+        path = '/content/localized/multiple-locales.yaml'
+        doc = self.pod.get_doc(path, locale='it')
+        load_yaml = formats._SplitDocumentFormat._load_yaml
+        with mock.patch.object(
+                formats._SplitDocumentFormat, '_load_yaml',
+                autospec=True, side_effect=load_yaml) as mock_load_yaml:
+            format = formats.Format.get(doc)
+        # The part localized for "de" is not parsed.
+        self.assertEqual(2, mock_load_yaml.call_count)
+        self.assertEqual('it_fr', format.fields['foo'])
+        # The body is merged on first use.
+        self.assertIsNotNone(format._load_body)
+        self.assertIn('foo: it_fr', format.body)
+        self.assertIsNone(format._load_body)
+        format.body = 'Updated.'
+        self.assertEqual('Updated.', format.body)
+
+    def test_front_matter_only(self):
+        content = (
+            '---\n'
+            '$title: Title\n'
+            '---\n'
+            'Base body.\n'
+            '-----\n'
+            '$locale: de\n'
+            'foo: bar\n'
+            '---\n'
+            'German body.\n'
+        )
+        self.pod.write_file('/content/pages/parts.md', content)
+        doc = self.pod.get_doc('/content/pages/parts.md', locale='de')
+        format = formats.Format.get(doc)
+        # Front matter is kept, and bodies are read when used.
+        parts = format._get_parts()
+        expected = formats.Format.split_front_matter(content)
+        self.assertEqual(len(expected), len(parts))
+        self.assertEqual([expected[0], expected[2]], [parts[0], parts[2]])
+        self.assertEqual(expected[3], format._read_body(3))
+        self.assertEqual('bar', format.fields['foo'])
+        self.assertIsNone(format._content)
+        self.assertEqual('German body.', format.body)
+        self.assertIsNone(format._content)
+        doc = self.pod.get_doc('/content/pages/parts.md')
+        self.assertEqual('Base body.', formats.Format.get(doc).body)
+        # Bodies of changed files are read from their new content.
+        self.pod.write_file('/content/pages/parts.md', content.replace(
+            'Base body.', 'Changed body.'))
+        self.assertEqual('\nChanged body.\n', format._read_body(1))
+
     def test_parse_localized_path(self):
         path = '/content/pages/file@locale.ext'
         expected = ('/content/pages/file.ext', 'locale')
@@ -0,0 +1,215 @@
+"""Listing pages of a collection's documents.
+
+A blueprint's `$pagination` field adds a route for each page of the
+collection's documents:
+
+    $pagination:
+      path: /blog/page/{page}/
+      first_path: /blog/             # Optional, the path of the first page.
+      per_page: 10                   # Defaults to 10.
+      view: /views/blog-list.html    # Defaults to the collection's view.
+      order_by: $date                # Defaults to "order".
+      reverse: true
+
+If the paths contain "{locale}", each of the collection's locales has its own
+pages, listing the documents of the locale. Otherwise, the pages list the
+collection's unlocalized documents.
+
+Each page's view is rendered with a `pagination` variable holding only the
+page's documents, sliced from the collection's shared `DocumentIndex`, so
+rendering a page doesn't iterate the collection's other documents.
+
+The render cache keys a page by the documents it lists, and the page depends
+only on those documents. Adding a document therefore re-renders only the
+pages whose documents shift (or, when the number of pages changes, every
+page, as each links to the last).
+"""
+
+from . import collection as collection_lib
+from . import rendered
+from grow.common import utils
+from werkzeug import routing
+
+
+DEFAULT_PER_PAGE = 10
+
+
+def get_config(collection):
+    """Returns a collection's pagination config, or None. Raises
+    BadFieldsError if its "per_page" isn't a number of at least 1."""
+    config = collection._get_builtin_field('pagination')
+    if config:
+        per_page = config.get('per_page', DEFAULT_PER_PAGE)
+        if (not isinstance(per_page, (int, long))
+                or isinstance(per_page, bool) or per_page < 1):
+            text = ('The "per_page" of the "$pagination" of {} must be a'
+                    ' whole number of at least 1, not {!r}.').format(
+                        collection.pod_path, per_page)
+            raise collection_lib.BadFieldsError(text)
+    return config
+
+
+def list_locales(collection, config):
+    """Returns the locales that have pages: the collection's locales, if the
+    pages' paths contain "{locale}", or else None, for pages listing the
+    unlocalized documents."""
+    paths = [config.get('path') or '', config.get('first_path') or '']
+    if any('{locale}' in path for path in paths):
+        return [collection.pod.normalize_locale(locale)
+                for locale in collection.locales]
+    return [None]
+
+
+def get_num_pages(collection, config, locale=None):
+    index = collection.pod.document_indexes.get(collection, locale=locale)
+    per_page = config.get('per_page', DEFAULT_PER_PAGE)
+    return max(1, (len(index) + per_page - 1) // per_page)
+
+
+def get_path(config, number, locale=None):
+    if number == 1 and config.get('first_path'):
+        path = config['first_path']
+    else:
+        path = config['path'].replace('{page}', str(number))
+    if locale is not None:
+        path = path.replace('{locale}', locale.alias or str(locale))
+    return path
+
+
+def create_rules(collection):
+    """Returns a routing rule for each page of a collection's documents."""
+    config = get_config(collection)
+    if not config:
+        return []
+    routes = collection.pod.routes
+    pages = []
+    for locale in list_locales(collection, config):
+        num_pages = get_num_pages(collection, config, locale=locale)
+        for number in range(1, num_pages + 1):
+            path = routes.format_path(get_path(config, number, locale=locale))
+            pages.append([path, str(locale) if locale else None, number])
+    return list(create_rules_for_pages(collection.pod, collection.pod_path,
+                                       pages))
+
+
+def create_rules_for_pages(pod, collection_path, pages):
+    """Yields the routing rules of a collection's pages, given a list of
+    [path, locale, number] lists (see `list_pages`)."""
+    collection = collection_lib.Collection.get(collection_path, _pod=pod)
+    config = get_config(collection) or {}
+    view = config.get('view', collection.view)
+    for path, locale, number in pages:
+        controller = PaginationController(
+            view=view, collection_path=collection_path, number=number,
+            path=path, locale=locale, _pod=pod)
+        yield routing.Rule(path, endpoint=controller)
+
+
+def list_pages(rules):
+    """Returns the [path, locale, number] of the pages of routing rules, to
+    be stored in a route manifest."""
+    return [[rule.rule, rule.endpoint._locale, rule.endpoint.number]
+            for rule in rules]
+
+
+class Page(object):
+    """A page of a collection's documents, and links to the other pages."""
+
+    def __init__(self, collection, config, number, num_pages, docs,
+                 locale=None):
+        self.collection = collection
+        self.locale = locale
+        self.number = number
+        self.num_pages = num_pages
+        self.per_page = config.get('per_page', DEFAULT_PER_PAGE)
+        self.docs = docs
+        self._config = config
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    @property
+    def has_previous(self):
+        return self.number > 1
+
+    @property
+    def has_next(self):
+        return self.number < self.num_pages
+
+    def get_path(self, number):
+        """Returns the serving path of a page."""
+        if 1 <= number <= self.num_pages:
+            path = get_path(self._config, number, locale=self.locale)
+            return self.collection.pod.routes.format_path(path)
+
+    @property
+    def previous_path(self):
+        return self.get_path(self.number - 1)
+
+    @property
+    def next_path(self):
+        return self.get_path(self.number + 1)
+
+
+class PaginationController(rendered.RenderedController):
+
+    def __init__(self, view, collection_path, number, path, locale=None,
+                 _pod=None):
+        super(PaginationController, self).__init__(
+            view=view, path=path, _pod=_pod)
+        self.collection_path = collection_path
+        self.number = number
+        self._locale = locale
+
+    def __repr__(self):
+        return ('<Pagination(view=\'{}\', collection=\'{}\', locale={},'
+                ' page={})>').format(
+                    self.view, self.collection_path, self._locale, self.number)
+
+    @property
+    def locale(self):
+        if self._locale is not None:
+            return self.pod.normalize_locale(self._locale)
+
+    @utils.cached_property
+    def page(self):
+        collection = collection_lib.Collection.get(
+            self.collection_path, _pod=self.pod)
+        config = get_config(collection) or {}
+        per_page = config.get('per_page', DEFAULT_PER_PAGE)
+        locale = self.locale
+        index = self.pod.document_indexes.get(collection, locale=locale)
+        docs = index.query(
+            order_by=config.get('order_by'), reverse=config.get('reverse'),
+            limit=per_page, offset=(self.number - 1) * per_page)
+        return Page(collection, config, self.number,
+                    get_num_pages(collection, config, locale=locale), docs,
+                    locale=locale)
+
+    def render(self, params, inject=True):
+        # Loads the page before its render is recorded, so that the render
+        # depends on the documents it lists rather than on the collection.
+        self.page
+        return super(PaginationController, self).render(params, inject=False)
+
+    def _get_render_key_parts(self):
+        return (super(PaginationController, self)._get_render_key_parts()
+                + (self.page.num_pages,)
+                + tuple(doc.pod_path for doc in self.page.docs))
+
+    def _get_template_kwargs(self):
+        kwargs = super(PaginationController, self)._get_template_kwargs()
+        kwargs['pagination'] = self.page
+        return kwargs
+
+    def _record_dependencies(self):
+        super(PaginationController, self)._record_dependencies()
+        dependencies = self.pod.dependencies
+        if not dependencies.is_recording:
+            return
+        dependencies.add(self.page.collection._blueprint_path)
+        for doc in self.page.docs:
+            dependencies.update(doc._dependencies)
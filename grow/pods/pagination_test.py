@@ -0,0 +1,134 @@
+from . import collection
+from . import pods
+from . import storage
+from grow.testing import testing
+import unittest
+
+
+class PaginationTest(unittest.TestCase):
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.pod.write_yaml('/content/blog/_blueprint.yaml', {
+            '$path': '/blog/{base}/',
+            '$view': '/views/base.html',
+            '$pagination': {
+                'path': '/blog/page/{page}/',
+                'first_path': '/blog/',
+                'per_page': 2,
+                'view': '/views/pagination.html',
+                'order_by': '$date',
+                'reverse': True,
+            },
+        })
+        self.pod.write_file('/views/pagination.html', (
+            '{% for doc in pagination %}{{doc.base}} {% endfor %}'
+            '{{pagination.number}}/{{pagination.num_pages}} '
+            '{{pagination.previous_path}} {{pagination.next_path}}'))
+        for day in range(1, 6):
+            self._write_post(day)
+
+    def _write_post(self, day):
+        self.pod.write_file('/content/blog/post-{}.yaml'.format(day),
+                            '$date: 2016-01-0{}\n'.format(day))
+
+    def _render(self, path):
+        controller, params = self.pod.match(path)
+        return controller.render(params)
+
+    def test_routes(self):
+        paths = self.pod.routes.list_concrete_paths()
+        self.assertIn('/blog/', paths)
+        self.assertIn('/blog/page/2/', paths)
+        self.assertIn('/blog/page/3/', paths)
+        self.assertNotIn('/blog/page/1/', paths)
+        self.assertNotIn('/blog/page/4/', paths)
+
+    def test_per_page(self):
+        for per_page in (0, -1, '2'):
+            pod = pods.Pod(self.pod.root, storage=storage.FileStorage)
+            blueprint = pod.read_yaml('/content/blog/_blueprint.yaml')
+            blueprint['$pagination']['per_page'] = per_page
+            pod.write_yaml('/content/blog/_blueprint.yaml', blueprint)
+            with self.assertRaises(collection.BadFieldsError):
+                pod.routes.list_concrete_paths()
+
+    def test_render(self):
+        self.assertEqual('post-5 post-4 1/3 None /blog/page/2/',
+                         self._render('/blog/'))
+        self.assertEqual('post-3 post-2 2/3 /blog/ /blog/page/3/',
+                         self._render('/blog/page/2/'))
+        self.assertEqual('post-1 3/3 /blog/page/2/ None',
+                         self._render('/blog/page/3/'))
+
+    def test_locales(self):
+        self.pod.write_yaml('/content/news/_blueprint.yaml', {
+            '$path': '/{locale}/news/{base}/',
+            '$view': '/views/base.html',
+            'localization': {
+                'path': '/{locale}/news/{base}/',
+                'locales': ['de', 'fr'],
+            },
+            '$pagination': {
+                'path': '/{locale}/news/page/{page}/',
+                'per_page': 1,
+                'view': '/views/news.html',
+            },
+        })
+        self.pod.write_file('/views/news.html', (
+            '{% for doc in pagination %}{{doc.base}}:{{doc.locale}}'
+            '{% endfor %} {{pagination.next_path}}'))
+        self.pod.write_file('/content/news/a.yaml', '$order: 1\n')
+        self.pod.write_file('/content/news/b.yaml', '$order: 2\n')
+        paths = self.pod.routes.list_concrete_paths()
+        # Paths use the locales' aliases.
+        self.assertIn('/de_alias/news/page/2/', paths)
+        self.assertIn('/fr/news/page/2/', paths)
+        self.assertNotIn('/de_alias/news/page/3/', paths)
+        self.assertEqual('a:de /de_alias/news/page/2/',
+                         self._render('/de_alias/news/page/1/'))
+        self.assertEqual('b:fr None', self._render('/fr/news/page/2/'))
+        controller, _ = self.pod.match('/fr/news/page/2/')
+        self.assertEqual('fr', str(controller.locale))
+        # Localized pages are restored from the route manifest.
+        pod = pods.Pod(self.pod.root, storage=storage.FileStorage)
+        self.assertTrue(pod.routes.load_manifest())
+        controller, params = pod.match('/de_alias/news/page/2/')
+        self.assertEqual('b:de None', controller.render(params))
+
+    def test_update(self):
+        self.pod.routes.routing_map
+        self._write_post(6)
+        self.pod.routes.update('/content/blog/post-6.yaml')
+        self.assertIn('/blog/page/3/', self.pod.routes.list_concrete_paths())
+        self.assertEqual('post-6 post-5 1/3 None /blog/page/2/',
+                         self._render('/blog/'))
+
+    def test_render_key(self):
+        # Pages whose documents don't shift keep their render key.
+        controller, _ = self.pod.match('/blog/page/3/')
+        key = controller._get_render_key_parts()
+        self.pod.write_file('/content/blog/post-0.yaml', '$date: 2015-12-31\n')
+        self.pod.routes.update('/content/blog/post-0.yaml')
+        controller, _ = self.pod.match('/blog/page/2/')
+        self.assertEqual(
+            ('/views/pagination.html', None, None, '/blog/page/2/', 3,
+             '/content/blog/post-3.yaml', '/content/blog/post-2.yaml'),
+            controller._get_render_key_parts())
+        controller, _ = self.pod.match('/blog/page/3/')
+        self.assertNotEqual(key, controller._get_render_key_parts())
+
+    def test_manifest(self):
+        self.pod.routes.routing_map
+        pod = pods.Pod(self.pod.root, storage=storage.FileStorage)
+        self.assertTrue(pod.routes.load_manifest())
+        self.assertEqual(sorted(self.pod.routes.list_concrete_paths()),
+                         sorted(pod.routes.list_concrete_paths()))
+        controller, params = pod.match('/blog/page/2/')
+        self.assertEqual('post-3 post-2 2/3 /blog/ /blog/page/3/',
+                         controller.render(params))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Compiled path formats of documents.
+
+Path formats, such as "/{root}/{locale}/{date|%Y}/{base}/", are used to
+create the serving paths and views of documents. Each distinct path format is
+compiled once into a `PathFormatter`, which knows which of a document's
+values the format uses and formats them in a single pass. Dates with
+formats ("{date|%Y}" and "{dates.published|%Y-%m}") are compiled into fields
+of their own, so formatting a path doesn't search it for them again.
+
+Formatting behaves like `str.format`: fields other than those listed in
+`_GETTERS` (or their "|lower" variants) raise a KeyError.
+"""
+
+from grow.common import utils
+import datetime
+import re
+import string
+
+DATE_REGEX = re.compile(r'^date\|(?P<date_format>[a-zA-Z0-9_%-]+)$')
+DATES_REGEX = re.compile(
+    r'^dates\.(?P<date_name>\w+)(\|(?P<date_format>[a-zA-Z0-9_%-]+))?$')
+NAME_REGEX = re.compile(r'^[^.\[]*')
+DEFAULT_DATES_FORMAT = '%Y-%m-%d'
+
+
+def _get_locale(doc):
+    return doc.locale.alias if doc.locale is not None else doc.locale
+
+
+def _get_date(doc):
+    if isinstance(doc.date, datetime.datetime):
+        return doc.date.date()
+    return doc.date
+
+
+# The values a path format may use, by name.
+_GETTERS = {
+    'base': lambda doc: doc.base,
+    'category': lambda doc: doc.category,
+    'date': _get_date,
+    'locale': _get_locale,
+    'parent': lambda doc: doc.parent if doc.parent else utils.DummyDict(),
+    'root': lambda doc: doc.pod.get_podspec().root,
+    'slug': lambda doc: doc.slug,
+}
+
+
+def _escape(text):
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+class PathFormatter(object):
+
+    def __init__(self, path_format):
+        self.path_format = path_format
+        # Maps the names of the format's compiled date fields to a tuple of
+        # the date name (None for the document's date) and its format.
+        self._names_to_dates = {}
+        self._names = set()
+        parts = []
+        for literal, field_name, format_spec, conversion in \
+                string.Formatter().parse(path_format):
+            parts.append(_escape(literal))
+            if field_name is None:
+                continue
+            date = self._compile_date(field_name)
+            if date is not None and not format_spec and not conversion:
+                field_name = '_date{}'.format(len(self._names_to_dates))
+                self._names_to_dates[field_name] = date
+            else:
+                self._names.add(NAME_REGEX.match(field_name).group())
+            parts.append('{' + field_name)
+            if conversion:
+                parts.append('!' + conversion)
+            if format_spec:
+                parts.append(':' + format_spec)
+            parts.append('}')
+        self._format_string = ''.join(parts)
+
+    def __repr__(self):
+        return '<PathFormatter(\'{}\')>'.format(self.path_format)
+
+    @staticmethod
+    def _compile_date(field_name):
+        match = DATE_REGEX.match(field_name)
+        if match:
+            return None, match.group('date_format')
+        match = DATES_REGEX.match(field_name)
+        if match:
+            date_format = match.group('date_format') or DEFAULT_DATES_FORMAT
+            return match.group('date_name'), date_format
+        return None
+
+    @classmethod
+    @utils.memoize
+    def get(cls, path_format):
+        """Returns the compiled formatter of a path format."""
+        return cls(path_format)
+
+    def format(self, doc):
+        """Returns the path format formatted with a document's values."""
+        values = {}
+        for name in self._names:
+            if name in _GETTERS:
+                values[name] = _GETTERS[name](doc)
+            elif name.endswith('|lower') and name[:-6] in _GETTERS:
+                value = _GETTERS[name[:-6]](doc)
+                if isinstance(value, basestring):
+                    values[name] = value.lower()
+        for name, (date_name, date_format) in self._names_to_dates.iteritems():
+            date = doc.date if date_name is None else doc.dates(date_name)
+            values[name] = date.strftime(date_format)
+        return self._format_string.format(**values).replace('//', '/')
@@ -0,0 +1,63 @@
+from . import path_formatter
+from grow.testing import testing
+import datetime
+import unittest
+
+
+class PathFormatterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pod = testing.create_pod()
+        self.pod.write_yaml('/podspec.yaml', {'root': 'site'})
+        self.pod.write_yaml('/content/posts/_blueprint.yaml', {
+            '$path': '/{base}/',
+            '$view': '/views/base.html',
+            '$localization': {
+                'path': '/{locale}/{base}/',
+            },
+        })
+        self.pod.write_yaml('/content/posts/Hello.yaml', {
+            '$title': 'Hello World',
+            '$category': 'News',
+            '$date': datetime.date(2016, 2, 3),
+            '$dates': {
+                'published': datetime.datetime(2016, 3, 4, 5, 6),
+            },
+        })
+        self.doc = self.pod.get_doc('/content/posts/Hello.yaml')
+
+    def _format(self, path_format, doc=None):
+        formatter = path_formatter.PathFormatter.get(path_format)
+        return formatter.format(doc or self.doc)
+
+    def test_format(self):
+        self.assertEqual('/site/News/Hello/hello-world/',
+                         self._format('/{root}/{category}/{base}/{slug}/'))
+        self.assertEqual('/news/hello/', self._format(
+            '/{category|lower}/{base|lower}/'))
+        self.assertEqual('/{base}/Hello/', self._format('/{{base}}/{base}/'))
+        self.assertEqual('/Hello/', self._format('//{base}/'))
+        self.assertEqual('/Hello/', self._format('/{parent.base}/{base}/'))
+        doc = self.pod.get_doc('/content/posts/Hello.yaml', locale='de')
+        self.assertEqual('/de/Hello/', self._format('/{locale}/{base}/', doc))
+
+    def test_format_dates(self):
+        self.assertEqual('/2016-02-03/', self._format('/{date}/'))
+        self.assertEqual('/2016/02/', self._format('/{date|%Y}/{date|%m}/'))
+        self.assertEqual('/2016-03-04/', self._format('/{dates.published}/'))
+        self.assertEqual('/2016-03/05/', self._format(
+            '/{dates.published|%Y-%m}/{dates.published|%H}/'))
+
+    def test_format_errors(self):
+        self.assertRaises(KeyError, self._format, '/{unknown}/')
+        self.assertRaises(KeyError, self._format, '/{date|%Y/%m}/')
+        self.assertRaises(KeyError, self._format, '/{title|lower}/')
+
+    def test_get(self):
+        # Path formats are compiled once.
+        self.assertIs(path_formatter.PathFormatter.get('/{base}/'),
+                      path_formatter.PathFormatter.get('/{base}/'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,21 @@
 
 from . import catalog_holder
 from . import collection
+from . import content_manifest as content_manifest_lib
+from . import csv_tables
+from . import dependency
+from . import document_cache as document_cache_lib
+from . import document_index
 from . import env as environment
+from . import errors
+from . import fingerprints as fingerprints_lib
 from . import locales
 from . import messages
 from . import podspec
+from . import profiler as profiler_lib
+from . import render_cache as render_cache_lib
 from . import routes
+from . import snapshot as snapshot_lib
 from . import static
 from . import storage
 from . import tags
@@ -15,7 +25,12 @@ from ..translators import translators
 from grow.common import sdk_utils
 from grow.common import utils
 from grow.deployments import deployments
+from protorpc import protojson
 from werkzeug.contrib import cache as werkzeug_cache
+if utils.is_appengine():
+    pool = None
+else:
+    from multiprocessing import pool
 import copy
 import jinja2
 import json
@@ -45,6 +60,38 @@ class PodSpecParseError(Error):
     pass
 
 
+# Pod used by each process of a parallel export (see `Pod.export`).
+_export_worker_pod = None
+
+
+def _init_export_worker(root, storage, encoded_env_config,
+                        render_cache_max_size=None, profile=False):
+    global _export_worker_pod
+    config = protojson.decode_message(environment.EnvConfig, encoded_env_config)
+    env = environment.Env(config)
+    _export_worker_pod = Pod(root, storage=storage, env=env)
+    # The parent process writes the route manifest.
+    _export_worker_pod.routes.manifest = None
+    if render_cache_max_size is not None:
+        _export_worker_pod.render_cache = render_cache_lib.RenderCache(
+            _export_worker_pod, max_size=render_cache_max_size)
+    if profile:
+        _export_worker_pod.profiler = profiler_lib.Profiler()
+
+
+def _export_worker(path):
+    try:
+        pod = _export_worker_pod
+        content, pod_paths = pod._export_path_and_dependencies(path)
+        # Profile records are returned to the parent process's profiler.
+        record = pod.profiler.records.pop() if pod.profiler else None
+        return path, content, pod_paths, record
+    except Exception as e:
+        # Tracebacks cannot be pickled across process boundaries, so errors are
+        # re-raised in the parent process as plain build errors.
+        raise errors.BuildError('Error building {}: {}'.format(path, e))
+
+
 # TODO(jeremydw): A handful of the properties of "pod" should be moved to the
 # "podspec" class.
 
@@ -59,6 +106,17 @@ class Pod(object):
         self.locales = locales.Locales(pod=self)
         self.catalogs = catalog_holder.Catalogs(pod=self)
         self.logger = _logger
+        self.dependencies = dependency.DependencyTracker()
+        self.fingerprints = fingerprints_lib.FingerprintStore(self)
+        self.snapshot = snapshot_lib.PodSnapshot(self)
+        self.document_cache = document_cache_lib.DocumentCache(self)
+        self.content_manifest = content_manifest_lib.ContentManifest(self)
+        self.csv_tables = csv_tables.CsvTableCache(self)
+        self.document_indexes = document_index.DocumentIndexCache(self)
+        # An optional RenderCache, used when rendering pages.
+        self.render_cache = None
+        # An optional Profiler, which records the time spent exporting paths.
+        self.profiler = None
         self.routes = routes.Routes(pod=self)
         try:
             sdk_utils.check_sdk_version(self)
@@ -94,7 +152,7 @@ class Pod(object):
     @utils.memoize
     def _parse_yaml(self):
         try:
-            return utils.parse_yaml(self.read_file('/podspec.yaml'))
+            return self.snapshot.load_yaml('/podspec.yaml')
         except IOError as e:
             path = self.abs_path('/podspec.yaml')
             if e.args[0] == 2 and e.filename:
@@ -134,10 +192,13 @@ class Pod(object):
 
     def list_dir(self, pod_path='/', recursive=True):
         path = self._normalize_path(pod_path)
+        self.dependencies.add_dir(pod_path)
         return self.storage.listdir(path, recursive=recursive)
 
     def open_file(self, pod_path, mode=None):
         path = self._normalize_path(pod_path)
+        if mode is None or 'r' in mode:
+            self.dependencies.add(pod_path)
         return self.storage.open(path, mode=mode)
 
     def file_modified(self, pod_path):
@@ -146,15 +207,21 @@ class Pod(object):
 
     def read_file(self, pod_path):
         path = self._normalize_path(pod_path)
+        self.dependencies.add(pod_path)
         return self.storage.read(path)
 
     def walk(self, pod_path):
         path = self._normalize_path(pod_path)
+        self.dependencies.add_dir(pod_path)
         return self.storage.walk(path)
 
     def write_file(self, pod_path, content):
         path = self._normalize_path(pod_path)
         self.storage.write(path, content)
+        self.snapshot.invalidate(pod_path)
+        self.csv_tables.invalidate(pod_path)
+        self.content_manifest.update(pod_path)
+        self.document_indexes.invalidate(pod_path)
 
     def file_size(self, pod_path):
         path = self._normalize_path(pod_path)
@@ -162,16 +229,33 @@ class Pod(object):
 
     def file_exists(self, pod_path):
         path = self._normalize_path(pod_path)
+        self.dependencies.add(pod_path)
         return self.storage.exists(path)
 
     def delete_file(self, pod_path):
         path = self._normalize_path(pod_path)
-        return self.storage.delete(path)
+        try:
+            return self.storage.delete(path)
+        finally:
+            self.snapshot.invalidate(pod_path)
+            self.csv_tables.invalidate(pod_path)
+            self.content_manifest.update(pod_path)
+            self.document_indexes.invalidate(pod_path)
 
     def move_file_to(self, source_pod_path, destination_pod_path):
         source_path = self._normalize_path(source_pod_path)
         dest_path = self._normalize_path(destination_pod_path)
-        return self.storage.move_to(source_path, dest_path)
+        try:
+            return self.storage.move_to(source_path, dest_path)
+        finally:
+            self.snapshot.invalidate(source_pod_path)
+            self.snapshot.invalidate(destination_pod_path)
+            self.csv_tables.invalidate(source_pod_path)
+            self.csv_tables.invalidate(destination_pod_path)
+            self.content_manifest.update(source_pod_path)
+            self.content_manifest.update(destination_pod_path)
+            self.document_indexes.invalidate(source_pod_path)
+            self.document_indexes.invalidate(destination_pod_path)
 
     def list_collections(self, paths=None):
         cols = collection.Collection.list(self)
@@ -192,18 +276,24 @@ class Pod(object):
 
     def get_static(self, pod_path, locale=None):
         """Returns a StaticFile, given the static file's pod path."""
-        for route in self.routes.static_routing_map.iter_rules():
-            controller = route.endpoint
-            if controller.KIND == messages.Kind.STATIC:
-                serving_path = controller.match_pod_path(pod_path)
-                if serving_path:
-                    return static.StaticFile(pod_path, serving_path, locale=locale,
-                                             pod=self, controller=controller,
-                                             fingerprinted=controller.fingerprinted,
-                                             localization=controller.localization)
-        text = ('Either no file exists at "{}" or the "static_dirs" setting was '
-                'not configured for this path in podspec.yaml.'.format(pod_path))
-        raise static.BadStaticFileError(text)
+        resolver = self.routes.static_resolver
+        # Fingerprints are part of serving paths, so files served with caching
+        # disabled (e.g. by the dev server) are resolved on each call.
+        key = (pod_path, str(locale) if locale is not None else None)
+        if self.env.cached and key in resolver.cache:
+            return resolver.cache[key]
+        controller, serving_path = resolver.resolve(pod_path)
+        if controller is None:
+            text = ('Either no file exists at "{}" or the "static_dirs" setting was '
+                    'not configured for this path in podspec.yaml.'.format(pod_path))
+            raise static.BadStaticFileError(text)
+        static_file = static.StaticFile(pod_path, serving_path, locale=locale,
+                                        pod=self, controller=controller,
+                                        fingerprinted=controller.fingerprinted,
+                                        localization=controller.localization)
+        if self.env.cached:
+            resolver.cache[key] = static_file
+        return static_file
 
     def get_doc(self, pod_path, locale=None):
         """Returns a document, given the document's pod path."""
@@ -238,46 +328,160 @@ class Pod(object):
         pod_path = os.path.join(collection.Collection.CONTENT_PATH, collection_path)
         return collection.Collection.get(pod_path, _pod=self)
 
-    def export(self):
-        """Builds the pod, returning a mapping of paths to content."""
-        output = {}
+    def export_path(self, path):
+        """Renders the content of a single concrete path."""
+        controller, params = self.match(path)
+        try:
+            if self.profiler is None:
+                return controller.render(params, inject=False)
+            with self.profiler.profile(path, controller) as record:
+                content = controller.render(params, inject=False)
+                record.size = len(content) if content else 0
+            return content
+        except:
+            self.logger.error('Error building: {}'.format(controller))
+            raise
+
+    def _export_path_and_dependencies(self, path):
+        with self.dependencies.record() as pod_paths:
+            content = self.export_path(path)
+        return content, pod_paths
+
+    def _export_paths(self, paths):
+        for path in paths:
+            content, pod_paths = self._export_path_and_dependencies(path)
+            yield path, content, pod_paths, None
+
+    def _export_paths_in_pool(self, paths, workers):
+        """Renders paths across a pool of processes, each of which loads its
+        own copy of the pod. Results are yielded in the same order as paths."""
+        if pool is None:
+            text = 'Parallel builds are unavailable in this environment.'
+            raise utils.UnavailableError(text)
+        # Workers share the env (including its fingerprint) of this pod.
+        config = copy.deepcopy(self.env.config)
+        config.fingerprint = self.env.fingerprint
+        render_cache_max_size = None
+        if self.render_cache is not None:
+            render_cache_max_size = self.render_cache.max_size
+        initargs = (self.root, self.storage, protojson.encode_message(config),
+                    render_cache_max_size, self.profiler is not None)
+        process_pool = pool.Pool(workers, _init_export_worker, initargs)
+        chunksize = max(1, len(paths) // (workers * 4))
+        try:
+            for result in process_pool.imap(_export_worker, paths, chunksize):
+                yield result
+            process_pool.close()
+        except:
+            process_pool.terminate()
+            raise
+        finally:
+            process_pool.join()
+
+    def iter_export(self, workers=None, dependency_graph=None, reuse=None,
+                    shard=None):
+        """Builds the pod, yielding (path, content) tuples one at a time so
+        that the full build never needs to be held in memory.
+
+        Args:
+          workers: Number of processes to render paths with. By default, paths
+              are rendered serially in the current process.
+          dependency_graph: A DependencyGraph in which to record the files
+              read to build each path.
+          reuse: A function returning the previously built content of a path
+              (or None). If provided along with a dependency graph, paths
+              whose dependencies are unchanged are not re-rendered.
+          shard: A Shard, to only build a subset of the pod's paths. The error
+              page is built by the first shard.
+        """
         routes = self.get_routes()
-        paths = []
-        for items in routes.get_locales_to_paths().values():
-            paths += items
+        locales_to_paths = routes.get_locales_to_paths()
+        if shard is not None:
+            paths = shard.list_paths(locales_to_paths)
+        else:
+            paths = []
+            for items in locales_to_paths.values():
+                paths += items
+        # Listing paths fingerprints static files and parses documents, which
+        # workers then reuse.
+        self.fingerprints.save()
+        self.snapshot.save()
         text = 'Building: %(value)d/{} (in %(elapsed)s)'
         widgets = [progressbar.FormatLabel(text.format(len(paths)))]
         bar = progressbar.ProgressBar(widgets=widgets, maxval=len(paths))
         bar.start()
-        for path in paths:
-            controller, params = self.match(path)
-            try:
-              output[path] = controller.render(params, inject=False)
-            except:
-              self.logger.error('Error building: {}'.format(controller))
-              raise
+        if dependency_graph is not None and reuse is not None:
+            paths_to_render = []
+            for path in paths:
+                content = None
+                if not dependency_graph.is_dirty(path):
+                    content = reuse(path)
+                if content is None:
+                    paths_to_render.append(path)
+                else:
+                    bar.update(bar.currval + 1)
+                    yield path, content
+            paths = paths_to_render
+        if workers is not None and workers > 1:
+            results = self._export_paths_in_pool(paths, workers)
+        else:
+            results = self._export_paths(paths)
+        for path, content, pod_paths, record in results:
+            if record is not None:
+                self.profiler.records.append(record)
+            if dependency_graph is not None:
+                dependency_graph.add(path, pod_paths)
             bar.update(bar.currval + 1)
+            yield path, content
         error_controller = routes.match_error('/404.html')
-        if error_controller:
-            output['/404.html'] = error_controller.render({})
+        if error_controller and (shard is None or shard.is_first):
+            yield '/404.html', error_controller.render({})
+        if self.render_cache is not None:
+            self.render_cache.prune()
+        self.fingerprints.save()
+        self.snapshot.save()
         bar.finish()
-        return output
-
-    def dump(self, suffix='index.html', append_slashes=True):
-        output = self.export()
-        clean_output = {}
-        if suffix:
-            for path, content in output.iteritems():
-                if (append_slashes
-                    and not path.endswith('/')
-                    and not os.path.splitext(path)[-1]):
-                    path = path.rstrip('/') + '/'
-                if append_slashes and path.endswith('/') and suffix:
-                    path += suffix
-                clean_output[path] = content
-        else:
-            clean_output = output
-        return clean_output
+
+    def export(self, workers=None, dependency_graph=None, reuse=None,
+               shard=None):
+        """Builds the pod, returning a mapping of paths to content. See
+        `iter_export` for arguments."""
+        return dict(self.iter_export(
+            workers=workers, dependency_graph=dependency_graph, reuse=reuse,
+            shard=shard))
+
+    @staticmethod
+    def get_dump_path(path, suffix='index.html', append_slashes=True):
+        """Returns the path that an exported path is dumped to."""
+        if not suffix:
+            return path
+        if (append_slashes
+            and not path.endswith('/')
+            and not os.path.splitext(path)[-1]):
+            path = path.rstrip('/') + '/'
+        if append_slashes and path.endswith('/') and suffix:
+            path += suffix
+        return path
+
+    def iter_dump(self, suffix='index.html', append_slashes=True, workers=None,
+                  dependency_graph=None, reuse=None, shard=None):
+        """Builds the pod, yielding (path, content) tuples using the paths that
+        files are written to."""
+        if reuse is not None:
+            read_dumped_path = reuse
+            reuse = lambda path: read_dumped_path(
+                Pod.get_dump_path(path, suffix, append_slashes))
+        results = self.iter_export(
+            workers=workers, dependency_graph=dependency_graph, reuse=reuse,
+            shard=shard)
+        for path, content in results:
+            yield Pod.get_dump_path(path, suffix, append_slashes), content
+
+    def dump(self, suffix='index.html', append_slashes=True, workers=None,
+             dependency_graph=None, reuse=None, shard=None):
+        return dict(self.iter_dump(
+            suffix=suffix, append_slashes=append_slashes, workers=workers,
+            dependency_graph=dependency_graph, reuse=reuse, shard=shard))
 
     def to_message(self):
         message = messages.PodMessage()
@@ -440,7 +644,10 @@ class Pod(object):
         if self.env.cached:
             kwargs['bytecode_cache'] = self._get_bytecode_cache()
         kwargs['extensions'].extend(self.list_jinja_extensions())
-        env = jinja2.Environment(**kwargs)
+        if root is None:
+            env = dependency.Environment(self.dependencies, **kwargs)
+        else:
+            env = jinja2.Environment(**kwargs)
         env.globals.update({'g': tags.create_builtin_tags(self, use_cache=self.env.cached)})
         env.filters.update(tags.create_builtin_filters())
         get_gettext_func = self.catalogs.get_gettext_translations
@@ -467,10 +674,12 @@ class Pod(object):
         return locale
 
     def load(self):
-        self.routes.routing_map
+        if not self.routes.load_manifest(background=True):
+            self.routes.routing_map
+            self.snapshot.save()
 
     def read_yaml(self, path):
-        fields = utils.parse_yaml(self.read_file(path), pod=self)
+        fields = self.snapshot.load_yaml(path)
         return utils.untag_fields(fields)
 
     def write_yaml(self, path, content):
@@ -482,4 +691,10 @@ class Pod(object):
         return json.load(fp)
 
     def read_csv(self, path, locale=utils.SENTINEL):
-        return utils.get_rows_from_csv(pod=self, path=path, locale=locale)
+        # Rows are copied from the cached table, so they can be modified.
+        return list(self.csv_tables.get(path, locale=locale))
+
+    def iter_csv(self, path, locale=utils.SENTINEL):
+        """Yields the rows of a CSV file one at a time, for files too large
+        to be stored."""
+        return utils.iter_rows_from_csv(pod=self, path=path, locale=locale)
@@ -51,6 +51,13 @@ class PodTest(unittest.TestCase):
     def test_export(self):
         self.pod.export()
 
+    def test_export_workers(self):
+        expected = self.pod.export()
+        result = self.pod.export(workers=2)
+        self.assertEqual(sorted(expected.keys()), sorted(result.keys()))
+        for path, content in expected.iteritems():
+            self.assertEqual(content, result[path])
+
     def test_dump(self):
         paths = [
             '/about/index.html',
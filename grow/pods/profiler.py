@@ -0,0 +1,170 @@
+"""Profiles the time spent building each path of a pod.
+
+When a pod has a profiler, each path built by `Pod.export` is recorded along
+with its wall time, CPU time and output size. Records are rolled up by view
+template and by collection to find the slowest parts of a build. The report
+also lists the hits, misses and evictions of memoized functions (see
+`utils.memoize`) in the building process.
+"""
+
+from . import messages
+from grow.common import utils
+import collections
+import contextlib
+import json
+import os
+import texttable
+import time
+
+
+def _get_cpu_time():
+    user_time, system_time = os.times()[:2]
+    return user_time + system_time
+
+
+class Record(object):
+    """The profile of a single path."""
+
+    def __init__(self, path, kind=None, view=None, collection=None,
+                 locale=None):
+        self.path = path
+        self.kind = kind
+        self.view = view
+        self.collection = collection
+        self.locale = locale
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.size = 0
+
+    def __repr__(self):
+        return '<Record(path=\'{}\', wall_time={:.3f})>'.format(
+            self.path, self.wall_time)
+
+    @classmethod
+    def from_controller(cls, path, controller):
+        record = cls(path, kind=str(controller.KIND))
+        if controller.KIND == messages.Kind.RENDERED:
+            record.view = controller.view
+            record.locale = str(controller.locale) if controller.locale else None
+            if controller.document:
+                record.collection = controller.document.collection.pod_path
+        return record
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'kind': self.kind,
+            'view': self.view,
+            'collection': self.collection,
+            'locale': self.locale,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'size': self.size,
+        }
+
+
+class Profiler(object):
+
+    def __init__(self):
+        self.records = []
+
+    @contextlib.contextmanager
+    def profile(self, path, controller):
+        """Times the body of the context, which should set the record's size
+        once the path is rendered."""
+        record = Record.from_controller(path, controller)
+        start_wall_time = time.time()
+        start_cpu_time = _get_cpu_time()
+        yield record
+        record.wall_time = time.time() - start_wall_time
+        record.cpu_time = _get_cpu_time() - start_cpu_time
+        self.records.append(record)
+
+    def list_slowest(self, limit=None):
+        records = sorted(self.records, key=lambda record: -record.wall_time)
+        return records[:limit] if limit else records
+
+    def get_totals(self, attribute):
+        """Returns a list of totals, slowest first, for the records grouped by
+        an attribute, such as "view" or "collection"."""
+        totals = collections.OrderedDict()
+        for record in self.records:
+            key = getattr(record, attribute)
+            if key is None:
+                continue
+            if key not in totals:
+                totals[key] = {
+                    attribute: key,
+                    'count': 0,
+                    'wall_time': 0.0,
+                    'cpu_time': 0.0,
+                    'size': 0,
+                }
+            total = totals[key]
+            total['count'] += 1
+            total['wall_time'] += record.wall_time
+            total['cpu_time'] += record.cpu_time
+            total['size'] += record.size
+        return sorted(totals.values(), key=lambda total: -total['wall_time'])
+
+    def to_dict(self):
+        return {
+            'num_paths': len(self.records),
+            'wall_time': sum(record.wall_time for record in self.records),
+            'cpu_time': sum(record.cpu_time for record in self.records),
+            'size': sum(record.size for record in self.records),
+            'paths': [record.to_dict() for record in self.list_slowest()],
+            'views': self.get_totals('view'),
+            'collections': self.get_totals('collection'),
+            'caches': utils.get_memoize_stats(),
+        }
+
+    def to_string(self):
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+
+    def to_tables(self, limit=10):
+        results = []
+
+        table = texttable.Texttable(max_width=0)
+        table.set_deco(texttable.Texttable.HEADER)
+        rows = []
+        rows.append(['Slowest paths', 'Wall (s)', 'CPU (s)', 'Size'])
+        for record in self.list_slowest(limit):
+            rows.append([record.path, '{:.3f}'.format(record.wall_time),
+                         '{:.3f}'.format(record.cpu_time), record.size])
+        table.add_rows(rows)
+        results.append(table.draw())
+
+        for attribute, label in (('view', 'Slowest views'),
+                                 ('collection', 'Slowest collections')):
+            totals = self.get_totals(attribute)[:limit]
+            if not totals:
+                continue
+            table = texttable.Texttable(max_width=0)
+            table.set_deco(texttable.Texttable.HEADER)
+            rows = []
+            rows.append([label, 'Paths', 'Wall (s)', 'CPU (s)', 'Size'])
+            for total in totals:
+                rows.append([total[attribute], total['count'],
+                             '{:.3f}'.format(total['wall_time']),
+                             '{:.3f}'.format(total['cpu_time']),
+                             total['size']])
+            table.add_rows(rows)
+            results.append(table.draw())
+
+        caches = sorted(utils.get_memoize_stats(),
+                        key=lambda stats: -(stats['hits'] + stats['misses']))
+        if caches:
+            table = texttable.Texttable(max_width=0)
+            table.set_deco(texttable.Texttable.HEADER)
+            rows = []
+            rows.append(['Caches', 'Hits', 'Misses', 'Evictions', 'Uncached',
+                         'Size'])
+            for stats in caches[:limit]:
+                rows.append([stats['name'], stats['hits'], stats['misses'],
+                             stats['evictions'], stats['uncached'],
+                             stats['size']])
+            table.add_rows(rows)
+            results.append(table.draw())
+
+        return results
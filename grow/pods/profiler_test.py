@@ -0,0 +1,42 @@
+from . import pods
+from . import profiler
+from . import storage
+from grow.testing import testing
+import json
+import unittest
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.pod.profiler = profiler.Profiler()
+
+    def test_export(self):
+        output = self.pod.export()
+        records = self.pod.profiler.records
+        paths = set(record.path for record in records)
+        self.assertEqual(set(output.keys()) - set(['/404.html']), paths)
+        record = [record for record in records if record.path == '/about/'][0]
+        self.assertEqual('/views/base.html', record.view)
+        self.assertEqual('/content/pages', record.collection)
+        self.assertEqual(len(output['/about/']), record.size)
+        self.assertEqual(3, len(self.pod.profiler.list_slowest(3)))
+
+        report = json.loads(self.pod.profiler.to_string())
+        self.assertEqual(len(records), report['num_paths'])
+        views = [total['view'] for total in report['views']]
+        self.assertIn('/views/base.html', views)
+        caches = [stats['name'] for stats in report['caches']]
+        self.assertIn('grow.common.utils.parse_yaml', caches)
+        self.pod.profiler.to_tables()
+
+    def test_export_workers(self):
+        self.pod.export(workers=2)
+        paths = set(record.path for record in self.pod.profiler.records)
+        self.assertIn('/about/', paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
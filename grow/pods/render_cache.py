@@ -0,0 +1,120 @@
+"""On-disk cache of rendered pages, shared across builds.
+
+Each entry stores the output of a `RenderedController.render` call along with
+a content hash of every pod path read to produce it (see `dependency`). An
+entry is reused only if the pod's signature (SDK version, podspec and
+environment config) and the content of each of its dependencies are unchanged,
+so a hit returns exactly what rendering would have, without invoking Jinja.
+
+Entries are stored as separate files under "/.grow/cache/render/" so that the
+processes of a parallel build can share the cache. The cache is bounded in
+size: `prune` evicts the least recently used entries.
+"""
+
+from . import dependency
+from grow.common import utils
+import hashlib
+import json
+import logging
+import os
+
+
+class RenderCache(object):
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # Bytes.
+    CACHE_DIR = '/.grow/cache/render/'
+
+    def __init__(self, pod, max_size=None):
+        self.pod = pod
+        self.max_size = self.DEFAULT_MAX_SIZE if max_size is None else max_size
+        self.cache_dir = os.path.join(pod.root, self.CACHE_DIR.lstrip('/'))
+        self._signature = None
+        self._hashes = {}
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = dependency.get_signature(self.pod)
+        return self._signature
+
+    def _get_hash(self, pod_path):
+        # Read directly from storage so hashing isn't recorded as a dependency.
+        if pod_path in self._hashes:
+            return self._hashes[pod_path]
+        path = os.path.join(self.pod.root, pod_path.lstrip('/'))
+        storage = self.pod.storage
+        try:
+            if pod_path.endswith('/'):
+                content = '\n'.join(sorted(storage.listdir(path)))
+            else:
+                content = storage.read(path)
+            value = hashlib.sha1(content).hexdigest()
+        except (IOError, OSError):
+            value = None
+        self._hashes[pod_path] = value
+        return value
+
+    def _get_filename(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get_key(self, *parts):
+        """Returns a key identifying a render, such as its view, document and
+        locale."""
+        sha = hashlib.sha1(self.signature)
+        sha.update(json.dumps([unicode(part) if part is not None else None
+                               for part in parts]))
+        return sha.hexdigest()
+
+    def get(self, key):
+        """Returns a tuple of the cached content for a key and the pod paths it
+        depends on, or (None, None) if the entry is missing or stale."""
+        filename = self._get_filename(key)
+        try:
+            with open(filename, 'rb') as fp:
+                entry = json.load(fp)
+        except (IOError, OSError, ValueError):
+            return None, None
+        dependencies = entry['dependencies']
+        for pod_path, value in dependencies.iteritems():
+            if self._get_hash(pod_path) != value:
+                return None, None
+        try:
+            os.utime(filename, None)  # Marks the entry as recently used.
+        except OSError:
+            pass
+        return entry['content'], dependencies.keys()
+
+    def set(self, key, content, pod_paths):
+        entry = {
+            'content': content,
+            'dependencies': dict((pod_path, self._get_hash(pod_path))
+                                 for pod_path in pod_paths),
+        }
+        try:
+            utils.write_file_atomically(
+                self._get_filename(key), json.dumps(entry))
+        except (IOError, OSError) as e:
+            logging.warning('Unable to write render cache entry: {}'.format(e))
+
+    def prune(self):
+        """Evicts the least recently used entries until the cache fits within
+        its maximum size."""
+        entries = []
+        total_size = 0
+        for root, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
@@ -0,0 +1,47 @@
+from . import render_cache
+from grow.testing import testing
+import mock
+import os
+import unittest
+
+
+class RenderCacheTest(testing.PodCacheTestCase):
+
+    def create_pod(self):
+        pod = super(RenderCacheTest, self).create_pod()
+        pod.render_cache = render_cache.RenderCache(pod)
+        return pod
+
+    def test_render(self):
+        controller, params = self.pod.match('/about/')
+        content = controller.render(params, inject=False)
+
+        # A new build reuses the content without rendering the template.
+        pod = self.create_pod()
+        controller, params = pod.match('/about/')
+        with mock.patch('jinja2.Template.render') as mock_render:
+            self.assertEqual(content, controller.render(params, inject=False))
+            self.assertFalse(mock_render.called)
+
+        # Changing a dependency invalidates the entry.
+        path = os.path.join(self.dir_path, 'content/pages/about.yaml')
+        with open(path, 'a') as fp:
+            fp.write('\n# Changed.\n')
+        pod = self.create_pod()
+        controller, params = pod.match('/about/')
+        with mock.patch('jinja2.Template.render') as mock_render:
+            mock_render.return_value = 'rendered'
+            self.assertEqual('rendered', controller.render(params, inject=False))
+
+    def test_prune(self):
+        cache = self.pod.render_cache
+        for i in range(3):
+            cache.set(cache.get_key(i), 'x' * 100, [])
+        self.assertEqual(('x' * 100, []), cache.get(cache.get_key(0)))
+        cache.max_size = 0
+        cache.prune()
+        self.assertEqual((None, None), cache.get(cache.get_key(0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
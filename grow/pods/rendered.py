@@ -39,18 +39,51 @@ class RenderedController(controllers.BaseController):
             raise
         return [self.document.get_serving_path()]
 
+    def _get_render_key_parts(self):
+        doc_pod_path = self.document.pod_path if self.document else None
+        return self.view, doc_pod_path, self.locale, self.path
+
+    def _get_template_kwargs(self):
+        return {
+            'doc': self.document,
+            'env': self.pod.env,
+            'podspec': self.pod.get_podspec(),
+        }
+
+    def _record_dependencies(self):
+        # Documents, blueprints and catalogs are loaded once and then cached,
+        # so they're recorded explicitly rather than when they're read.
+        dependencies = self.pod.dependencies
+        if not dependencies.is_recording:
+            return
+        if self.document:
+            dependencies.update(self.document._dependencies)
+            dependencies.add(self.document.collection._blueprint_path)
+        if self.locale:
+            dependencies.update(self.pod.catalogs.list_mo_paths(self.locale))
+
     def render(self, params, inject=True):
         if inject:
             self.pod.inject_preprocessors(doc=self.document)
+        render_cache = self.pod.render_cache
+        if render_cache is None:
+            return self._render()
+        key = render_cache.get_key(*self._get_render_key_parts())
+        content, pod_paths = render_cache.get(key)
+        if content is not None:
+            self.pod.dependencies.update(pod_paths)
+            return content
+        with self.pod.dependencies.record() as pod_paths:
+            content = self._render()
+        render_cache.set(key, content, pod_paths)
+        return content
+
+    def _render(self):
+        self._record_dependencies()
         env = self.pod.get_jinja_env(self.locale)
         template = env.get_template(self.view.lstrip('/'))
         try:
-            kwargs = {
-                'doc': self.document,
-                'env': self.pod.env,
-                'podspec': self.pod.get_podspec(),
-            }
-            return template.render(kwargs).lstrip()
+            return template.render(self._get_template_kwargs()).lstrip()
         except Exception as e:
             text = 'Error building {}: {}'
             exception = errors.BuildError(text.format(self, e))
@@ -0,0 +1,158 @@
+"""Persists the routes of a pod's documents between runs.
+
+Building the routing map parses every document in the pod. After a full
+build, the serving path, controller kind, pod path, locale and view of each
+document's routes are written to "/.grow/cache/routes.json", along with the
+stamps (modification time and size) of the files read to route the document.
+
+Loading the manifest restores the routes without parsing any documents: each
+route's document is only loaded when its controller renders. `Routes` then
+validates the entries against the current stamps, re-parsing only the
+documents whose files changed (see `Routes.load_manifest`).
+"""
+
+from . import collection as collection_lib
+from . import dependency
+from . import pagination
+from . import rendered
+from grow.common import utils
+import json
+import logging
+import os
+
+
+class ManifestController(rendered.RenderedController):
+    """Controller of a document restored from a route manifest. The document
+    is loaded on first use."""
+
+    def __init__(self, view, serving_path, pod_path, root_pod_path,
+                 collection_path, locale=None, locale_kwarg=None, _pod=None):
+        super(ManifestController, self).__init__(view=view, _pod=_pod)
+        self.serving_path = serving_path
+        self.pod_path = pod_path
+        self.root_pod_path = root_pod_path
+        self.collection_path = collection_path
+        self._locale = locale
+        self._locale_kwarg = locale_kwarg
+        self._document = None
+
+    def __repr__(self):
+        return '<Rendered(view=\'{}\', doc=\'{}\')>'.format(
+            self.view, self.pod_path)
+
+    @property
+    def document(self):
+        if self._document is None and self.pod_path is not None:
+            collection = collection_lib.Collection.get(
+                self.collection_path, _pod=self.pod)
+            self._document = collection.get_doc(
+                self.pod_path, locale=self._locale_kwarg)
+        return self._document
+
+    @document.setter
+    def document(self, value):
+        # Set to None by `RenderedController.__init__`.
+        self._document = value
+
+    @property
+    def locale(self):
+        if self._locale is not None:
+            return self.pod.normalize_locale(self._locale)
+
+    def list_concrete_paths(self):
+        return [self.serving_path]
+
+
+class RouteManifest(object):
+    FILENAME = '/.grow/cache/routes.json'
+
+    def __init__(self, pod):
+        self.pod = pod
+        self.filename = os.path.join(pod.root, self.FILENAME.lstrip('/'))
+
+    def get_stamps(self, pod_paths):
+        return dict((pod_path, dependency.get_stamp(self.pod, pod_path))
+                    for pod_path in pod_paths)
+
+    def is_stale(self, stamps):
+        for pod_path, stamp in stamps.iteritems():
+            if dependency.get_stamp(self.pod, pod_path) != stamp:
+                return True
+        return False
+
+    def create_collection_entry(self, collection, pagination_rules=None):
+        """Returns the stamp of a collection's blueprint, the files in its
+        directory, so that added files can be found, and the paths, locales
+        and numbers of its pages."""
+        return {
+            'blueprint': self.get_stamps([collection._blueprint_path]),
+            'files': self.list_files(collection.pod_path),
+            'pagination': pagination.list_pages(pagination_rules or []),
+        }
+
+    def list_files(self, collection_path):
+        return sorted(self.pod.list_dir(collection_path))
+
+    def create_entry(self, rules_and_docs):
+        """Returns the routes of a root pod path's documents and the stamps of
+        the files read to route them."""
+        pod_paths = set()
+        routes = []
+        for rule, doc in rules_and_docs:
+            # Blueprints are stamped per collection.
+            pod_paths.update(
+                pod_path for pod_path in doc._dependencies
+                if not pod_path.endswith('/')
+                and pod_path != doc.collection._blueprint_path)
+            pod_paths.add(doc.pod_path)
+            locale_kwarg = doc._locale_kwarg
+            routes.append({
+                'path': rule.rule,
+                'kind': str(rule.endpoint.KIND),
+                'pod_path': doc.pod_path,
+                'collection': doc.collection.pod_path,
+                'locale': str(doc.locale) if doc.locale else None,
+                'locale_kwarg': str(locale_kwarg) if locale_kwarg else None,
+                'view': doc.view,
+            })
+        return {
+            'stamps': self.get_stamps(pod_paths),
+            'routes': routes,
+        }
+
+    def list_controllers(self, root_pod_path, entry):
+        """Yields a (serving path, controller) tuple for each route of an
+        entry."""
+        for route in entry['routes']:
+            controller = ManifestController(
+                view=route['view'], serving_path=route['path'],
+                pod_path=route['pod_path'], root_pod_path=root_pod_path,
+                collection_path=route['collection'], locale=route['locale'],
+                locale_kwarg=route['locale_kwarg'], _pod=self.pod)
+            yield route['path'], controller
+
+    def load(self):
+        """Returns a tuple of the collection entries and a list of (root pod
+        path, entry) tuples, or (None, None) if the manifest is missing or was
+        written for a different podspec, environment or SDK version."""
+        try:
+            with open(self.filename, 'rb') as fp:
+                data = json.load(fp)
+        except (IOError, OSError, ValueError):
+            return None, None
+        if data.get('signature') != dependency.get_signature(self.pod):
+            return None, None
+        return data['collections'], data['documents']
+
+    def write(self, collections, documents):
+        """Writes the manifest, given a dict of collection entries and a list
+        of (root pod path, entry) tuples."""
+        data = {
+            'signature': dependency.get_signature(self.pod),
+            'collections': collections,
+            'documents': documents,
+        }
+        try:
+            utils.write_file_atomically(self.filename, json.dumps(data))
+        except (IOError, OSError) as e:
+            logging.warning('Unable to write route manifest: {}'.format(e))
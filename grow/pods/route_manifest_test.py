@@ -0,0 +1,72 @@
+from . import collection
+from grow.testing import testing
+import mock
+import os
+import time
+import unittest
+import webob.exc
+
+
+class RouteManifestTest(testing.PodCacheTestCase):
+
+    def setUp(self):
+        super(RouteManifestTest, self).setUp()
+        self.paths = sorted(self.pod.routes.list_concrete_paths())
+
+    def _write(self, pod_path, content):
+        self.pod.write_file(pod_path, content)
+        # Ensures the modification time changes.
+        path = os.path.join(self.dir_path, pod_path.lstrip('/'))
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+
+    def test_load_manifest(self):
+        pod = self.create_pod()
+        with mock.patch.object(
+                collection.Collection, 'list_servable_documents') as mock_list:
+            self.assertTrue(pod.routes.load_manifest())
+            self.assertFalse(mock_list.called)
+        self.assertEqual(self.paths, sorted(pod.routes.list_concrete_paths()))
+        controller, params = pod.match('/fr/about/')
+        self.assertEqual('fr', str(controller.locale))
+        expected_controller, _ = self.pod.match('/fr/about/')
+        self.assertEqual(expected_controller.render({}, inject=False),
+                         controller.render(params, inject=False))
+
+    def test_load_manifest_without_manifest(self):
+        os.remove(self.pod.routes.manifest.filename)
+        self.assertFalse(self.create_pod().routes.load_manifest())
+
+    def test_validate_manifest(self):
+        # Modified, added and removed documents are re-parsed.
+        self._write('/content/pages/about.yaml', (
+            '$title: About\n'
+            '$path: /about-updated/\n'))
+        self._write('/content/pages/new.yaml', '$title: New\n')
+        self.pod.delete_file('/content/pages/intro@fr.md')
+        pod = self.create_pod()
+        self.assertTrue(pod.routes.load_manifest())
+        paths = pod.routes.list_concrete_paths()
+        self.assertIn('/about-updated/', paths)
+        self.assertNotIn('/about/', paths)
+        self.assertIn('/new/', paths)
+        self.assertEqual(sorted(self.create_pod().routes.list_concrete_paths()),
+                         sorted(paths))
+
+    def test_match_validates_entry(self):
+        self._write('/content/pages/about.yaml', (
+            '$title: About\n'
+            '$path: /about-updated/\n'))
+        pod = self.create_pod()
+        with mock.patch.object(pod.routes, 'validate_manifest'):
+            pod.routes.load_manifest(background=True)
+            # The matched entry is stale, so the document is re-parsed.
+            self.assertRaises(webob.exc.HTTPNotFound, pod.match, '/about/')
+        # The re-parsed document is routed at its new path.
+        controller, _ = pod.match('/about-updated/')
+        self.assertEqual('/content/pages/about.yaml',
+                         controller.document.pod_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,17 @@
+from . import collection as collection_lib
+from . import formats
 from . import locales
 from . import messages
+from . import pagination
 from . import rendered
+from . import route_manifest
 from . import sitemap
 from . import static
 from grow.common import utils
 from werkzeug import routing
 import collections
+import os
+import threading
 import webob
 import werkzeug
 
@@ -22,6 +28,12 @@ class DuplicatePathsError(Error, ValueError):
     pass
 
 
+def _to_unicode(path):
+    if isinstance(path, str):
+        return path.decode('utf-8', 'replace')
+    return path
+
+
 class Routes(object):
     converters = {'grow': GrowConverter}
 
@@ -30,9 +42,29 @@ class Routes(object):
         self._paths_to_locales_to_docs = collections.defaultdict(dict)
         self._routing_map = None
         self._static_routing_map = None
+        self._static_resolver = None
+        # Maps each concrete serving path to its rule, so exact paths are
+        # matched without iterating the routing map.
+        self._paths_to_rules = {}
+        self._rules = []
+        # Set to None to neither read nor write the route manifest.
+        self.manifest = route_manifest.RouteManifest(pod)
+        self._collection_entries = {}
+        self._root_paths_to_entries = {}
+        # Root pod paths restored from the manifest and not yet validated.
+        self._unvalidated_root_paths = set()
+        self._manifest_pending = False
+        self._lock = threading.RLock()
+        # Maps the root pod path of each document to its (rule, doc) tuples,
+        # so that a document's rules can be updated without a full rebuild.
+        self._root_paths_to_rules_and_docs = collections.OrderedDict()
+        # Maps collection pod paths to the rules of their pages.
+        self._collection_paths_to_pagination_rules = collections.OrderedDict()
+        self._static_rules = []
 
     def __iter__(self):
-        return self.routing_map.iter_rules()
+        self.routing_map
+        return iter(self._rules)
 
     @property
     def podspec(self):
@@ -47,34 +79,266 @@ class Routes(object):
             locale = locales.Locale(locale)
         return self._paths_to_locales_to_docs.get(path, {}).get(locale)
 
+    def _create_rule_and_doc(self, doc):
+        controller = rendered.RenderedController(
+            view=doc.view, document=doc, _pod=self.pod)
+        rule = routing.Rule(doc.get_serving_path(), endpoint=controller)
+        return rule, doc
+
     def _build_routing_map(self, inject=False):
         new_paths_to_locales_to_docs = collections.defaultdict(dict)
-        rules = []
+        root_paths_to_rules_and_docs = collections.OrderedDict()
+        collection_paths_to_pagination_rules = collections.OrderedDict()
+        collection_entries = {}
         # Content documents.
         for collection in self.pod.list_collections():
             for doc in collection.list_servable_documents(include_hidden=True, inject=inject):
-                controller = rendered.RenderedController(
-                    view=doc.view, document=doc, _pod=self.pod)
-                rule = routing.Rule(doc.get_serving_path(), endpoint=controller)
-                rules.append(rule)
+                rules_and_docs = root_paths_to_rules_and_docs.setdefault(
+                    doc.root_pod_path, [])
+                rules_and_docs.append(self._create_rule_and_doc(doc))
                 new_paths_to_locales_to_docs[doc.pod_path][doc.locale] = doc
+            pagination_rules = pagination.create_rules(collection)
+            if pagination_rules:
+                collection_paths_to_pagination_rules[collection.pod_path] = \
+                    pagination_rules
+            if self.manifest is not None and not inject:
+                collection_entries[collection.pod_path] = \
+                    self.manifest.create_collection_entry(
+                        collection, pagination_rules)
         # Static routes.
-        rules += self._build_static_routing_map_and_return_rules()
-        self._routing_map = routing.Map(rules, converters=Routes.converters)
-        self._paths_to_locales_to_docs = new_paths_to_locales_to_docs
+        self._static_rules = self._build_static_routing_map_and_return_rules()
+        with self._lock:
+            self._root_paths_to_rules_and_docs = root_paths_to_rules_and_docs
+            self._collection_paths_to_pagination_rules = \
+                collection_paths_to_pagination_rules
+            self._paths_to_locales_to_docs = new_paths_to_locales_to_docs
+            self._unvalidated_root_paths = set()
+            self._manifest_pending = False
+            self._update_routing_map()
+            if self.manifest is not None and not inject:
+                self._collection_entries = collection_entries
+                self._root_paths_to_entries = dict(
+                    (root_pod_path, self.manifest.create_entry(rules_and_docs))
+                    for root_pod_path, rules_and_docs
+                    in root_paths_to_rules_and_docs.iteritems())
+                self._write_manifest()
+            return self._routing_map
+
+    def _update_routing_map(self):
+        rules = []
+        for rules_and_docs in self._root_paths_to_rules_and_docs.itervalues():
+            rules += [rule for rule, _ in rules_and_docs]
+        for pagination_rules in \
+                self._collection_paths_to_pagination_rules.itervalues():
+            rules += pagination_rules
+        rules += self._static_rules
+        # Concrete paths are matched by a lookup table, leaving only the
+        # patterned rules for werkzeug. Like werkzeug, the first rule wins.
+        paths_to_rules = {}
+        patterned_rules = []
+        for rule in rules:
+            if '<' in rule.rule:
+                # Rules are bound to a single map, so unbound copies are used.
+                patterned_rules.append(rule.empty())
+            else:
+                paths_to_rules.setdefault(_to_unicode(rule.rule), rule)
+        self._rules = rules
+        self._paths_to_rules = paths_to_rules
+        self._routing_map = routing.Map(
+            patterned_rules, converters=Routes.converters)
+        self.list_concrete_paths.reset()
         return self._routing_map
 
     def _build_static_routing_map_and_return_rules(self):
         rules = self.list_static_routes()
         self._static_routing_map = routing.Map(rules, converters=Routes.converters)
+        # Controllers are tried in the order that the map sorts their rules,
+        # so that more specific (e.g. localized) rules take precedence.
+        self._static_resolver = static.StaticResolver([
+            rule.endpoint for rule in self._static_routing_map.iter_rules()
+            if rule.endpoint.KIND == messages.Kind.STATIC])
         return [rule.empty() for rule in rules]
 
+    def _list_collections_for_path(self, pod_path):
+        # Collections list their documents recursively, so a document belongs
+        # to each collection in the directories above it.
+        content_path = collection_lib.Collection.CONTENT_PATH
+        dirname = os.path.dirname(pod_path)
+        collections_for_path = []
+        while dirname.startswith(content_path + '/'):
+            blueprint_path = os.path.join(
+                dirname, collection_lib.Collection.BLUEPRINT_PATH)
+            if self.pod.content_manifest.file_exists(blueprint_path):
+                collections_for_path.insert(0, self.pod.get_collection(dirname))
+            dirname = os.path.dirname(dirname)
+        return collections_for_path
+
+    def _write_manifest(self):
+        documents = [
+            (root_pod_path, self._root_paths_to_entries[root_pod_path])
+            for root_pod_path in self._root_paths_to_rules_and_docs
+            if root_pod_path in self._root_paths_to_entries]
+        self.manifest.write(self._collection_entries, documents)
+
+    def load_manifest(self, background=False):
+        """Restores the routes of documents from the manifest written by the
+        last build of the routing map, without parsing any documents.
+
+        Entries are validated against the stamps of the files they were read
+        from, either now or, if `background` is True, in a background thread.
+        Until then, an entry is validated when one of its paths is matched.
+        Only documents whose files changed are re-parsed. Returns False if
+        there is no usable manifest.
+        """
+        if self.manifest is None:
+            return False
+        collection_entries, documents = self.manifest.load()
+        if documents is None:
+            return False
+        root_paths_to_rules_and_docs = collections.OrderedDict()
+        for root_pod_path, entry in documents:
+            root_paths_to_rules_and_docs[root_pod_path] = [
+                (routing.Rule(path, endpoint=controller), None)
+                for path, controller
+                in self.manifest.list_controllers(root_pod_path, entry)]
+        collection_paths_to_pagination_rules = collections.OrderedDict(
+            (collection_path, list(pagination.create_rules_for_pages(
+                self.pod, collection_path, entry['pagination'])))
+            for collection_path, entry in sorted(collection_entries.iteritems())
+            if entry.get('pagination'))
+        static_rules = self._build_static_routing_map_and_return_rules()
+        with self._lock:
+            self._static_rules = static_rules
+            self._root_paths_to_rules_and_docs = root_paths_to_rules_and_docs
+            self._collection_paths_to_pagination_rules = \
+                collection_paths_to_pagination_rules
+            self._paths_to_locales_to_docs = collections.defaultdict(dict)
+            self._collection_entries = collection_entries
+            self._root_paths_to_entries = dict(documents)
+            self._unvalidated_root_paths = set(root_paths_to_rules_and_docs)
+            self._manifest_pending = True
+            self._update_routing_map()
+        if background:
+            thread = threading.Thread(target=self.validate_manifest)
+            thread.daemon = True
+            thread.start()
+        else:
+            self.validate_manifest()
+        return True
+
+    def _validate_root_path(self, root_pod_path):
+        self._unvalidated_root_paths.discard(root_pod_path)
+        entry = self._root_paths_to_entries.get(root_pod_path)
+        if entry is None or not self.manifest.is_stale(entry['stamps']):
+            return False
+        self.update(root_pod_path)
+        return True
+
+    def validate_manifest(self):
+        """Re-parses the documents of stale manifest entries and documents
+        added since the manifest was written."""
+        with self._lock:
+            if not self._manifest_pending:
+                return
+            collection_paths = set(
+                collection.pod_path
+                for collection in self.pod.list_collections())
+            if collection_paths != set(self._collection_entries) or any(
+                    self.manifest.is_stale(entry['blueprint'])
+                    for entry in self._collection_entries.itervalues()):
+                self._build_routing_map()
+                return
+            changed = False
+            for root_pod_path in list(self._unvalidated_root_paths):
+                changed = self._validate_root_path(root_pod_path) or changed
+            for collection_path, entry in self._collection_entries.iteritems():
+                files = self.manifest.list_files(collection_path)
+                if files == entry['files']:
+                    continue
+                # Removed files are found by the stamps of their entries.
+                for path in set(files) - set(entry['files']):
+                    self.update(os.path.join(collection_path, path.lstrip('/')))
+                entry['files'] = files
+                changed = True
+            self._manifest_pending = False
+            if changed:
+                self._write_manifest()
+
+    def update(self, pod_path):
+        """Updates the routes for a file under /content/ that was added,
+        modified or removed. Only the routes of the document (and its
+        localized documents) are replaced, unless the file is a blueprint, in
+        which case the routing map is rebuilt."""
+        if self._routing_map is None:
+            return  # Built on first use.
+        with self._lock:
+            self._update(pod_path)
+
+    def _update(self, pod_path):
+        basename = os.path.basename(pod_path)
+        if basename == collection_lib.Collection.BLUEPRINT_PATH:
+            self.reset_cache(rebuild=True)
+            return
+        slug, ext = os.path.splitext(basename)
+        if slug.startswith('_') or ext not in messages.extensions_to_formats:
+            return
+        root_pod_path, _ = formats.Format.parse_localized_path(pod_path)
+        rules_and_docs = []
+        pagination_changed = False
+        for collection in self._list_collections_for_path(root_pod_path):
+            docs = collection.list_servable_documents_for_path(
+                root_pod_path, include_hidden=True)
+            rules_and_docs += [self._create_rule_and_doc(doc) for doc in docs]
+            pagination_changed = (
+                self._update_pagination(collection) or pagination_changed)
+        old_rules_and_docs = self._root_paths_to_rules_and_docs.pop(
+            root_pod_path, [])
+        self._unvalidated_root_paths.discard(root_pod_path)
+        for _, doc in old_rules_and_docs:
+            if doc is None:  # Restored from the manifest.
+                continue
+            locales_to_docs = self._paths_to_locales_to_docs.get(doc.pod_path)
+            if locales_to_docs:
+                locales_to_docs.pop(doc.locale, None)
+                if not locales_to_docs:
+                    del self._paths_to_locales_to_docs[doc.pod_path]
+        if rules_and_docs:
+            self._root_paths_to_rules_and_docs[root_pod_path] = rules_and_docs
+            if self.manifest is not None:
+                self._root_paths_to_entries[root_pod_path] = \
+                    self.manifest.create_entry(rules_and_docs)
+        else:
+            self._root_paths_to_entries.pop(root_pod_path, None)
+        for _, doc in rules_and_docs:
+            self._paths_to_locales_to_docs[doc.pod_path][doc.locale] = doc
+        if old_rules_and_docs or rules_and_docs or pagination_changed:
+            self._update_routing_map()
+
+    def _update_pagination(self, collection):
+        # Pages are recreated, as any of them may list the document.
+        old_rules = self._collection_paths_to_pagination_rules.pop(
+            collection.pod_path, [])
+        rules = pagination.create_rules(collection)
+        if rules:
+            self._collection_paths_to_pagination_rules[collection.pod_path] = \
+                rules
+        entry = self._collection_entries.get(collection.pod_path)
+        if entry is not None:
+            entry['pagination'] = pagination.list_pages(rules)
+        return bool(old_rules or rules)
+
     @property
     def static_routing_map(self):
         if self._static_routing_map is None:
             self._build_static_routing_map_and_return_rules()
         return self._static_routing_map
 
+    @property
+    def static_resolver(self):
+        if self._static_resolver is None:
+            self._build_static_routing_map_and_return_rules()
+        return self._static_resolver
+
     @property
     def routing_map(self):
         if self._routing_map is None:
@@ -150,7 +414,25 @@ class Routes(object):
         """
         if '/..' in path:
             raise webob.exc.HTTPBadRequest('Invalid path.')
-        urls = self.routing_map.bind_to_environ(env)
+        routing_map = self.routing_map
+        key = _to_unicode(path)
+        rule = self._paths_to_rules.get(key)
+        if rule is not None and self._unvalidated_root_paths:
+            root_pod_path = getattr(rule.endpoint, 'root_pod_path', None)
+            if root_pod_path in self._unvalidated_root_paths:
+                with self._lock:
+                    self._validate_root_path(root_pod_path)
+                rule = self._paths_to_rules.get(key)
+        if rule is None and self._manifest_pending:
+            self.validate_manifest()
+            rule = self._paths_to_rules.get(key)
+        if rule is not None:
+            return rule.endpoint, {}
+        urls = routing_map.bind_to_environ(env)
+        if not key.endswith('/') and key + '/' in self._paths_to_rules:
+            # Matches werkzeug's redirect for paths missing a trailing slash.
+            raise routing.RequestRedirect(
+                urls.make_redirect_url(key + '/', urls.query_args))
         try:
             controller, params = urls.match(path)
             return controller, params
@@ -1,6 +1,7 @@
 from grow.pods import pods
 from grow.pods import storage
 from grow.testing import testing
+from werkzeug import routing
 import unittest
 import webob.exc
 
@@ -22,6 +23,23 @@ class RoutesTest(unittest.TestCase):
         self.assertRaises(webob.exc.HTTPNotFound, self.pod.match, '/dummy/')
         controller, params = self.pod.match('/app/static/file with spaces.txt')
 
+    def test_match_exact_path(self):
+        routes = self.pod.routes
+        routes.routing_map
+        # Documents are matched by the lookup table, not the werkzeug map.
+        self.assertIn(u'/about/', routes._paths_to_rules)
+        self.assertNotIn(
+            '/about/', [rule.rule for rule in routes.routing_map.iter_rules()])
+        controller, params = self.pod.match('/about/')
+        self.assertEqual('/content/pages/about.yaml',
+                         controller.document.pod_path)
+        self.assertEqual({}, params)
+        self.assertRaises(
+            routing.RequestRedirect, self.pod.match, '/about')
+        # Patterned static routes still match through the map.
+        controller, params = self.pod.match('/app/static/test.txt')
+        self.assertEqual('test.txt', params['filename'])
+
     def test_list_concrete_paths(self):
         expected = [
             '/',
@@ -89,6 +107,53 @@ class RoutesTest(unittest.TestCase):
         result = self.pod.routes.list_concrete_paths()
         self.assertItemsEqual(expected, result)
 
+    def _assert_routes_match_full_rebuild(self):
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        self.assertItemsEqual(pod.routes.list_concrete_paths(),
+                              self.pod.routes.list_concrete_paths())
+
+    def test_update(self):
+        routes = self.pod.routes
+        routes.list_concrete_paths()
+        paths = set(routes.list_concrete_paths())
+        self.assertIn('/it/contact-us/', paths)
+
+        # Modified document.
+        self.pod.write_file('/content/pages/contact.yaml', (
+            '$path: /{locale}/contact-updated/\n'
+            '$localization:\n'
+            '  path: /{locale}/contact-updated/\n'
+            '  default_locale: de\n'
+            '  locales:\n'
+            '  - de\n'
+            '  - it\n'))
+        routes.update('/content/pages/contact.yaml')
+        paths = set(routes.list_concrete_paths())
+        self.assertIn('/it/contact-updated/', paths)
+        self.assertNotIn('/it/contact-us/', paths)
+        self.assertNotIn('/fr/contact-us/', paths)
+        controller, _ = self.pod.match('/it/contact-updated/')
+        self.assertEqual('it', str(controller.locale))
+        self._assert_routes_match_full_rebuild()
+
+        # Added document.
+        self.pod.write_file('/content/pages/new.yaml', '$title: New\n')
+        routes.update('/content/pages/new.yaml')
+        self.assertIn('/new/', routes.list_concrete_paths())
+        self._assert_routes_match_full_rebuild()
+
+        # Removed localized document.
+        self.pod.delete_file('/content/pages/intro@fr.md')
+        routes.update('/content/pages/intro@fr.md')
+        self._assert_routes_match_full_rebuild()
+
+        # Removed document.
+        self.pod.delete_file('/content/pages/new.yaml')
+        routes.update('/content/pages/new.yaml')
+        self.assertNotIn('/new/', routes.list_concrete_paths())
+        self.assertRaises(webob.exc.HTTPNotFound, self.pod.match, '/new/')
+        self._assert_routes_match_full_rebuild()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+"""Partitions the paths of a build so that it can be split across machines.
+
+Each shard of a build exports a stable subset of the pod's concrete paths,
+given the same pod. Paths are partitioned either individually, by a hash of
+each path, or by locale, so that each shard only loads the translations and
+Jinja environments for its own locales. The outputs of each shard can then be
+combined using `grow.deployments.shards.merge`.
+"""
+
+import collections
+import hashlib
+import re
+
+
+class Error(Exception):
+    pass
+
+
+class InvalidShardError(Error, ValueError):
+    pass
+
+
+class Shard(object):
+    """A shard of a build.
+
+    Args:
+      index: The zero-based index of the shard.
+      count: The total number of shards.
+      by_locale: Whether to partition paths by locale, rather than by path.
+    """
+
+    def __init__(self, index, count, by_locale=False):
+        if count < 1 or not 0 <= index < count:
+            text = 'Invalid shard: {} of {}.'.format(index + 1, count)
+            raise InvalidShardError(text)
+        self.index = index
+        self.count = count
+        self.by_locale = by_locale
+
+    def __repr__(self):
+        return '<Shard({}/{})>'.format(self.index + 1, self.count)
+
+    @classmethod
+    def parse(cls, value, by_locale=False):
+        """Parses a one-based shard string, such as "2/4"."""
+        match = re.match(r'^(\d+)/(\d+)$', value.strip())
+        if not match:
+            text = 'Invalid shard: {}. Shards must be in the form i/N.'
+            raise InvalidShardError(text.format(value))
+        number, count = int(match.group(1)), int(match.group(2))
+        return cls(number - 1, count, by_locale=by_locale)
+
+    @property
+    def is_first(self):
+        return self.index == 0
+
+    def _get_index_for_path(self, path):
+        if isinstance(path, unicode):
+            path = path.encode('utf-8')
+        return int(hashlib.md5(path).hexdigest(), 16) % self.count
+
+    def _get_locales_to_indexes(self, locales_to_paths):
+        # Assigns the locales with the most paths first, each to the shard with
+        # the fewest paths so far, to balance shards deterministically.
+        sizes = [0] * self.count
+        locales_to_indexes = {}
+        items = sorted(locales_to_paths.iteritems(),
+                       key=lambda item: (-len(item[1]), item[0]))
+        for locale, paths in items:
+            index = sizes.index(min(sizes))
+            locales_to_indexes[locale] = index
+            sizes[index] += len(paths)
+        return locales_to_indexes
+
+    def list_paths(self, locales_to_paths):
+        """Returns the paths in this shard, grouped by locale, given a mapping
+        of locales to paths (see `Routes.get_locales_to_paths`)."""
+        grouped_paths = collections.defaultdict(list)
+        for locale, paths in locales_to_paths.iteritems():
+            key = str(locale) if locale is not None else ''
+            grouped_paths[key] += paths
+        if self.by_locale:
+            locales_to_indexes = self._get_locales_to_indexes(grouped_paths)
+        shard_paths = []
+        for key in sorted(grouped_paths):
+            if self.by_locale:
+                if locales_to_indexes[key] == self.index:
+                    shard_paths += grouped_paths[key]
+                continue
+            for path in grouped_paths[key]:
+                if self._get_index_for_path(path) == self.index:
+                    shard_paths.append(path)
+        return shard_paths
@@ -0,0 +1,53 @@
+from . import pods
+from . import shards
+from . import storage
+from grow.testing import testing
+import unittest
+
+
+class ShardTest(unittest.TestCase):
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+
+    def test_parse(self):
+        shard = shards.Shard.parse('2/4')
+        self.assertEqual(1, shard.index)
+        self.assertEqual(4, shard.count)
+        self.assertRaises(shards.InvalidShardError, shards.Shard.parse, '0/4')
+        self.assertRaises(shards.InvalidShardError, shards.Shard.parse, '5/4')
+        self.assertRaises(shards.InvalidShardError, shards.Shard.parse, 'foo')
+
+    def test_list_paths(self):
+        locales_to_paths = self.pod.routes.get_locales_to_paths()
+        all_paths = sorted(self.pod.routes.list_concrete_paths())
+        for by_locale in (False, True):
+            shard_paths = []
+            for index in range(3):
+                shard = shards.Shard(index, 3, by_locale=by_locale)
+                paths = shard.list_paths(locales_to_paths)
+                self.assertTrue(paths)
+                # Partitioning is stable.
+                self.assertEqual(paths, shard.list_paths(locales_to_paths))
+                shard_paths += paths
+            self.assertEqual(all_paths, sorted(shard_paths))
+
+        # Each locale is built by a single shard.
+        shard = shards.Shard(0, 3, by_locale=True)
+        paths = set(shard.list_paths(locales_to_paths))
+        for locale, locale_paths in locales_to_paths.iteritems():
+            in_shard = [path in paths for path in locale_paths]
+            self.assertTrue(all(in_shard) or not any(in_shard))
+
+    def test_export(self):
+        output = {}
+        for index in range(2):
+            shard_output = self.pod.export(shard=shards.Shard(index, 2))
+            self.assertFalse(set(output) & set(shard_output))
+            output.update(shard_output)
+        self.assertEqual(sorted(self.pod.export()), sorted(output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Parsed pod content, persisted between runs.
+
+Every process (a build, the dev server, a deployment) would otherwise start by
+parsing the pod's YAML: the podspec, blueprints, data files and the front
+matter of each document. Instead, parsed values are kept in a `PodSnapshot`
+and saved to "/.grow/cache/snapshot.pickle", so that later processes only
+parse the files that changed.
+
+Each entry of the snapshot holds the values parsed from a pod path (such as the
+fields of each part of a document, and the offsets of its bodies in the file;
+see `formats`), along with the stamps (modification time and size) of the
+files they were parsed from. An entry is only used while its files' stamps are
+unchanged. YAML is stored as loaded by
+`utils.load_tagged_yaml`, so its tags (`!g.doc`, `!_`, etc.) are resolved for
+the pod and locale of each use.
+
+Entries are pickled individually, so that loading the snapshot doesn't
+unpickle the entries of files that the process never reads. As snapshots are
+read from the pod's directory, which may have been cloned from anywhere, they
+are unpickled with an allow-list of the types that parsed YAML contains;
+unpickling anything else (such as a function call) fails, and the files are
+parsed again instead.
+"""
+
+from . import dependency
+from grow.common import config
+from grow.common import utils
+import cPickle as pickle
+import cStringIO
+import logging
+import os
+import threading
+
+
+# The globals that unpickling may load, as (module, name) tuples.
+SAFE_GLOBALS = frozenset([
+    ('__builtin__', 'frozenset'),
+    ('__builtin__', 'set'),
+    ('datetime', 'date'),
+    ('datetime', 'datetime'),
+    ('datetime', 'time'),
+    ('datetime', 'timedelta'),
+    ('grow.common.utils', 'YamlTag'),
+])
+
+
+def _find_global(module, name):
+    if (module, name) not in SAFE_GLOBALS:
+        raise pickle.UnpicklingError(
+            'Unsafe global in snapshot: {}.{}'.format(module, name))
+    return getattr(__import__(module, fromlist=[name]), name)
+
+
+def load(fp):
+    """Unpickles a value, allowing only the globals in SAFE_GLOBALS."""
+    unpickler = pickle.Unpickler(fp)
+    unpickler.find_global = _find_global
+    return unpickler.load()
+
+
+def loads(data):
+    return load(cStringIO.StringIO(data))
+
+
+class PodSnapshot(object):
+    FILENAME = '/.grow/cache/snapshot.pickle'
+    VERSION = 1
+
+    def __init__(self, pod):
+        self.pod = pod
+        self.filename = os.path.join(pod.root, self.FILENAME.lstrip('/'))
+        self._keys_to_pickles = None
+        self._keys_to_entries = {}
+        self._dirty_keys = set()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            return len(set(self._get_pickles()) | set(self._keys_to_entries))
+
+    @property
+    def signature(self):
+        return '{}-{}'.format(config.VERSION, self.VERSION)
+
+    def _get_pickles(self):
+        # Maps keys to (stamps, pickled values) tuples.
+        if self._keys_to_pickles is None:
+            try:
+                with open(self.filename, 'rb') as fp:
+                    data = load(fp)
+                if data.get('signature') != self.signature:
+                    data = {}
+            except Exception:  # Missing, partial or incompatible snapshots.
+                data = {}
+            self._keys_to_pickles = data.get('entries', {})
+        return self._keys_to_pickles
+
+    def _get_entry(self, key):
+        entry = self._keys_to_entries.get(key)
+        if entry is None and key in self._get_pickles():
+            stamps, value = self._keys_to_pickles[key]
+            try:
+                entry = (stamps, loads(value))
+            except Exception:
+                return None
+            self._keys_to_entries[key] = entry
+        return entry
+
+    def get_stamps(self, pod_paths):
+        return dict((pod_path, dependency.get_stamp(self.pod, pod_path))
+                    for pod_path in pod_paths)
+
+    def get(self, key, name, create, pod_paths=None):
+        """Returns a value parsed from files, such as a document's fields.
+
+        Args:
+          key: The pod path that the value was parsed from.
+          name: The name of the value, such as "yaml".
+          create: A function that reads the files and returns the value. It
+              is called if the snapshot has no value, or if any of the files
+              changed since it was created.
+          pod_paths: The files that the value is parsed from, by default the
+              file at the key's pod path.
+        """
+        pod_paths = [key] if pod_paths is None else pod_paths
+        stamps = self.get_stamps(pod_paths)
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is not None and entry[0] == stamps and name in entry[1]:
+                # Recorded as though the files were read, for incremental
+                # builds.
+                self.pod.dependencies.update(pod_paths)
+                return entry[1][name]
+        value = create()
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None or entry[0] != stamps:
+                entry = (stamps, {})
+                self._keys_to_entries[key] = entry
+            entry[1][name] = value
+            self._dirty_keys.add(key)
+        return value
+
+    def load_yaml(self, pod_path, doc=None):
+        """Returns the YAML of a file, with its tags resolved for a document's
+        locale."""
+        tagged = self.get(pod_path, 'yaml', lambda: utils.load_tagged_yaml(
+            self.pod.read_file(pod_path)))
+        return utils.resolve_yaml_tags(tagged, pod=self.pod, doc=doc)
+
+    def invalidate(self, pod_path):
+        """Removes the entries parsed from a file."""
+        with self._lock:
+            keys = set(self._get_pickles()) | set(self._keys_to_entries)
+            for key in keys:
+                entry = self._keys_to_pickles.get(key)
+                entry = self._keys_to_entries.get(key, entry)
+                if key == pod_path or pod_path in entry[0]:
+                    self._keys_to_pickles.pop(key, None)
+                    self._keys_to_entries.pop(key, None)
+                    self._dirty_keys.add(key)
+
+    def save(self):
+        """Saves the entries created since the snapshot was loaded, dropping
+        those whose files changed."""
+        with self._lock:
+            if not self._dirty_keys:
+                return
+            entries = dict(self._get_pickles())
+            for key in self._dirty_keys:
+                entry = self._keys_to_entries.get(key)
+                if entry is None:
+                    entries.pop(key, None)
+                    continue
+                stamps, values = entry
+                entries[key] = (stamps, pickle.dumps(
+                    values, pickle.HIGHEST_PROTOCOL))
+            entries = dict(
+                (key, entry) for key, entry in entries.iteritems()
+                if self.get_stamps(entry[0].keys()) == entry[0])
+            data = {
+                'signature': self.signature,
+                'entries': entries,
+            }
+            try:
+                utils.write_file_atomically(
+                    self.filename, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+            except (IOError, OSError) as e:
+                logging.warning('Unable to save snapshot: {}'.format(e))
+                return
+            self._keys_to_pickles = entries
+            self._dirty_keys = set()
@@ -0,0 +1,121 @@
+from . import documents
+from grow.common import utils
+from grow.testing import testing
+import cPickle as pickle
+import mock
+import os
+import unittest
+
+
+class PodSnapshotTest(testing.PodCacheTestCase):
+
+    def test_load_yaml(self):
+        self.pod.write_file('/data/snapshot.yaml', (
+            'title: Title\n'
+            'date: 2016-01-01 10:00:00\n'
+            'doc: !g.doc /content/pages/about.yaml\n'
+            'docs:\n'
+            '- !g.doc /content/pages/home.yaml\n'))
+        expected = self.pod.read_yaml('/data/snapshot.yaml')
+        self.pod.snapshot.save()
+        self.assertTrue(os.path.exists(self.pod.snapshot.filename))
+
+        # Another pod loads the YAML from the snapshot, without parsing it.
+        pod = self.create_pod()
+        with mock.patch.object(utils, 'load_tagged_yaml') as mock_load:
+            result = pod.read_yaml('/data/snapshot.yaml')
+            self.assertFalse(mock_load.called)
+        self.assertEqual('Title', result['title'])
+        self.assertEqual(expected['date'], result['date'])
+        self.assertIsInstance(result['doc'], documents.Document)
+        self.assertEqual(expected['doc'].pod_path, result['doc'].pod_path)
+        self.assertEqual('/content/pages/home.yaml',
+                         result['docs'][0].pod_path)
+
+        # Changed files are parsed again.
+        pod.write_file('/data/snapshot.yaml', 'title: New title\n')
+        self.assertEqual({'title': 'New title'},
+                         pod.read_yaml('/data/snapshot.yaml'))
+
+    def test_documents(self):
+        pod_paths_and_locales = [
+            ('/content/pages/localized.yaml', 'de'),
+            ('/content/pages/intro.md', None),
+            ('/content/pages/intro@fr.md', None),
+        ]
+        expected = []
+        for pod_path, locale in pod_paths_and_locales:
+            doc = self.pod.get_doc(pod_path, locale=locale)
+            expected.append((doc.fields, doc.body))
+        self.pod.snapshot.save()
+
+        # Another pod loads the documents without parsing them.
+        pod = self.create_pod()
+        with mock.patch.object(utils, 'load_tagged_yaml') as mock_load:
+            for (pod_path, locale), (fields, body) in zip(
+                    pod_paths_and_locales, expected):
+                doc = pod.get_doc(pod_path, locale=locale)
+                self.assertEqual(fields, doc.fields)
+                self.assertEqual(body, doc.body)
+            self.assertFalse(mock_load.called)
+
+        # Markdown and HTML files are only read for their bodies.
+        pod = self.create_pod()
+        with mock.patch.object(pod, 'open_file',
+                               wraps=pod.open_file) as mock_open_file:
+            doc = pod.get_doc('/content/pages/intro.md')
+            self.assertEqual(expected[1][0], doc.fields)
+            self.assertFalse(mock_open_file.called)
+            self.assertEqual(expected[1][1], doc.body)
+            self.assertTrue(mock_open_file.called)
+
+    def test_dependencies(self):
+        self.pod.read_yaml('/data/file.yaml')
+        with self.pod.dependencies.record() as pod_paths:
+            self.pod.read_yaml('/data/file.yaml')
+        self.assertEqual(set(['/data/file.yaml']), pod_paths)
+
+    def test_invalid_snapshot(self):
+        self.pod.read_yaml('/data/file.yaml')
+        self.pod.snapshot.save()
+        with open(self.pod.snapshot.filename, 'wb') as fp:
+            fp.write('invalid')
+        pod = self.create_pod()
+        self.assertEqual({}, pod.snapshot._get_pickles())
+        self.assertEqual(self.pod.read_yaml('/data/file.yaml'),
+                         pod.read_yaml('/data/file.yaml'))
+
+    def test_unsafe_snapshot(self):
+        # Snapshots can't run code when they're loaded.
+        sentinel = os.path.join(self.pod.root, 'sentinel')
+        with open(sentinel, 'w') as fp:
+            fp.write('')
+
+        class Unsafe(object):
+
+            def __reduce__(self):
+                return (os.remove, (sentinel,))
+
+        self.pod.read_yaml('/data/file.yaml')
+        self.pod.snapshot.save()
+        snapshot = self.create_pod().snapshot
+        stamps, _ = snapshot._get_pickles()['/data/file.yaml']
+        snapshot._keys_to_pickles['/data/file.yaml'] = (
+            stamps, pickle.dumps({'yaml': Unsafe()}, 2))
+        snapshot._dirty_keys.add('/podspec.yaml')
+        snapshot.save()
+        pod = self.create_pod()
+        self.assertEqual(self.pod.read_yaml('/data/file.yaml'),
+                         pod.read_yaml('/data/file.yaml'))
+        self.assertTrue(os.path.exists(sentinel))
+        # Unsafe snapshot files are ignored as a whole.
+        with open(self.pod.snapshot.filename, 'wb') as fp:
+            pickle.dump({'yaml': Unsafe()}, fp, 2)
+        pod = self.create_pod()
+        self.assertEqual(self.pod.read_yaml('/data/file.yaml'),
+                         pod.read_yaml('/data/file.yaml'))
+        self.assertTrue(os.path.exists(sentinel))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,8 @@ from . import messages
 from grow.pods import locales
 from grow.pods import urls
 from datetime import datetime
+import collections
 import fnmatch
-import hashlib
 import mimetypes
 import os
 import re
@@ -76,11 +76,7 @@ class StaticFile(object):
 
     @staticmethod
     def _create_fingerprint(pod, pod_path):
-        md5 = hashlib.md5()
-        with pod.open_file(pod_path, 'rb') as fp:
-            content = fp.read()
-            md5.update(content)
-        return md5.hexdigest()
+        return pod.fingerprints.get(pod_path)
 
     @staticmethod
     def remove_fingerprint(path):
@@ -152,6 +148,28 @@ class StaticController(controllers.BaseController):
         self.localized = localized
         self.localization = localization
         self.fingerprinted = fingerprinted
+        # Compiled once, as `match_pod_path` is called for each `g.static`.
+        self._path_format_tokens = re.findall('.?{([^}]+)}.?', self.path_format)
+        source_regex = self.source_format.replace(
+            '{filename}', '(?P<filename>.*)')
+        source_regex = source_regex.replace('{locale}', '(?P<locale>[^/]*)')
+        source_regex = source_regex.replace('{fingerprint}', '(?P<fingerprint>[^/])')
+        source_regex = source_regex.replace('{root}', '(?P<root>[^/])')
+        self._source_regex = re.compile(source_regex)
+        list_source_regex = self.source_format.replace(
+            '{filename}', '(?P<filename>.*)')
+        list_source_regex = list_source_regex.replace(
+            '{locale}', '(?P<locale>[^/]*)')
+        self._list_source_regex = re.compile(list_source_regex)
+        self._localized_source_regex = None
+        if not self.localized and self.localization:
+            localized_source_regex = self.localization['static_dir'].replace(
+                '{filename}', '(?P<filename>.*)')
+            localized_source_regex = localized_source_regex.replace(
+                '{locale}', '(?P<locale>[^/]*)')
+            self._localized_source_regex = re.compile(localized_source_regex)
+        # The literal part of the source format, e.g. "/static/".
+        self.source_prefix = self.source_format.split('{', 1)[0]
 
     def __repr__(self):
         return '<Static(format=\'{}\')>'.format(self.source_format)
@@ -222,14 +240,9 @@ class StaticController(controllers.BaseController):
                 fingerprint = StaticFile._create_fingerprint(self.pod, pod_path)
                 return StaticFile.apply_fingerprint(self.path_format, fingerprint)
             return self.path_format
-        tokens = re.findall('.?{([^}]+)}.?', self.path_format)
+        tokens = self._path_format_tokens
         if 'filename' in tokens:
-            source_regex = self.source_format.replace(
-                '{filename}', '(?P<filename>.*)')
-            source_regex = source_regex.replace('{locale}', '(?P<locale>[^/]*)')
-            source_regex = source_regex.replace('{fingerprint}', '(?P<fingerprint>[^/])')
-            source_regex = source_regex.replace('{root}', '(?P<root>[^/])')
-            match = re.match(source_regex, pod_path)
+            match = self._source_regex.match(pod_path)
             if match:
                 kwargs = match.groupdict()
                 kwargs['root'] = self.pod.podspec.root
@@ -248,10 +261,7 @@ class StaticController(controllers.BaseController):
 
     def list_concrete_paths(self):
         concrete_paths = set()
-        tokens = re.findall('.?{([^}]+)}.?', self.path_format)
-
-        source_regex = self.source_format.replace('{filename}', '(?P<filename>.*)')
-        source_regex = source_regex.replace('{locale}', '(?P<locale>[^/]*)')
+        tokens = self._path_format_tokens
 
         if '{' not in self.path_format:
             if self.fingerprinted:
@@ -272,41 +282,87 @@ class StaticController(controllers.BaseController):
                      for path in paths]
 
             # Exclude paths matched by skip patterns.
+            skip_paths = set()
             for pattern in SKIP_PATTERNS:
                 # .gitignore-style treatment of paths without slashes.
                 if '/' not in pattern:
                     pattern = '**{}**'.format(pattern)
-                for skip_paths in fnmatch.filter(paths, pattern):
-                    paths = [path for path in paths
-                             if path.replace(self.pod.root, '') not in skip_paths]
+                skip_paths.update(fnmatch.filter(paths, pattern))
 
+            # Locales are normalized once per distinct value, not per file.
+            locales_to_aliases = {}
+            root = self.pod.podspec.root
+            uses_fingerprint = 'fingerprint' in self.path_format
             for pod_path in paths:
-                match = re.match(source_regex, pod_path)
+                if pod_path in skip_paths:
+                    continue
                 # Skip adding localized paths in subfolders of other rules.
-                if not self.localized and self.localization:
-                    localized_source_format = self.localization['static_dir']
-                    localized_source_regex = localized_source_format.replace(
-                        '{filename}', '(?P<filename>.*)')
-                    localized_source_regex = localized_source_regex.replace(
-                        '{locale}', '(?P<locale>[^/]*)')
-                    if re.match(localized_source_regex, pod_path):
-                        continue
-                if match:
-                    kwargs = match.groupdict()
-                    kwargs['root'] = self.pod.podspec.root
-                    if 'fingerprint' in self.path_format:
-                        fingerprint = StaticFile._create_fingerprint(self.pod, pod_path)
-                        kwargs['fingerprint'] = fingerprint
-                    if 'locale' in kwargs:
-                        normalized_locale = self.pod.normalize_locale(kwargs['locale'])
-                        kwargs['locale'] = (
+                if (self._localized_source_regex is not None
+                        and self._localized_source_regex.match(pod_path)):
+                    continue
+                match = self._list_source_regex.match(pod_path)
+                if not match:
+                    continue
+                kwargs = match.groupdict()
+                kwargs['root'] = root
+                fingerprint = None
+                if uses_fingerprint or self.fingerprinted:
+                    fingerprint = StaticFile._create_fingerprint(self.pod, pod_path)
+                if uses_fingerprint:
+                    kwargs['fingerprint'] = fingerprint
+                if 'locale' in kwargs:
+                    locale = kwargs['locale']
+                    if locale not in locales_to_aliases:
+                        normalized_locale = self.pod.normalize_locale(locale)
+                        locales_to_aliases[locale] = (
                             normalized_locale.alias if normalized_locale is not None
                             else normalized_locale)
-                    matched_path = self.path_format.format(**kwargs)
-                    matched_path = matched_path.replace('//', '/')
-                    if self.fingerprinted:
-                        fingerprint = StaticFile._create_fingerprint(self.pod, pod_path)
-                        matched_path = StaticFile.apply_fingerprint(matched_path, fingerprint)
-                    concrete_paths.add(matched_path)
+                    kwargs['locale'] = locales_to_aliases[locale]
+                matched_path = self.path_format.format(**kwargs)
+                matched_path = matched_path.replace('//', '/')
+                if self.fingerprinted:
+                    matched_path = StaticFile.apply_fingerprint(matched_path, fingerprint)
+                concrete_paths.add(matched_path)
 
         return list(concrete_paths)
+
+
+class StaticResolver(object):
+    """Finds the static controller that serves a pod path.
+
+    Controllers are indexed by the literal prefix of their source format (the
+    static directory), so a lookup only tries the controllers whose static
+    directory contains the pod path, in the order they're given (that of the
+    static routing map's rules).
+    """
+
+    def __init__(self, controllers):
+        self._prefixes_to_controllers = collections.defaultdict(list)
+        self._path_formats_to_controllers = {}
+        for index, controller in enumerate(controllers):
+            self._prefixes_to_controllers[controller.source_prefix].append(
+                (index, controller))
+            self._path_formats_to_controllers.setdefault(
+                controller.path_format, (index, controller))
+        self._prefix_lengths = sorted(
+            set(len(prefix) for prefix in self._prefixes_to_controllers))
+        # Maps (pod path, locale) to StaticFile, see `Pod.get_static`.
+        self.cache = {}
+
+    def resolve(self, pod_path):
+        """Returns a tuple of the controller serving a pod path and the path
+        it's served at, or (None, None) if no controller serves it."""
+        candidates = []
+        if pod_path in self._path_formats_to_controllers:
+            candidates.append(self._path_formats_to_controllers[pod_path])
+        for length in self._prefix_lengths:
+            if length > len(pod_path):
+                break
+            candidates += self._prefixes_to_controllers.get(
+                pod_path[:length], [])
+        candidates.sort(key=lambda candidate: candidate[0])
+        for _, controller in candidates:
+            serving_path = controller.match_pod_path(pod_path)
+            if serving_path:
+                return controller, serving_path
+        return None, None
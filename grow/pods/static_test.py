@@ -2,6 +2,8 @@ from . import static
 from grow.pods import pods
 from grow.pods import storage
 from grow.testing import testing
+import fnmatch
+import mock
 import unittest
 
 
@@ -41,6 +43,68 @@ class StaticTest(unittest.TestCase):
             '/root/static-fingerprint/{}/de_alias/fingerprinted.txt'.format(fingerprint),
             static.url.path)
 
+    def test_resolver(self):
+        resolver = self.pod.routes.static_resolver
+        controller, serving_path = resolver.resolve('/static/test.txt')
+        self.assertEqual('/static/{filename}', controller.source_format)
+        self.assertEqual(
+            '/app/static/test-db3f6eaa28bac5ae1180257da33115d8.txt',
+            serving_path)
+        self.assertEqual((None, None), resolver.resolve('/dummy/test.txt'))
+
+        # As with the static routing map, the more specific localized rules
+        # serve the files of their static directories.
+        static_file = self.pod.get_static('/static/intl/de/test.txt')
+        self.assertEqual(
+            '/app/root/static/somepath/de/test-9b3051eb0c19358847e7c879275f810a.txt',
+            static_file.url.path)
+        static_file = self.pod.get_static(
+            '/static-fingerprint/intl/de/fingerprinted.txt', locale='de')
+        self.assertEqual(
+            '/root/static-fingerprint/bc20b3c9007842b8e1f3c640b07f4e74/de/fingerprinted.txt',
+            static_file.url.path)
+
+        # Static files are cached per pod path and locale.
+        static_file = self.pod.get_static('/static/test.txt')
+        self.assertIs(static_file, self.pod.get_static('/static/test.txt'))
+        self.assertIsNot(
+            static_file, self.pod.get_static('/static/test.txt', locale='de'))
+        self.pod.env.cached = False
+        self.assertIsNot(static_file, self.pod.get_static('/static/test.txt'))
+
+    def test_list_concrete_paths(self):
+        controller, _ = self.pod.routes.static_resolver.resolve(
+            '/static-root/file.txt')
+
+        def list_paths():
+            # Returns the paths, and the number of files matched against the
+            # source format to list them.
+            regex = controller._list_source_regex
+            controller._list_source_regex = mock.Mock(wraps=regex)
+            with mock.patch.object(self.pod, 'list_dir',
+                                   wraps=self.pod.list_dir) as mock_list_dir:
+                with mock.patch.object(fnmatch, 'filter',
+                                       wraps=fnmatch.filter) as mock_filter:
+                    paths = controller.list_concrete_paths()
+            self.assertEqual(1, mock_list_dir.call_count)
+            self.assertEqual(len(static.SKIP_PATTERNS), mock_filter.call_count)
+            num_matches = controller._list_source_regex.match.call_count
+            controller._list_source_regex = regex
+            return paths, num_matches
+
+        paths, base_num_matches = list_paths()
+        # Files are matched once each, however many of them are skipped.
+        for num_files in (10, 100):
+            for i in range(num_files):
+                self.pod.write_file(
+                    '/static-root/scale/file-{}.txt'.format(i), str(i))
+                self.pod.write_file(
+                    '/static-root/scale/.hidden-{}'.format(i), str(i))
+            paths, num_matches = list_paths()
+            self.assertEqual(base_num_matches + num_files, num_matches)
+            self.assertEqual(2 + num_files, len(paths))
+            self.assertFalse([path for path in paths if '.hidden' in path])
+
     def test_apply_fingerprint(self):
         fingerprint = 'bc20b3c9007842b8e1f3c640b07f4e74'
         path = '/path-path/file.txt'
@@ -1,10 +1,11 @@
 from . import collection as collection_lib
+from . import formats
 from babel import dates as babel_dates
 from datetime import datetime
 from grow.common import utils
 from grow.pods import locales as locales_lib
 from grow.pods import urls
-import collections
+import collections as collections_lib
 import itertools
 import jinja2
 import json as json_lib
@@ -43,10 +44,20 @@ def collection(collection, _pod=None):
 
 
 @utils.memoize_tag
-def docs(collection, locale=None, order_by=None, hidden=False, recursive=True, _pod=None):
+def docs(collection, locale=None, order_by=None, hidden=False, recursive=True,
+         where=None, category=None, start_date=None, end_date=None,
+         limit=None, offset=None, reverse=None, _pod=None):
     collection = _pod.get_collection(collection)
-    return collection.docs(locale=locale, order_by=order_by, include_hidden=hidden,
-                           recursive=recursive)
+    if (where is None and category is None and start_date is None
+            and end_date is None and limit is None and offset is None):
+        return collection.docs(locale=locale, order_by=order_by,
+                               include_hidden=hidden, recursive=recursive,
+                               reverse=reverse)
+    return collection.query(
+        where=where, category=category, start_date=start_date,
+        end_date=end_date, order_by=order_by, reverse=reverse, limit=limit,
+        offset=offset, locale=locale, include_hidden=hidden,
+        recursive=recursive)
 
 
 @utils.memoize_tag
@@ -56,7 +67,7 @@ def collections(collection_paths=None, _pod=None):
 
 @utils.memoize_tag
 def statics(pod_path, locale=None, _pod=None):
-    return _pod.list_statics(pod_path, locale=locale)
+    return list(_pod.list_statics(pod_path, locale=locale))
 
 
 def markdown_filter(value):
@@ -88,27 +99,47 @@ def static(path, locale=None, _pod=None):
 class Menu(object):
 
     def __init__(self):
-        self.items = collections.OrderedDict()
+        self.items = collections_lib.OrderedDict()
 
     def build(self, nodes):
-        self._recursive_build(self.items, None, nodes)
+        # Indexes the nodes by the pod paths of their parents in one pass.
+        parents_to_children = collections_lib.defaultdict(list)
+        for node in nodes:
+            parents_to_children[Menu._get_parent_pod_path(node)].append(node)
+        self._recursive_build(self.items, None, parents_to_children)
 
     def iteritems(self):
         return self.items.iteritems()
 
-    def _recursive_build(self, tree, parent, nodes):
-        children = [n for n in nodes if n.parent == parent]
-        for child in children:
-            tree[child] = collections.OrderedDict()
-            self._recursive_build(tree[child], child, nodes)
+    @staticmethod
+    def _get_parent_pod_path(doc):
+        # The pod path of `doc.parent`, without loading the parent.
+        parent_pod_path = doc.fields.get('$parent')
+        if parent_pod_path is None or doc.locale is None:
+            return parent_pod_path
+        localized_path = formats.Format.localize_path(
+            parent_pod_path, doc.locale)
+        if doc.pod.content_manifest.file_exists(localized_path):
+            return localized_path
+        return parent_pod_path
+
+    def _recursive_build(self, tree, parent_pod_path, parents_to_children):
+        for child in parents_to_children.get(parent_pod_path, []):
+            tree[child] = collections_lib.OrderedDict()
+            self._recursive_build(
+                tree[child], child.pod_path, parents_to_children)
 
 
 @utils.memoize_tag
 def nav(collection=None, locale=None, _pod=None):
     collection_obj = _pod.get_collection('/content/' + collection)
-    results = collection_obj.list_docs(order_by='order', locale=locale)
-    menu = Menu()
-    menu.build(results)
+    # Menus are shared, along with the collection's index, per locale.
+    index = _pod.document_indexes.get(collection_obj, locale=locale)
+    menu = index.cache.get('menu')
+    if menu is None:
+        menu = Menu()
+        menu.build(index.docs)
+        index.cache['menu'] = menu
     return menu
 
 
@@ -161,14 +192,16 @@ def _deep_gettext(ctx, fields):
                 new_dct[key] = val
         return new_dct
     elif isinstance(fields, (list, set)):
-        for i, val in enumerate(fields):
+        # Returns a new list, as fields are shared between documents.
+        new_list = []
+        for val in fields:
             if isinstance(val, (dict, list, set)):
-                fields[i] = _deep_gettext(ctx, val)
+                new_list.append(_deep_gettext(ctx, val))
             elif isinstance(val, basestring):
-                fields[i] = _gettext_alias(ctx, val)
+                new_list.append(_gettext_alias(ctx, val))
             else:
-                fields[i] = val
-        return fields
+                new_list.append(val)
+        return new_list
 
 
 def _gettext_alias(__context, *args, **kwargs):
@@ -176,8 +209,11 @@ def _gettext_alias(__context, *args, **kwargs):
 
 
 @utils.memoize_tag
-def csv(path, locale=utils.SENTINEL, _pod=None):
-    return _pod.read_csv(path, locale=locale)
+def csv(path, locale=utils.SENTINEL, index=None, _pod=None):
+    # Without an index, rows are listed as before, copied from the cached
+    # table.
+    table = _pod.csv_tables.get(path, locale=locale)
+    return list(table) if index is None else table.get_index(index)
 
 
 @utils.memoize_tag
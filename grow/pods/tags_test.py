@@ -32,6 +32,19 @@ class BuiltinsTestCase(unittest.TestCase):
         self.assertIn('key - value', html)
         self.assertIn('key2 - value2', html)
 
+    def test_statics(self):
+        # Every page using g.statics lists the files, not only the first page
+        # rendered.
+        expected = [static.url.path
+                    for static in self.pod.list_statics('/static/')]
+        self.assertIn(
+            '/app/static/test-db3f6eaa28bac5ae1180257da33115d8.txt', expected)
+        for path in ['/', '/it/home/']:
+            controller, params = self.pod.match(path)
+            html = controller.render(params)
+            for static_path in expected:
+                self.assertIn(static_path, html)
+
     def test_collections(self):
         collections = tags.collections(_pod=self.pod)
         self.assertEqual(4, len(list(collections)))
@@ -41,6 +54,61 @@ class BuiltinsTestCase(unittest.TestCase):
             self.assertIn(collection.collection_path, paths)
         self.assertEqual(len(paths), len(list(collections)))
 
+    def test_nav(self):
+        pod = testing.create_pod()
+        pod.write_yaml('/podspec.yaml', {})
+        pod.write_yaml('/content/docs/_blueprint.yaml', {
+            '$path': '/{base}/',
+            '$view': '/views/base.html',
+            'localization': {
+                'path': '/{locale}/{base}/',
+                'locales': ['de'],
+            },
+        })
+        pod.write_yaml('/content/docs/a.yaml', {'$order': 1})
+        pod.write_yaml('/content/docs/a1.yaml', {
+            '$order': 2, '$parent': '/content/docs/a.yaml'})
+        pod.write_yaml('/content/docs/a2.yaml', {
+            '$order': 3, '$parent': '/content/docs/a.yaml'})
+        pod.write_yaml('/content/docs/a2i.yaml', {
+            '$order': 4, '$parent': '/content/docs/a2.yaml'})
+        pod.write_yaml('/content/docs/b.yaml', {'$order': 5})
+        pod.write_yaml('/content/docs/a@de.yaml', {'$order': 1})
+
+        def to_paths(items):
+            return [(node.pod_path, to_paths(children.iteritems()))
+                    for node, children in items]
+
+        menu = tags.nav('docs', _pod=pod)
+        self.assertEqual([
+            ('/content/docs/a.yaml', [
+                ('/content/docs/a1.yaml', []),
+                ('/content/docs/a2.yaml', [
+                    ('/content/docs/a2i.yaml', []),
+                ]),
+            ]),
+            ('/content/docs/b.yaml', []),
+        ], to_paths(menu.iteritems()))
+
+        # Parents are matched to their localized documents.
+        de_menu = tags.nav('docs', locale='de', _pod=pod)
+        self.assertEqual([
+            ('/content/docs/a@de.yaml', [
+                ('/content/docs/a1.yaml', []),
+                ('/content/docs/a2.yaml', [
+                    ('/content/docs/a2i.yaml', []),
+                ]),
+            ]),
+            ('/content/docs/b.yaml', []),
+        ], to_paths(de_menu.iteritems()))
+
+        # Menus are shared per collection and locale.
+        self.assertIs(menu, tags.nav('docs', _pod=pod))
+        self.assertIsNot(menu, de_menu)
+        pod.write_yaml('/content/docs/c.yaml', {'$order': 6})
+        menu = tags.nav('docs', _pod=pod)
+        self.assertEqual('/content/docs/c.yaml', to_paths(menu.iteritems())[-1][0])
+
     def test_categories(self):
         pod = testing.create_pod()
         pod.write_yaml('/podspec.yaml', {})
@@ -3,6 +3,7 @@ from . import translation
 from watchdog import events
 from watchdog import observers
 from xtermcolor import colorize
+import os
 
 
 class PodspecFileEventHandler(events.PatternMatchingEventHandler):
@@ -55,6 +56,38 @@ class PreprocessorEventHandler(events.PatternMatchingEventHandler):
         self.handle(event)
 
 
+class RoutesCacheEventHandler(PreprocessorEventHandler):
+    """Updates the routes of individual files as they change, rather than
+    rebuilding all routes."""
+
+    def _get_pod_path(self, path):
+        pod = self.preprocessor.pod
+        return '/' + os.path.relpath(path, pod.root).replace(os.sep, '/')
+
+    def _update(self, paths):
+        try:
+            for path in paths:
+                self.preprocessor.update(self._get_pod_path(path))
+        except Exception:
+            text = colorize('Error updating routes.', ansi=197)
+            self.preprocessor.pod.logger.exception(text)
+
+    def handle(self, event=None):
+        # Directory changes may affect many files, so rebuild all routes.
+        if event is None or event.is_directory:
+            return super(RoutesCacheEventHandler, self).handle()
+        paths = [event.src_path]
+        if event.event_type == events.EVENT_TYPE_MOVED:
+            paths.append(event.dest_path)
+        self._update(paths)
+
+    def on_deleted(self, event):
+        self.handle(event)
+
+    def on_moved(self, event):
+        self.handle(event)
+
+
 class ManagedObserver(observers.Observer):
 
     def __init__(self, pod):
@@ -69,7 +102,8 @@ class ManagedObserver(observers.Observer):
 
     def schedule_builtins(self):
         preprocessor = routes_cache.RoutesCachePreprocessor(pod=self.pod)
-        self._schedule_preprocessor('/content/', preprocessor, patterns=['*'])
+        self._schedule_preprocessor('/content/', preprocessor, patterns=['*'],
+                                    handler_class=RoutesCacheEventHandler)
         preprocessor = translation.TranslationPreprocessor(pod=self.pod)
         self._schedule_preprocessor('/translations/', preprocessor, patterns=['*.po'])
 
@@ -81,13 +115,14 @@ class ManagedObserver(observers.Observer):
                 if watch:
                     self._preprocessor_watches.append(watch)
 
-    def _schedule_preprocessor(self, path, preprocessor, **kwargs):
+    def _schedule_preprocessor(self, path, preprocessor,
+                               handler_class=PreprocessorEventHandler, **kwargs):
         try:
             if 'ignore_directories' in kwargs:
                 kwargs['ignore_directories'] = [self.pod.abs_path(p)
                                                 for p in kwargs['ignore_directories']]
             path = self.pod.abs_path(path)
-            handler = PreprocessorEventHandler(preprocessor, **kwargs)
+            handler = handler_class(preprocessor, **kwargs)
             return self.schedule(handler, path=path, recursive=True)
         except OSError:
             # No directory found.
@@ -15,8 +15,19 @@ class RoutesCachePreprocessor(base.BasePreprocessor):
         now = datetime.datetime.now()
         limit = RoutesCachePreprocessor.LIMIT
         if not self._last_run or (now - self._last_run) > limit:
+            self.pod.content_manifest.reset()
+            self.pod.document_cache.reset()
+            self.pod.document_indexes.reset()
             self.pod.routes.reset_cache(rebuild=True, inject=False)
             self._last_run = now
 
+    def update(self, pod_path):
+        """Updates the routes for a single file that was added, modified or
+        removed."""
+        self.pod.content_manifest.update(pod_path)
+        self.pod.document_cache.invalidate(pod_path)
+        self.pod.document_indexes.invalidate(pod_path)
+        self.pod.routes.update(pod_path)
+
     def list_watched_dirs(self):
         return ['/content/']
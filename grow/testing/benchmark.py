@@ -0,0 +1,288 @@
+"""Benchmarks build throughput using synthetic pods.
+
+Generates a pod of a configurable size and times the main stages of a build:
+exporting the pod, building the routing map, listing static paths, extracting
+translations and creating a deployment index. Results are written as JSON so
+that they can be compared between commits.
+
+Usage:
+
+  python -m grow.testing.benchmark --docs 200 --locales 5 --out results.json
+  python -m grow.testing.benchmark --compare results.json
+  python -m grow.testing.benchmark --static_scaling 1000,10000,100000
+"""
+
+from grow.common import config
+from grow.deployments import indexes
+from grow.pods import pods
+from grow.pods import storage
+import click
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+import time
+import yaml
+
+LOCALES = [
+    'de', 'es', 'fr', 'it', 'ja', 'ko', 'nl', 'pl', 'pt', 'ru', 'sv', 'tr',
+    'zh',
+]
+
+
+class PodGenerator(object):
+    """Writes a synthetic pod to a directory.
+
+    Args:
+      collections: Number of collections.
+      docs: Number of documents per collection.
+      locales: Number of locales, in addition to the default locale.
+      markdown: Fraction of documents written as Markdown, rather than YAML.
+      template_depth: Number of templates in each view's inheritance chain.
+      statics: Number of static files.
+    """
+
+    def __init__(self, collections=5, docs=20, locales=3, markdown=0.5,
+                 template_depth=3, statics=20):
+        if locales > len(LOCALES):
+            raise ValueError('At most {} locales are supported.'.format(
+                len(LOCALES)))
+        self.collections = collections
+        self.docs = docs
+        self.locales = locales
+        self.markdown = markdown
+        self.template_depth = max(1, template_depth)
+        self.statics = statics
+
+    def to_dict(self):
+        return {
+            'collections': self.collections,
+            'docs': self.docs,
+            'locales': self.locales,
+            'markdown': self.markdown,
+            'template_depth': self.template_depth,
+            'statics': self.statics,
+        }
+
+    def _write(self, root, pod_path, content):
+        path = os.path.join(root, pod_path.lstrip('/'))
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        with open(path, 'w') as fp:
+            fp.write(content)
+
+    def _write_podspec(self, root):
+        podspec = {
+            'localization': {
+                'default_locale': 'en',
+                'locales': ['en'] + LOCALES[:self.locales],
+            },
+            'static_dirs': [{
+                'static_dir': '/static/',
+                'serve_at': '/static/',
+                'fingerprinted': True,
+            }],
+        }
+        self._write(root, '/podspec.yaml', yaml.safe_dump(
+            podspec, default_flow_style=False))
+
+    def _write_views(self, root):
+        self._write(root, '/views/partials/nav.html', textwrap.dedent("""\
+            <nav>
+            {% for doc in g.docs(doc.collection.collection_path, locale=doc.locale)[:10] %}
+              <a href="{{doc.url.path}}">{{doc.title}}</a>
+            {% endfor %}
+            </nav>
+            """))
+        self._write(root, '/views/level0.html', textwrap.dedent("""\
+            <!DOCTYPE html>
+            <title>{{doc.title}}</title>
+            <link rel="stylesheet" href="{{g.static('/static/file0.txt').url.path}}">
+            {% include "/views/partials/nav.html" %}
+            <h1>{{_('Hello World')}}</h1>
+            {% block main %}{% endblock %}
+            """))
+        for depth in range(1, self.template_depth):
+            self._write(root, '/views/level{}.html'.format(depth), textwrap.dedent("""\
+                {{% extends "/views/level{parent}.html" %}}
+                {{% block main %}}
+                <div class="level{depth}">{{{{_('Level {depth}')}}}}</div>
+                {{{{super()}}}}
+                {{% endblock %}}
+                """.format(depth=depth, parent=depth - 1)))
+        self._write(root, '/views/doc.html', textwrap.dedent("""\
+            {{% extends "/views/level{depth}.html" %}}
+            {{% block main %}}
+            {{{{super()}}}}
+            {{% if doc.html %}}{{{{doc.html|safe}}}}{{% endif %}}
+            <p>{{{{doc.description}}}}</p>
+            {{% endblock %}}
+            """.format(depth=self.template_depth - 1)))
+
+    def _write_collection(self, root, index):
+        collection_path = '/content/collection{}'.format(index)
+        blueprint = {
+            'path': '/collection{}/{{base}}/'.format(index),
+            'view': '/views/doc.html',
+            'localization': {
+                'path': '/{{locale}}/collection{}/{{base}}/'.format(index),
+            },
+        }
+        self._write(root, collection_path + '/_blueprint.yaml', yaml.safe_dump(
+            blueprint, default_flow_style=False))
+        num_markdown = int(round(self.docs * self.markdown))
+        for doc_index in range(self.docs):
+            fields = {
+                '$title@': 'Document {} of collection {}'.format(
+                    doc_index, index),
+                '$order': doc_index,
+                'description@': 'Description of document {}.'.format(doc_index),
+            }
+            front_matter = yaml.safe_dump(fields, default_flow_style=False)
+            if doc_index < num_markdown:
+                body = '# Document {}\n\n{}\n'.format(
+                    doc_index, 'Lorem ipsum dolor sit amet. ' * 20)
+                content = '---\n{}---\n{}'.format(front_matter, body)
+                ext = 'md'
+            else:
+                content = front_matter
+                ext = 'yaml'
+            pod_path = '{}/doc{}.{}'.format(collection_path, doc_index, ext)
+            self._write(root, pod_path, content)
+
+    def generate(self, root):
+        """Writes the pod to a directory and returns the directory."""
+        self._write_podspec(root)
+        self._write_views(root)
+        for index in range(self.collections):
+            self._write_collection(root, index)
+        for index in range(self.statics):
+            self._write(root, '/static/file{}.txt'.format(index),
+                        'Static file {}.\n'.format(index) * 100)
+        return root
+
+
+def _time(func, iterations, setup=None):
+    times = []
+    for _ in range(iterations):
+        args = setup() if setup else ()
+        start = time.time()
+        func(*args)
+        times.append(time.time() - start)
+    return {
+        'min': min(times),
+        'mean': sum(times) / len(times),
+        'times': times,
+    }
+
+
+def _list_static_paths(pod):
+    for rule in pod.routes.static_routing_map.iter_rules():
+        rule.endpoint.list_concrete_paths()
+
+
+def run(root, iterations=3):
+    """Times each benchmark against the pod at a root, returning results."""
+    create_pod = lambda: (pods.Pod(root, storage=storage.FileStorage),)
+    paths_to_contents = create_pod()[0].export()
+    return {
+        'export': _time(
+            lambda pod: pod.export(), iterations, setup=create_pod),
+        'build_routing_map': _time(
+            lambda pod: pod.routes._build_routing_map(), iterations,
+            setup=create_pod),
+        'list_static_paths': _time(
+            _list_static_paths, iterations, setup=create_pod),
+        'extract': _time(
+            lambda pod: pod.catalogs.extract(), iterations, setup=create_pod),
+        'index_create': _time(
+            lambda: indexes.Index.create(paths_to_contents), iterations),
+        'num_paths': len(paths_to_contents),
+    }
+
+
+def run_static_scaling(counts, iterations=3):
+    """Times listing the static paths of pods with increasing numbers of
+    static files. Listing is linear if the time per file stays constant."""
+    results = []
+    for count in counts:
+        root = tempfile.mkdtemp()
+        try:
+            PodGenerator(collections=0, statics=count).generate(root)
+            create_pod = lambda: (pods.Pod(root, storage=storage.FileStorage),)
+            result = _time(_list_static_paths, iterations, setup=create_pod)
+        finally:
+            shutil.rmtree(root)
+        results.append({
+            'files': count,
+            'min': result['min'],
+            'per_file': result['min'] / count,
+        })
+    return results
+
+
+def compare(results, baseline):
+    """Returns a list of lines comparing results to a baseline."""
+    lines = []
+    for name in sorted(results['results']):
+        result = results['results'][name]
+        base_result = baseline['results'].get(name)
+        if not isinstance(result, dict) or not isinstance(base_result, dict):
+            continue
+        change = (result['min'] - base_result['min']) / base_result['min'] * 100
+        lines.append('{:<20} {:>9.3f}s {:>9.3f}s {:>+8.1f}%'.format(
+            name, base_result['min'], result['min'], change))
+    return lines
+
+
+@click.command()
+@click.option('--collections', default=5, type=int)
+@click.option('--docs', default=20, type=int,
+              help='Number of documents per collection.')
+@click.option('--locales', default=3, type=int)
+@click.option('--markdown', default=0.5, type=float,
+              help='Fraction of documents written as Markdown.')
+@click.option('--template_depth', default=3, type=int)
+@click.option('--statics', default=20, type=int)
+@click.option('--iterations', default=3, type=int)
+@click.option('--out', help='Where to write the JSON results.')
+@click.option('--compare', 'compare_path',
+              help='JSON results of a previous run to compare against.')
+@click.option('--static_scaling',
+              help='Comma-separated numbers of static files with which to'
+                   ' time listing static paths, e.g. "1000,10000".')
+def main(collections, docs, locales, markdown, template_depth, statics,
+         iterations, out, compare_path, static_scaling):
+    generator = PodGenerator(
+        collections=collections, docs=docs, locales=locales,
+        markdown=markdown, template_depth=template_depth, statics=statics)
+    root = tempfile.mkdtemp()
+    try:
+        generator.generate(root)
+        results = {
+            'version': config.VERSION,
+            'pod': generator.to_dict(),
+            'results': run(root, iterations=iterations),
+        }
+    finally:
+        shutil.rmtree(root)
+    if static_scaling:
+        counts = [int(count) for count in static_scaling.split(',')]
+        results['static_scaling'] = run_static_scaling(
+            counts, iterations=iterations)
+    content = json.dumps(results, indent=2, sort_keys=True)
+    if out:
+        with open(out, 'w') as fp:
+            fp.write(content)
+    else:
+        click.echo(content)
+    if compare_path:
+        with open(compare_path) as fp:
+            baseline = json.load(fp)
+        click.echo('\n'.join(compare(results, baseline)))
+
+
+if __name__ == '__main__':
+    main()
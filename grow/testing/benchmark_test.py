@@ -0,0 +1,40 @@
+from . import benchmark
+from grow.pods import pods
+from grow.pods import storage
+import tempfile
+import unittest
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_generate(self):
+        generator = benchmark.PodGenerator(
+            collections=2, docs=3, locales=1, markdown=0.5, statics=2)
+        root = generator.generate(tempfile.mkdtemp())
+        pod = pods.Pod(root, storage=storage.FileStorage)
+        self.assertEqual(2, len(list(pod.list_collections())))
+        paths = pod.routes.list_concrete_paths()
+        # 2 collections * 3 documents * 2 locales, plus static files.
+        self.assertEqual(14, len(paths))
+        self.assertIn('/de/collection1/doc2/', paths)
+
+    def test_run(self):
+        generator = benchmark.PodGenerator(collections=1, docs=2, locales=1)
+        root = generator.generate(tempfile.mkdtemp())
+        results = benchmark.run(root, iterations=1)
+        for name in ['export', 'build_routing_map', 'list_static_paths',
+                     'extract', 'index_create']:
+            self.assertEqual(1, len(results[name]['times']))
+        results = {'results': results}
+        self.assertEqual(5, len(benchmark.compare(results, results)))
+
+    def test_run_static_scaling(self):
+        results = benchmark.run_static_scaling([2, 4], iterations=1)
+        self.assertEqual([2, 4], [result['files'] for result in results])
+        for result in results:
+            self.assertEqual(result['min'] / result['files'],
+                             result['per_file'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import tempfile
 import shutil
 import os
 from grow.pods import pods
+from grow.pods import storage
 from grow.common import utils
 import unittest
 
@@ -43,3 +44,16 @@ class TestCase(unittest.TestCase):
     def tearDown(self, *args, **kwargs):
         if utils.is_appengine():
             self.testbed.deactivate()
+
+
+class PodCacheTestCase(unittest.TestCase):
+    """Tests of the caches that a pod persists between processes. Each test
+    gets its own copy of the test pod, and `create_pod` loads another pod from
+    the same directory, as a later process would."""
+
+    def setUp(self):
+        self.dir_path = create_test_pod_dir()
+        self.pod = self.create_pod()
+
+    def create_pod(self):
+        return pods.Pod(self.dir_path, storage=storage.FileStorage)